@@ -3,7 +3,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
 import yaml
 import math
@@ -366,6 +366,9 @@ class MachineUsageChart:
         margin_bottom: int = 25,
         margin_left: int = 10,
         margin_right: int = 10,
+        include_summary: bool = True,
+        row_start: int = 0,
+        row_count: Optional[int] = None,
     ) -> List[go.Figure]:
         """
         Create detailed charts for each machine in the dataset for mobile detail view.
@@ -382,6 +385,9 @@ class MachineUsageChart:
             margin_bottom: Bottom margin in pixels (default: 40)
             margin_left: Left margin in pixels (default: 10)
             margin_right: Right margin in pixels (default: 10)
+            include_summary: Build the Avg/Best/Worst figure (default: True)
+            row_start: First machine figure (3 machines each) to build (default: 0)
+            row_count: Number of machine figures to build (default: None for all)
 
         Returns:
             List[plotly.graph_objects.Figure]: List of figures for each machine
@@ -390,7 +396,9 @@ class MachineUsageChart:
             figures = []
 
             # First figure: Avg, Best, Worst
-            if all(key in dfs[period] for key in ["avg", "best", "worst"]):
+            if include_summary and all(
+                key in dfs[period] for key in ["avg", "best", "worst"]
+            ):
                 avg_df = dfs[period]["avg"]
                 best_df = dfs[period]["best"]
                 worst_df = dfs[period]["worst"]
@@ -490,9 +498,9 @@ class MachineUsageChart:
                 logger.warning(
                     "'machine_name' column missing in 'all_machine' DataFrame. Using generic names."
                 )
-                all_machine_df["machine_name"] = [
-                    f"Machine {i+1}" for i in range(len(all_machine_df))
-                ]
+                all_machine_df = all_machine_df.assign(
+                    machine_name=[f"Machine {i+1}" for i in range(len(all_machine_df))]
+                )
 
             logger.debug(f"Creating individual machine charts for period: {period}")
             logger.debug(f"All Machines DataFrame shape: {all_machine_df.shape}")
@@ -504,8 +512,13 @@ class MachineUsageChart:
             # Each figure will have exactly 3 charts (machines per figure)
             num_additional_figures = math.ceil(num_machines / machines_per_figure)
 
-            # Process each figure
-            for i in range(num_additional_figures):
+            # Process each figure (only the requested page of figures)
+            last_figure = (
+                num_additional_figures
+                if row_count is None
+                else min(num_additional_figures, row_start + row_count)
+            )
+            for i in range(row_start, last_figure):
                 start_idx = i * machines_per_figure
                 end_idx = min((i + 1) * machines_per_figure, num_machines)
                 current_machines_df = all_machine_df.iloc[start_idx:end_idx]
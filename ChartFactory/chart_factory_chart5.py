@@ -3,6 +3,9 @@ import plotly.graph_objects as go
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
+from Database.chart_schema import CHART_SCHEMAS, normalize_frame
+from Database.chart5_windows import CHART5_TIME_WINDOWS, bucket_now, chart5_window
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +66,138 @@ def _format_datetime_for_hover(dt_obj):
     return str(dt_obj)  # Fallback if not a datetime object
 
 
+NOW_LINE_NAME = "now-line"
+
+
+def _wall_clock_offset_ms() -> float:
+    """Offset of this server's wall clock from UTC, in milliseconds."""
+    return datetime.now().astimezone().utcoffset().total_seconds() * 1000
+
+
+# Helper to determine if a datetime is aligned to the current tick frequency
+def _is_boundary_aligned(dt: datetime, freq_str: str) -> bool:
+    """Return True if *dt* falls exactly on a tick boundary determined by *freq_str*."""
+    try:
+        freq_str = freq_str.strip()
+        # Minute-based frequency, e.g. "15min"
+        if freq_str.lower().endswith("min"):
+            interval_min = int(freq_str[:-3])
+            return (
+                dt.second == 0 and dt.microsecond == 0 and dt.minute % interval_min == 0
+            )
+        # Hour-based frequency, e.g. "H", "2H", "3H", "6H", "12H"
+        if freq_str.upper().endswith("H"):
+            hours_part = freq_str[:-1]
+            interval_hr = int(hours_part) if hours_part else 1
+            return (
+                dt.minute == 0
+                and dt.second == 0
+                and dt.microsecond == 0
+                and dt.hour % interval_hr == 0
+            )
+    except Exception:
+        # Any parsing issue → treat as not aligned
+        pass
+    return False
+
+
+@lru_cache(maxsize=64)
+def _axis_ticks(min_time_boundary: pd.Timestamp, max_time_boundary: pd.Timestamp):
+    """
+    (tick values, tick texts) of the time axis. Boundaries only move once per
+    chart 5 bucket, so every render inside a bucket reuses them.
+    """
+    min_time_numeric = min_time_boundary.timestamp() * 1000
+    max_time_numeric = max_time_boundary.timestamp() * 1000
+
+    time_span_hours = (max_time_boundary - min_time_boundary).total_seconds() / 3600
+    if time_span_hours <= 1:
+        tick_freq_str = "15min"
+        tick_format_str = "%H:%M"
+    elif time_span_hours <= 6:
+        tick_freq_str = "H"
+        tick_format_str = "%H:%M"
+    elif time_span_hours <= 12:
+        tick_freq_str = "2H"  # Changed from 'H' for less clutter
+        tick_format_str = "%H:%M"
+    elif time_span_hours <= 24:
+        tick_freq_str = "3H"
+        tick_format_str = "%H:%M"
+    elif time_span_hours <= 48:
+        tick_freq_str = "6H"
+        tick_format_str = "%m-%d %H:%M"
+    else:  # More than 48 hours (e.g. 72h span)
+        tick_freq_str = "12H"
+        tick_format_str = "%m-%d %H:%M"
+
+    # Generate ticks ensuring they start reasonably
+    # Ensure tick_dt_values are timezone-naive if min/max_time_boundary are naive.
+    tick_dt_values_naive = pd.date_range(
+        start=min_time_boundary.round("H"),
+        end=max_time_boundary.round("H"),
+        freq=tick_freq_str,
+    )
+
+    custom_tickvals = [
+        t.timestamp() * 1000
+        for t in tick_dt_values_naive
+        if min_time_boundary <= t <= max_time_boundary
+    ]
+    custom_ticktext = [
+        t.strftime(tick_format_str)
+        for t in tick_dt_values_naive
+        if min_time_boundary <= t <= max_time_boundary
+    ]
+
+    include_max_boundary = _is_boundary_aligned(max_time_boundary, tick_freq_str)
+
+    # ----- MIN BOUNDARY TICK HANDLING -----
+    # Always consider the min boundary tick (e.g. 12 h before *now*). Add it unless the
+    # next tick is closer than 1 hour, in which case we skip it to avoid overlapping labels.
+    ONE_HOUR_MS = 3600 * 1000
+
+    if min_time_numeric not in custom_tickvals:
+        if not custom_tickvals:
+            # No other ticks – simply add the boundary tick.
+            custom_tickvals.insert(0, min_time_numeric)
+            custom_ticktext.insert(0, min_time_boundary.strftime(tick_format_str))
+        else:
+            distance_to_next = custom_tickvals[0] - min_time_numeric
+            if distance_to_next >= ONE_HOUR_MS:
+                custom_tickvals.insert(0, min_time_numeric)
+                custom_ticktext.insert(0, min_time_boundary.strftime(tick_format_str))
+
+    # ----- MAX BOUNDARY TICK HANDLING -----
+    # Keep existing behaviour: add only if boundary aligns with tick frequency & it's missing.
+    if include_max_boundary and (
+        not custom_tickvals or custom_tickvals[-1] < max_time_numeric
+    ):
+        custom_tickvals.append(max_time_numeric)
+        custom_ticktext.append(max_time_boundary.strftime(tick_format_str))
+
+    # Ensure at least one tick exists; if the list became empty for some reason, fall back to
+    # the nearest aligned tick after the min boundary to guarantee visible ticks.
+    if not custom_tickvals:
+        fallback_tick = (
+            min_time_boundary + (max_time_boundary - min_time_boundary) / 2
+        ).timestamp() * 1000
+        custom_tickvals = [fallback_tick]
+        custom_ticktext = [
+            datetime.fromtimestamp(fallback_tick / 1000).strftime(tick_format_str)
+        ]
+
+    # Remove duplicate tick values that might arise from adding boundaries
+    final_ticks = {}
+    for val, text in zip(custom_tickvals, custom_ticktext):
+        if val not in final_ticks:  # Keep first occurrence for text
+            final_ticks[val] = text
+
+    sorted_final_tickvals = sorted(final_ticks.keys())
+    sorted_final_ticktext = [final_ticks[val] for val in sorted_final_tickvals]
+
+    return tuple(sorted_final_tickvals), tuple(sorted_final_ticktext)
+
+
 def create_chart5_figure(
     period: str,
     dfs: Dict[str, Dict[str, pd.DataFrame]],
@@ -152,27 +287,9 @@ def create_chart5_figure(
                 f"{current_lang_opts['error_message_header']}: {period} - Missing Columns: {', '.join(missing)}"
             )
 
-        df = df_orig.copy()
-
-        # Data type conversions and calculations
-        df["start_time"] = pd.to_datetime(df["start_time"], errors="coerce")
-        df["expected_run_minutes"] = pd.to_numeric(
-            df["expected_run_minutes"], errors="coerce"
-        )
-
-        # Handle 'color' separately for potential NaNs before int conversion in _int_to_hex_color
-        # df["color"] is used directly by _int_to_hex_color which handles None/NaN
-
-        df.dropna(
-            subset=[
-                "start_time",
-                "expected_run_minutes",
-                "machine_name",
-                "color",
-                "state",
-            ],
-            inplace=True,
-        )
+        # Frames are typed and cleaned by the chart 5 schema at fetch time;
+        # this is a no-op for them and only casts data from other sources
+        df = normalize_frame(df_orig, CHART_SCHEMAS["chart-5-data-store"]).copy()
 
         if df.empty:
             logger.info(
@@ -182,15 +299,9 @@ def create_chart5_figure(
                 current_lang_opts["no_data_message"], is_no_data=True
             )
 
-        df["expected_end_time"] = df.apply(
-            lambda row: row["start_time"]
-            + timedelta(minutes=row["expected_run_minutes"]),
-            axis=1,
-        )
+        df["duration_timedelta"] = pd.to_timedelta(df["expected_run_minutes"], unit="m")
+        df["expected_end_time"] = df["start_time"] + df["duration_timedelta"]
         df["hex_color"] = df["color"].apply(_int_to_hex_color)
-        df["duration_timedelta"] = df["expected_run_minutes"].apply(
-            lambda x: timedelta(minutes=x)
-        )
 
         df.sort_values(by=["machine_name", "start_time"], inplace=True)
 
@@ -201,8 +312,6 @@ def create_chart5_figure(
 
         if "action_name" not in df.columns:
             df["action_name"] = "Activity"
-        else:
-            df["action_name"] = df["action_name"].fillna("Activity")
 
     except Exception as e:
         logger.error(
@@ -216,9 +325,12 @@ def create_chart5_figure(
     fig = go.Figure()
     # TODO change back to now
     # now = pd.Timestamp("2025-04-07 05:00:00")
-    now = pd.Timestamp.now()
+    # The same bucket as the data: the figure only changes once per bucket,
+    # the browser moves the "now" line (dashboard.place_now_line)
+    now = pd.Timestamp(bucket_now())
 
-    # Group activities by machine and create one trace per machine
+    # All machines share one Bar trace; segments are already sorted by
+    # machine_name and start_time, so each lane is drawn in order.
     unique_machines = df["machine_name"].unique().tolist()
 
     # Define state colors
@@ -230,20 +342,13 @@ def create_chart5_figure(
         "维修": "#3498db",
     }
 
-    # Create machine display names with states and collect state colors
-    machine_display_names = []
-    machine_state_colors = []
-
-    for machine_name in unique_machines:
-        machine_df = df[df["machine_name"] == machine_name].copy()
-        # Use the first state for this machine
-        first_state = machine_df.iloc[0]["state"]
-        display_name = f"{machine_name}"
-        machine_display_names.append(display_name)
-
-        # Get color for this state, default to white if state not found
-        state_color = state_colors.get(first_state, "#ffffff")
-        machine_state_colors.append(state_color)
+    # Machine display names and the color of each machine's first state
+    first_states = df.groupby("machine_name", sort=False)["state"].first()
+    machine_display_names = [f"{machine_name}" for machine_name in unique_machines]
+    machine_state_colors = [
+        state_colors.get(first_states[machine_name], "#ffffff")
+        for machine_name in unique_machines
+    ]
 
     # Add dummy machines if page_size is provided and we have fewer machines than page_size
     num_actual_machines = len(unique_machines)
@@ -256,93 +361,74 @@ def create_chart5_figure(
                 "#000000"
             )  # Black color for dummy (will be invisible)
 
-    for i, machine_name in enumerate(unique_machines):
-        machine_df = df[df["machine_name"] == machine_name].copy()
-        machine_df = machine_df.sort_values("start_time")
-        display_name = machine_display_names[i]
-
-        # Prepare arrays for this machine's segments
-        base_times = []
-        durations = []
-        colors = []
-        hover_texts = []
-        batch_texts = []
-
-        for _, row in machine_df.iterrows():
-            base_times.append(row["start_numeric"])
-            durations.append(row["duration_numeric"])
-            colors.append(row["hex_color"])
-            batch_texts.append(str(row.get("batch_no", "")))
-
-            hover_text = (
-                f"<b>{row['machine_name']}</b><br>"
-                f"State: {row['state']}<br>"
-                f"Action: {row.get('action_name', 'N/A')}<br>"
-                f"Start: {_format_datetime_for_hover(row['start_time'])}<br>"
-                f"End: {_format_datetime_for_hover(row['expected_end_time'])}<br>"
-                f"Duration: {row['expected_run_minutes']:.0f} min"
-            )
-            hover_texts.append(hover_text)
+    batch_texts = (
+        df["batch_no"].astype(str).tolist()
+        if "batch_no" in df.columns
+        else [""] * len(df)
+    )
+    hover_texts = [
+        f"<b>{machine_name}</b><br>"
+        f"State: {state}<br>"
+        f"Action: {action_name}<br>"
+        f"Start: {_format_datetime_for_hover(start_time)}<br>"
+        f"End: {_format_datetime_for_hover(end_time)}<br>"
+        f"Duration: {run_minutes:.0f} min"
+        for machine_name, state, action_name, start_time, end_time, run_minutes in zip(
+            df["machine_name"],
+            df["state"],
+            df["action_name"],
+            df["start_time"],
+            df["expected_end_time"],
+            df["expected_run_minutes"],
+        )
+    ]
+
+    # One Bar trace for every segment of every machine
+    fig.add_trace(
+        go.Bar(
+            y=df["machine_name"].astype(str).tolist(),  # Lane per machine
+            base=df["start_numeric"].tolist(),  # Array of start times
+            x=df["duration_numeric"].tolist(),  # Array of durations
+            orientation="h",
+            width=0.7,
+            marker_color=df["hex_color"].tolist(),  # Array of colors for each segment
+            text=batch_texts,  # Array of batch numbers
+            # textfont=dict(size=12),
+            textposition="inside",
+            insidetextanchor="middle",
+            hovertext=hover_texts,  # Array of hover texts
+            hoverinfo="text",
+            showlegend=False,  # Don't show in legend to avoid clutter
+        )
+    )
 
-        # Create one Bar trace for this machine with multiple segments
+    # One invisible trace holding every dummy lane to maintain consistent lane count
+    if page_size is not None and num_actual_machines < page_size:
+        dummy_display_names = machine_display_names[num_actual_machines:]
         fig.add_trace(
             go.Bar(
-                y=[display_name] * len(base_times),  # Use display name with state
-                base=base_times,  # Array of start times
-                x=durations,  # Array of durations
+                y=dummy_display_names,
+                x=[0] * len(dummy_display_names),  # Zero width bars
                 orientation="h",
                 width=0.7,
-                marker_color=colors,  # Array of colors for each segment
-                name=display_name,
-                text=batch_texts,  # Array of batch numbers
-                # textfont=dict(size=12),
-                textposition="inside",
-                insidetextanchor="middle",
-                hovertext=hover_texts,  # Array of hover texts
-                hoverinfo="text",
-                showlegend=False,  # Don't show in legend to avoid clutter
+                marker_color="rgba(0,0,0,0)",  # Completely transparent
+                showlegend=False,
+                hoverinfo="skip",  # Skip hover for dummy machines
             )
         )
 
-    # Add invisible dummy traces for dummy machines to maintain consistent lane count
-    if page_size is not None and num_actual_machines < page_size:
-        for i in range(num_actual_machines, len(machine_display_names)):
-            dummy_display_name = machine_display_names[i]
-            # Add an invisible trace with no data
-            fig.add_trace(
-                go.Bar(
-                    y=[dummy_display_name],
-                    x=[0],  # Zero width bar
-                    orientation="h",
-                    width=0.7,
-                    marker_color="rgba(0,0,0,0)",  # Completely transparent
-                    name=dummy_display_name,
-                    showlegend=False,
-                    hoverinfo="skip",  # Skip hover for dummy machines
-                )
-            )
-
     now_numeric = now.timestamp() * 1000
 
-    if period == "24_hrs":
-        min_time_boundary = now - timedelta(hours=12)
-        max_time_boundary = now + timedelta(hours=12)
-    elif period == "48_hrs":
-        min_time_boundary = now - timedelta(hours=24)
-        max_time_boundary = now + timedelta(hours=24)
-    elif period == "72_hrs":
-        min_time_boundary = now - timedelta(hours=24)
-        max_time_boundary = now + timedelta(hours=48)
-    else:
+    if period not in CHART5_TIME_WINDOWS:
         logger.warning(f"Unknown period '{period}' for chart5, defaulting to 24_hrs.")
-        min_time_boundary = now - timedelta(hours=12)
-        max_time_boundary = now + timedelta(hours=12)
+    min_time_boundary, max_time_boundary = chart5_window(period, now)
 
     min_time_numeric = min_time_boundary.timestamp() * 1000
     max_time_numeric = max_time_boundary.timestamp() * 1000
 
     fig.add_vline(
         x=now_numeric,
+        name=NOW_LINE_NAME,
         line_width=2,
         line_dash="dash",
         line_color="#fdfefe",
@@ -363,6 +449,9 @@ def create_chart5_figure(
         margin=dict(t=margin_top, b=margin_bottom, l=margin_left, r=margin_right),
         showlegend=False,
         barcornerradius=50,
+        # x values are wall-clock times encoded as UTC; lets the browser place
+        # the "now" line in the server's wall clock
+        meta={"now_offset_ms": _wall_clock_offset_ms()},
     )
 
     num_unique_machines = len(unique_machines)
@@ -388,124 +477,15 @@ def create_chart5_figure(
     else:
         fig.update_layout(autosize=True, height=final_height)
 
-    time_span_hours = (max_time_boundary - min_time_boundary).total_seconds() / 3600
-    if time_span_hours <= 1:
-        tick_freq_str = "15min"
-        tick_format_str = "%H:%M"
-    elif time_span_hours <= 6:
-        tick_freq_str = "H"
-        tick_format_str = "%H:%M"
-    elif time_span_hours <= 12:
-        tick_freq_str = "2H"  # Changed from 'H' for less clutter
-        tick_format_str = "%H:%M"
-    elif time_span_hours <= 24:
-        tick_freq_str = "3H"
-        tick_format_str = "%H:%M"
-    elif time_span_hours <= 48:
-        tick_freq_str = "6H"
-        tick_format_str = "%m-%d %H:%M"
-    else:  # More than 48 hours (e.g. 72h span)
-        tick_freq_str = "12H"
-        tick_format_str = "%m-%d %H:%M"
-
-    # Generate ticks ensuring they start reasonably
-    # Ensure tick_dt_values are timezone-naive if min/max_time_boundary are naive.
-    tick_dt_values_naive = pd.date_range(
-        start=min_time_boundary.round("H"),
-        end=max_time_boundary.round("H"),
-        freq=tick_freq_str,
+    sorted_final_tickvals, sorted_final_ticktext = _axis_ticks(
+        min_time_boundary, max_time_boundary
     )
 
-    custom_tickvals = [
-        t.timestamp() * 1000
-        for t in tick_dt_values_naive
-        if min_time_boundary <= t <= max_time_boundary
-    ]
-    custom_ticktext = [
-        t.strftime(tick_format_str)
-        for t in tick_dt_values_naive
-        if min_time_boundary <= t <= max_time_boundary
-    ]
-
-    # Helper to determine if a datetime is aligned to the current tick frequency
-    def _is_boundary_aligned(dt: datetime, freq_str: str) -> bool:
-        """Return True if *dt* falls exactly on a tick boundary determined by *freq_str*."""
-        try:
-            freq_str = freq_str.strip()
-            # Minute-based frequency, e.g. "15min"
-            if freq_str.lower().endswith("min"):
-                interval_min = int(freq_str[:-3])
-                return (
-                    dt.second == 0
-                    and dt.microsecond == 0
-                    and dt.minute % interval_min == 0
-                )
-            # Hour-based frequency, e.g. "H", "2H", "3H", "6H", "12H"
-            if freq_str.upper().endswith("H"):
-                hours_part = freq_str[:-1]
-                interval_hr = int(hours_part) if hours_part else 1
-                return (
-                    dt.minute == 0
-                    and dt.second == 0
-                    and dt.microsecond == 0
-                    and dt.hour % interval_hr == 0
-                )
-        except Exception:
-            # Any parsing issue → treat as not aligned
-            pass
-        return False
-
-    include_max_boundary = _is_boundary_aligned(max_time_boundary, tick_freq_str)
-
-    # ----- MIN BOUNDARY TICK HANDLING -----
-    # Always consider the min boundary tick (e.g. 12 h before *now*). Add it unless the
-    # next tick is closer than 1 hour, in which case we skip it to avoid overlapping labels.
-    ONE_HOUR_MS = 3600 * 1000
-
-    if min_time_numeric not in custom_tickvals:
-        if not custom_tickvals:
-            # No other ticks – simply add the boundary tick.
-            custom_tickvals.insert(0, min_time_numeric)
-            custom_ticktext.insert(0, min_time_boundary.strftime(tick_format_str))
-        else:
-            distance_to_next = custom_tickvals[0] - min_time_numeric
-            if distance_to_next >= ONE_HOUR_MS:
-                custom_tickvals.insert(0, min_time_numeric)
-                custom_ticktext.insert(0, min_time_boundary.strftime(tick_format_str))
-
-    # ----- MAX BOUNDARY TICK HANDLING -----
-    # Keep existing behaviour: add only if boundary aligns with tick frequency & it's missing.
-    if include_max_boundary and (
-        not custom_tickvals or custom_tickvals[-1] < max_time_numeric
-    ):
-        custom_tickvals.append(max_time_numeric)
-        custom_ticktext.append(max_time_boundary.strftime(tick_format_str))
-
-    # Ensure at least one tick exists; if the list became empty for some reason, fall back to
-    # the nearest aligned tick after the min boundary to guarantee visible ticks.
-    if not custom_tickvals:
-        fallback_tick = (
-            min_time_boundary + (max_time_boundary - min_time_boundary) / 2
-        ).timestamp() * 1000
-        custom_tickvals = [fallback_tick]
-        custom_ticktext = [
-            datetime.fromtimestamp(fallback_tick / 1000).strftime(tick_format_str)
-        ]
-
-    # Remove duplicate tick values that might arise from adding boundaries
-    final_ticks = {}
-    for val, text in zip(custom_tickvals, custom_ticktext):
-        if val not in final_ticks:  # Keep first occurrence for text
-            final_ticks[val] = text
-
-    sorted_final_tickvals = sorted(final_ticks.keys())
-    sorted_final_ticktext = [final_ticks[val] for val in sorted_final_tickvals]
-
     fig.update_xaxes(
         type="linear",
         range=[min_time_numeric, max_time_numeric],
-        tickvals=sorted_final_tickvals if sorted_final_tickvals else None,
-        ticktext=sorted_final_ticktext if sorted_final_tickvals else None,
+        tickvals=list(sorted_final_tickvals) if sorted_final_tickvals else None,
+        ticktext=list(sorted_final_ticktext) if sorted_final_tickvals else None,
         showline=True,
         linewidth=1,
         linecolor="#fdfefe",
@@ -4,6 +4,7 @@ from typing import Dict, Optional
 import logging
 from dash import html
 import dash_bootstrap_components as dbc
+from Database.chart_schema import CHART_SCHEMAS, normalize_frame
 
 
 logger = logging.getLogger(__name__)
@@ -121,13 +122,14 @@ def create_chart3_figure(
         _make_figure_empty_looking(fig)
         return fig
 
-    # Convert date to mmdd format for x-axis display
-    df_copy["date"] = pd.to_datetime(df_copy["date"])
+    # Dates and weights are typed by the chart 3 schema at fetch time; this is
+    # a no-op for those frames and only casts data from other sources
+    df_copy = normalize_frame(df_copy, CHART_SCHEMAS["chart-3-data-store"])
+    # mmdd (x-axis display) is derived at fetch time as well
     if "mmdd" not in df_copy.columns:
         df_copy["mmdd"] = df_copy["date"].dt.strftime("%m-%d")
 
     try:
-        df_copy["weight_kg"] = pd.to_numeric(df_copy["weight_kg"], errors="coerce")
         if df_copy["weight_kg"].isnull().all():
             logger.error(
                 f"'weight_kg' column for period '{period}' contains no valid numeric data after conversion."
@@ -446,11 +448,13 @@ def create_chart3_figure_detail(
         _make_figure_empty_looking(fig)
         return fig
 
-    # Convert date to mmdd format for x-axis display
-    df_copy["date"] = pd.to_datetime(df_copy["date"])
-    df_copy["mmdd"] = df_copy["date"].dt.strftime("%m-%d")
+    # Dates and weights are typed by the chart 3 schema at fetch time; this is
+    # a no-op for those frames and only casts data from other sources
+    df_copy = normalize_frame(df_copy, CHART_SCHEMAS["chart-3-data-store"])
+    # mmdd (x-axis display) is derived at fetch time as well
+    if "mmdd" not in df_copy.columns:
+        df_copy["mmdd"] = df_copy["date"].dt.strftime("%m-%d")
     try:
-        df_copy["weight_kg"] = pd.to_numeric(df_copy["weight_kg"], errors="coerce")
         if df_copy["weight_kg"].isnull().all():
             logger.error(
                 f"'weight_kg' column for period '{period}' contains no valid numeric data after conversion."
@@ -481,12 +485,19 @@ def create_chart3_figure_detail(
         return fig
 
     # Data is already pre-processed with 7 data points per machine
-    # Iterate through each machine and add a trace
+    # Sort once by date so lines are drawn correctly (mmdd might not sort
+    # chronologically), then split the frame into one trace per machine in a
+    # single groupby pass instead of filtering it once per machine
     machine_names = df_copy["machine_name"].unique()
+    machine_groups = dict(
+        tuple(
+            df_copy.sort_values(by="date", kind="stable").groupby(
+                "machine_name", sort=False
+            )
+        )
+    )
     for machine_name in machine_names:
-        machine_df = df_copy[df_copy["machine_name"] == machine_name]
-        # Sort by date to ensure lines are drawn correctly (mmdd might not sort chronologically)
-        machine_df = machine_df.sort_values(by="date")
+        machine_df = machine_groups[machine_name]
         fig.add_trace(
             go.Scatter(
                 x=machine_df["mmdd"],
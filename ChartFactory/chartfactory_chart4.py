@@ -1,7 +1,9 @@
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from typing import Dict, List
+from ChartFactory.figure_builder import FigureBuilder
+from Database.chart_schema import CHART_SCHEMAS, normalize_frame
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,8 +44,8 @@ def _add_bar_traces_for_category_subplot(
     category_name_for_log: str,
 ):
     """
-    Adds a group of bar traces (water, power, steam) for a single category (Avg, Best, Worst)
-    to a specified subplot in the figure.
+    Adds the bars (water, power, steam) for a single category (Avg, Best, Worst)
+    to a specified subplot in the figure as a single trace.
     """
     current_lang_opts = lang_option_chart4.get(lang, lang_option_chart4["zh_cn"])
     metrics_db_keys = ["steam_ton", "power_kwh", "water_ton"]
@@ -93,24 +95,40 @@ def _add_bar_traces_for_category_subplot(
                 processed_values.append(0.0)
         values = processed_values
 
-    for i in range(len(metrics_db_keys)):
-        fig.add_trace(
-            go.Bar(
-                x=[metric_display_names[i]],  # X-axis category for this specific bar
-                y=[values[i]],
-                name=metric_display_names[
-                    i
-                ],  # Name for the legend (Water, Power, Steam)
-                marker_color=metric_colors[i],
-                legendgroup="metrics",  # Groups all metric bars for a unified legend
-                showlegend=add_to_legend,  # Controlled by the main function call
-                text=[f"{values[i]:.2f}"],  # Display value on bar
-                textposition="auto",
-                hoverinfo="y+name",  # Show y-value and trace name (e.g., "Water (ton)") on hover
-            ),
-            row=row_num,
-            col=col_num,
-        )
+    # One trace per subplot; each bar takes its metric color from the marker array
+    fig.add_trace(
+        dict(
+            type="bar",
+            x=list(metric_display_names),  # X-axis categories (Water, Power, Steam)
+            y=values,
+            name=category_name_for_log,
+            marker_color=metric_colors,
+            showlegend=False,
+            text=[f"{v:.2f}" for v in values],  # Display value on bar
+            textposition="auto",
+            hoverinfo="x+y",  # Show metric name and value on hover
+        ),
+        row=row_num,
+        col=col_num,
+    )
+
+    if add_to_legend:
+        # Legend-only entries (no data points), one per metric color
+        for name, color in zip(metric_display_names, metric_colors):
+            fig.add_trace(
+                dict(
+                    type="bar",
+                    x=[None],
+                    y=[None],
+                    name=name,  # Name for the legend (Water, Power, Steam)
+                    marker_color=color,
+                    legendgroup="metrics",  # Groups all metric entries for a unified legend
+                    showlegend=True,
+                    hoverinfo="skip",
+                ),
+                row=row_num,
+                col=col_num,
+            )
 
 
 def create_chart4_figure(
@@ -488,11 +506,22 @@ def create_chart4_figure_detail(
     margin_right: int = 15,  # Changed from 40
     plot_width: int = None,
     row_height_px: int = 250,  # Adjusted for a bit more space per fig-row
+    include_summary: bool = True,
+    row_start: int = 0,
+    row_count: Optional[int] = None,
+    validate: bool = False,
 ) -> List[go.Figure]:
     """
     Creates a list of figures. Each figure represents a row of charts.
     - output_figures[0]: Summary (Average, Best, Worst) in 1x3 subplots.
     - output_figures[1...N]: Machine data, 3 machines per figure (1x3 subplots each).
+
+    include_summary / row_start / row_count select a page of the output: the summary
+    figure is built only when include_summary is True, and only machine figures
+    row_start ... row_start + row_count - 1 (0-based) are built.
+
+    Figures are assembled with FigureBuilder and returned as plain dicts; pass
+    validate=True to get validated go.Figure objects instead.
     """
     output_figures: List[go.Figure] = []
     current_lang_opts = lang_option_chart4.get(lang, lang_option_chart4["zh_cn"])
@@ -557,127 +586,132 @@ def create_chart4_figure_detail(
         return _create_error_figure_list(f"Data Preparation Error: {period}")
 
     # --- Figure 1: Summary (Average, Best, Worst) ---
-    summary_fig_height = row_height_px  # Base height for a row
-    if title_font_size:
-        summary_fig_height += title_font_size + 10  # Add space for main title
-    if subplot_title_font_size:
-        summary_fig_height += (
-            subplot_title_font_size + 5
-        )  # Add space for subplot titles
-    if legend_font_size:
-        summary_fig_height += legend_font_size + 30  # Add space for legend at bottom
-
-    # Calculate maximum y-value across all categories for unified y-axis scaling in summary
-    max_y_value_summary = 0.0
+    if include_summary:
+        summary_fig_height = row_height_px  # Base height for a row
+        if title_font_size:
+            summary_fig_height += title_font_size + 10  # Add space for main title
+        if subplot_title_font_size:
+            summary_fig_height += (
+                subplot_title_font_size + 5
+            )  # Add space for subplot titles
+        if legend_font_size:
+            summary_fig_height += (
+                legend_font_size + 30
+            )  # Add space for legend at bottom
+
+        # Calculate maximum y-value across all categories for unified y-axis scaling in summary
+        max_y_value_summary = 0.0
+
+        for df in [avg_df, best_df, worst_df]:
+            if (
+                df is not None
+                and not df.empty
+                and all(col in df.columns for col in metrics_db_keys)
+            ):
+                try:
+                    for key in metrics_db_keys:
+                        raw_value = df[key].iloc[0]
+                        val = pd.to_numeric(raw_value, errors="coerce")
+                        if pd.notna(val):
+                            max_y_value_summary = max(max_y_value_summary, val)
+                except (IndexError, Exception) as e:
+                    logger.debug(
+                        f"Error processing values for summary y-axis scaling: {e}"
+                    )
+                    continue
+
+        # Add 10% padding to the maximum value for better visualization
+        if max_y_value_summary > 0:
+            max_y_value_summary *= 1.1
+        else:
+            max_y_value_summary = 1.0  # Default minimum range if no valid data
 
-    for df in [avg_df, best_df, worst_df]:
+        s_title_avg = f"{period} {current_lang_opts['subplot_title'][0]}"
+        s_title_best = f"{period} {current_lang_opts['subplot_title'][1]}"
+        s_title_worst = f"{period} {current_lang_opts['subplot_title'][2]}"
         if (
-            df is not None
-            and not df.empty
-            and all(col in df.columns for col in metrics_db_keys)
+            best_df is not None
+            and not best_df.empty
+            and "machine_name" in best_df.columns
+            and pd.notna(best_df["machine_name"].iloc[0])
         ):
-            try:
-                for key in metrics_db_keys:
-                    raw_value = df[key].iloc[0]
-                    val = pd.to_numeric(raw_value, errors="coerce")
-                    if pd.notna(val):
-                        max_y_value_summary = max(max_y_value_summary, val)
-            except (IndexError, Exception) as e:
-                logger.debug(f"Error processing values for summary y-axis scaling: {e}")
-                continue
-
-    # Add 10% padding to the maximum value for better visualization
-    if max_y_value_summary > 0:
-        max_y_value_summary *= 1.1
-    else:
-        max_y_value_summary = 1.0  # Default minimum range if no valid data
-
-    s_title_avg = f"{period} {current_lang_opts['subplot_title'][0]}"
-    s_title_best = f"{period} {current_lang_opts['subplot_title'][1]}"
-    s_title_worst = f"{period} {current_lang_opts['subplot_title'][2]}"
-    if (
-        best_df is not None
-        and not best_df.empty
-        and "machine_name" in best_df.columns
-        and pd.notna(best_df["machine_name"].iloc[0])
-    ):
-        s_title_best += f" ({best_df['machine_name'].iloc[0]})"
-    if (
-        worst_df is not None
-        and not worst_df.empty
-        and "machine_name" in worst_df.columns
-        and pd.notna(worst_df["machine_name"].iloc[0])
-    ):
-        s_title_worst += f" ({worst_df['machine_name'].iloc[0]})"
-
-    fig_summary = make_subplots(
-        rows=1,
-        cols=3,
-        subplot_titles=[s_title_avg, s_title_best, s_title_worst],
-        horizontal_spacing=0.04,
-    )
-    _add_bar_traces_for_category_subplot(
-        fig_summary, avg_df, lang, 1, 1, True, s_title_avg
-    )
-    _add_bar_traces_for_category_subplot(
-        fig_summary, best_df, lang, 1, 2, False, s_title_best
-    )
-    _add_bar_traces_for_category_subplot(
-        fig_summary, worst_df, lang, 1, 3, False, s_title_worst
-    )
+            s_title_best += f" ({best_df['machine_name'].iloc[0]})"
+        if (
+            worst_df is not None
+            and not worst_df.empty
+            and "machine_name" in worst_df.columns
+            and pd.notna(worst_df["machine_name"].iloc[0])
+        ):
+            s_title_worst += f" ({worst_df['machine_name'].iloc[0]})"
 
-    summary_main_title = f"{current_lang_opts['main_title']} - {period} (Summary)"
-    summary_layout_args = dict(
-        title_text=summary_main_title,
-        title_x=0.5,
-        title_font_size=title_font_size,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            font_size=legend_font_size,
-            bgcolor="rgba(0,0,0,0)",
-        ),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font_color="#fdfefe",
-        height=summary_fig_height,
-        margin=dict(t=margin_top, b=margin_bottom, l=margin_left, r=margin_right),
-    )
-    if plot_width:
-        summary_layout_args.update({"width": plot_width, "autosize": False})
-    else:
-        summary_layout_args["autosize"] = True
-    fig_summary.update_layout(**summary_layout_args)
-    fig_summary.update_annotations(
-        font_size=subplot_title_font_size
-    )  # For subplot titles
-    for c_idx in range(1, 4):  # Axes for summary fig with unified y-axis scaling
-        fig_summary.update_xaxes(
-            row=1,
-            col=c_idx,
-            showline=True,
-            linewidth=1,
-            linecolor="#fdfefe",
-            showgrid=False,
-            tickfont=dict(color="#fdfefe", size=10),
-            type="category",
+        fig_summary = FigureBuilder(
+            rows=1,
+            cols=3,
+            subplot_titles=[s_title_avg, s_title_best, s_title_worst],
+            horizontal_spacing=0.04,
         )
-        fig_summary.update_yaxes(
-            row=1,
-            col=c_idx,
-            showline=False,
-            showgrid=True,
-            gridwidth=1,
-            gridcolor="rgba(128,128,128,0.2)",
-            zeroline=True,
-            tickfont=dict(color="#fdfefe"),
-            range=[0, max_y_value_summary],  # Unified y-axis range for summary
+        _add_bar_traces_for_category_subplot(
+            fig_summary, avg_df, lang, 1, 1, True, s_title_avg
+        )
+        _add_bar_traces_for_category_subplot(
+            fig_summary, best_df, lang, 1, 2, False, s_title_best
+        )
+        _add_bar_traces_for_category_subplot(
+            fig_summary, worst_df, lang, 1, 3, False, s_title_worst
         )
-    output_figures.append(fig_summary)
+
+        summary_main_title = f"{current_lang_opts['main_title']} - {period} (Summary)"
+        summary_layout_args = dict(
+            title_text=summary_main_title,
+            title_x=0.5,
+            title_font_size=title_font_size,
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="top",
+                y=-0.2,
+                xanchor="center",
+                x=0.5,
+                font_size=legend_font_size,
+                bgcolor="rgba(0,0,0,0)",
+            ),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            font_color="#fdfefe",
+            height=summary_fig_height,
+            margin=dict(t=margin_top, b=margin_bottom, l=margin_left, r=margin_right),
+        )
+        if plot_width:
+            summary_layout_args.update({"width": plot_width, "autosize": False})
+        else:
+            summary_layout_args["autosize"] = True
+        fig_summary.update_layout(**summary_layout_args)
+        fig_summary.update_annotations(
+            font_size=subplot_title_font_size
+        )  # For subplot titles
+        for c_idx in range(1, 4):  # Axes for summary fig with unified y-axis scaling
+            fig_summary.update_xaxes(
+                row=1,
+                col=c_idx,
+                showline=True,
+                linewidth=1,
+                linecolor="#fdfefe",
+                showgrid=False,
+                tickfont=dict(color="#fdfefe", size=10),
+                type="category",
+            )
+            fig_summary.update_yaxes(
+                row=1,
+                col=c_idx,
+                showline=False,
+                showgrid=True,
+                gridwidth=1,
+                gridcolor="rgba(128,128,128,0.2)",
+                zeroline=True,
+                tickfont=dict(color="#fdfefe"),
+                range=[0, max_y_value_summary],  # Unified y-axis range for summary
+            )
+        output_figures.append(fig_summary.build(validate))
 
     # --- Subsequent Figures: Machine Data (3 machines per figure/row) ---
     sorted_machines_df = pd.DataFrame()
@@ -685,13 +719,13 @@ def create_chart4_figure_detail(
         col in all_machine_df.columns for col in metrics_db_keys + ["machine_name"]
     ):
         try:
-            for col in metrics_db_keys:
-                all_machine_df[col] = pd.to_numeric(
-                    all_machine_df[col], errors="coerce"
-                )
-            all_machine_df = all_machine_df.fillna(0)
-            all_machine_df["total_consumption"] = all_machine_df[metrics_db_keys].sum(
-                axis=1
+            # Metrics are typed and zero-filled by the chart 4 schema at fetch
+            # time; this is a no-op for those frames
+            all_machine_df = normalize_frame(
+                all_machine_df, CHART_SCHEMAS["chart-4-data-store"]
+            )
+            all_machine_df = all_machine_df.assign(
+                total_consumption=all_machine_df[metrics_db_keys].sum(axis=1)
             )
             sorted_machines_df = all_machine_df.sort_values(
                 by=["total_consumption", "machine_name"], ascending=[True, True]
@@ -704,7 +738,13 @@ def create_chart4_figure_detail(
         )
 
     num_machines = len(sorted_machines_df)
-    for i in range(0, num_machines, machines_per_row_fig):
+    first_machine = row_start * machines_per_row_fig
+    last_machine = (
+        num_machines
+        if row_count is None
+        else min(num_machines, first_machine + row_count * machines_per_row_fig)
+    )
+    for i in range(first_machine, last_machine, machines_per_row_fig):
         chunk_df = sorted_machines_df.iloc[i : i + machines_per_row_fig]
         num_in_chunk = len(chunk_df)
 
@@ -725,7 +765,7 @@ def create_chart4_figure_detail(
                 m_name if len(m_name) < 30 else m_name[:27] + "..."
             )
 
-        fig_machine_row = make_subplots(
+        fig_machine_row = FigureBuilder(
             rows=1,
             cols=machines_per_row_fig,
             subplot_titles=machine_subplot_titles,
@@ -789,10 +829,10 @@ def create_chart4_figure_detail(
                 tickfont=dict(color="#fdfefe"),
                 rangemode="tozero",
             )
-        output_figures.append(fig_machine_row)
+        output_figures.append(fig_machine_row.build(validate))
 
     if (
-        not output_figures
+        not output_figures and include_summary
     ):  # Should only happen if even summary fig failed (which implies error list was already returned)
         logger.warning(
             f"No figures generated for chart4_figure_detail, '{period}'. Returning error."
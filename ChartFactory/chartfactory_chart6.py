@@ -1,13 +1,14 @@
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from ChartFactory.figure_builder import FigureBuilder, figure_to_dict
 from typing import Dict, Optional, List
 import logging
-import yaml
 import re
 from dash import html
 import dash_bootstrap_components as dbc
-
+from Database.resource_cache import resource_cache
+from Database.stop_reason_topk import compute_top_reasons, top_reasons_by_machine
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,13 @@ def _make_figure_empty_looking(fig: go.Figure):
     fig.data = []
 
 
+REASON_MAPPING_PATH = "env/chart6_reason_txt.yml"
+
+
 def _load_reason_mapping():
-    """Load the reason mapping from YAML file."""
+    """Load the reason mapping from YAML file (cached, reloaded when the file changes)."""
     try:
-        with open("env/chart6_reason_txt.yml", "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+        return resource_cache.load_yaml(REASON_MAPPING_PATH) or {}
     except Exception as e:
         logger.error(f"Error loading reason mapping: {e}")
         return {}
@@ -66,9 +69,20 @@ def _extract_reason_number(reason_col):
 
 
 def _get_reason_display_name(reason_col, reason_mapping):
-    """Get display name for reason from mapping."""
-    reason_number = _extract_reason_number(reason_col)
-    return reason_mapping.get(reason_number, f"Reason {reason_number}")
+    """Get display name for reason from mapping (memoized per reason column)."""
+    try:
+        display_names = resource_cache.derived(
+            REASON_MAPPING_PATH, "display_names", lambda _: {}
+        )
+    except Exception:
+        display_names = {}
+    display_name = display_names.get(reason_col)
+    if display_name is None:
+        reason_number = _extract_reason_number(reason_col)
+        display_name = reason_mapping.get(reason_number, f"Reason {reason_number}")
+        if reason_mapping:
+            display_names[reason_col] = display_name
+    return display_name
 
 
 def create_chart6_figure(
@@ -587,7 +601,14 @@ def create_chart6_figure_mobile(period: str, dfs: Dict[str, Dict[str, pd.DataFra
     return create_chart6_figure(period, dfs)
 
 
-def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFrame]]):
+def create_chart6_figure_detail(
+    period: str,
+    dfs: Dict[str, Dict[str, pd.DataFrame]],
+    include_summary: bool = True,
+    row_start: int = 0,
+    row_count: Optional[int] = None,
+    validate: bool = False,
+):
     """Generate a list of detailed figures for Chart-6.
 
     output_figures[0]: Highest / Lowest machines – 2 sub-plots in one figure (delegated to
@@ -595,7 +616,15 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
 
     output_figures[1...N]: Machine specific stop-reason bar charts. 3 machines are plotted
     per figure (1×3 sub-plots).  For each machine only the non-zero/top reasons are
-    displayed (maximum five per machine) to keep the charts clean.
+    displayed (maximum five per machine, read from the 'top_reasons' table built by
+    the fetcher) to keep the charts clean.
+
+    include_summary / row_start / row_count select a page of the output: the summary
+    figure is built only when include_summary is True, and only machine figures
+    row_start ... row_start + row_count - 1 (0-based, 3 machines each) are built.
+
+    Figures are returned as plain dicts (machine rows are assembled with
+    FigureBuilder); pass validate=True to get validated go.Figure objects instead.
     """
 
     # ----- Helper : error figure list ----- #
@@ -658,68 +687,73 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
     output_figures: List[go.Figure] = []
 
     # ----- Figure 0 : Highest vs Lowest ----- #
-    try:
-        fig_summary = create_chart6_figure(period, dfs)
-
-        # Estimate height (title + legend etc.)
-        summary_fig_height = row_height_px + title_font_size + legend_font_size + 40
-
-        summary_layout_args = dict(
-            title_font_size=title_font_size,
-            height=summary_fig_height,
-            margin=dict(t=margin_top, b=margin_bottom, l=margin_left, r=margin_right),
-        )
-        if plot_width is not None:
-            summary_layout_args.update({"width": plot_width, "autosize": False})
-        else:
-            summary_layout_args["autosize"] = True
-
-        # Add subplot titles for Highest and Lowest machines
-        machine_name_highest = (
-            df_highest.iloc[0].get("machine_name", "Unknown")
-            if df_highest is not None and not df_highest.empty
-            else "Unknown"
-        )
-        machine_name_lowest = (
-            df_lowest.iloc[0].get("machine_name", "Unknown")
-            if df_lowest is not None and not df_lowest.empty
-            else "Unknown"
-        )
-
-        highest_title = f"停机时数最高 - {machine_name_highest}"
-        lowest_title = f"停机时数最低 - {machine_name_lowest}"
-
-        # Remove any existing annotations (summary fig has no subplot titles by default)
-        # Then add our custom titles positioned roughly above each subplot
-        fig_summary.update_layout(**summary_layout_args)
+    if include_summary:
+        try:
+            fig_summary = create_chart6_figure(period, dfs)
+
+            # Estimate height (title + legend etc.)
+            summary_fig_height = row_height_px + title_font_size + legend_font_size + 40
+
+            summary_layout_args = dict(
+                title_font_size=title_font_size,
+                height=summary_fig_height,
+                margin=dict(
+                    t=margin_top, b=margin_bottom, l=margin_left, r=margin_right
+                ),
+            )
+            if plot_width is not None:
+                summary_layout_args.update({"width": plot_width, "autosize": False})
+            else:
+                summary_layout_args["autosize"] = True
+
+            # Add subplot titles for Highest and Lowest machines
+            machine_name_highest = (
+                df_highest.iloc[0].get("machine_name", "Unknown")
+                if df_highest is not None and not df_highest.empty
+                else "Unknown"
+            )
+            machine_name_lowest = (
+                df_lowest.iloc[0].get("machine_name", "Unknown")
+                if df_lowest is not None and not df_lowest.empty
+                else "Unknown"
+            )
 
-        # Coordinates are approximate: x=0.25 (first subplot center), x=0.75 (second)
-        fig_summary.add_annotation(
-            text=lowest_title,
-            x=0.75,
-            y=1.08,
-            xref="paper",
-            yref="paper",
-            showarrow=False,
-            font=dict(size=subplot_title_font_size, color="#fdfefe"),
-        )
-        fig_summary.add_annotation(
-            text=highest_title,
-            x=0.25,
-            y=1.08,
-            xref="paper",
-            yref="paper",
-            showarrow=False,
-            font=dict(size=subplot_title_font_size, color="#fdfefe"),
-        )
+            highest_title = f"停机时数最高 - {machine_name_highest}"
+            lowest_title = f"停机时数最低 - {machine_name_lowest}"
+
+            # Remove any existing annotations (summary fig has no subplot titles by default)
+            # Then add our custom titles positioned roughly above each subplot
+            fig_summary.update_layout(**summary_layout_args)
+
+            # Coordinates are approximate: x=0.25 (first subplot center), x=0.75 (second)
+            fig_summary.add_annotation(
+                text=lowest_title,
+                x=0.75,
+                y=1.08,
+                xref="paper",
+                yref="paper",
+                showarrow=False,
+                font=dict(size=subplot_title_font_size, color="#fdfefe"),
+            )
+            fig_summary.add_annotation(
+                text=highest_title,
+                x=0.25,
+                y=1.08,
+                xref="paper",
+                yref="paper",
+                showarrow=False,
+                font=dict(size=subplot_title_font_size, color="#fdfefe"),
+            )
 
-        # Ensure font size of all annotations matches settings
-        fig_summary.update_annotations(font_size=subplot_title_font_size)
+            # Ensure font size of all annotations matches settings
+            fig_summary.update_annotations(font_size=subplot_title_font_size)
 
-        output_figures.append(fig_summary)
-    except Exception as e:
-        logger.error(f"Error creating summary fig for chart6 detail: {e}")
-        return _create_error_figure_list(f"Summary Figure Error: {period}")
+            output_figures.append(
+                fig_summary if validate else figure_to_dict(fig_summary)
+            )
+        except Exception as e:
+            logger.error(f"Error creating summary fig for chart6 detail: {e}")
+            return _create_error_figure_list(f"Summary Figure Error: {period}")
 
     # If there is no machine data, we are done.
     if df_all_machine is None or df_all_machine.empty:
@@ -754,25 +788,29 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
         "#3498DB",
     ]
 
+    # Top-5 reasons per machine are computed once per snapshot by the fetcher;
+    # fall back to computing them here for data without the long-format table
+    top_reasons = data_for_period.get("top_reasons")
+    if top_reasons is None:
+        top_reasons = compute_top_reasons(df_sorted, k=5)
+    reasons_by_machine = top_reasons_by_machine(top_reasons)
+
     def _get_reason_bars_for_machine(machine_row: pd.Series):
         """Return (display_names, values) for up to top-5 non-zero reasons."""
-        reason_cols = [c for c in machine_row.index if str(c).startswith("reason")]
-        reason_values = {}
-        for col in reason_cols:
-            val = machine_row[col]
-            if pd.notna(val) and val != 0:
-                disp = _get_reason_display_name(col, reason_mapping)
-                reason_values[disp] = val
-
-        # Take top-5 reasons by value
-        sorted_items = sorted(reason_values.items(), key=lambda x: x[1], reverse=True)[
-            :5
+        machine_reasons = reasons_by_machine.get(machine_row.get("machine_name"), [])
+        display_names = [
+            _get_reason_display_name(col, reason_mapping) for col, _ in machine_reasons
         ]
-        display_names = [it[0] for it in sorted_items]
-        values = [it[1] for it in sorted_items]
+        values = [val for _, val in machine_reasons]
         return display_names, values
 
-    for i in range(0, len(df_sorted), machines_per_row_fig):
+    first_machine = row_start * machines_per_row_fig
+    last_machine = (
+        len(df_sorted)
+        if row_count is None
+        else min(len(df_sorted), first_machine + row_count * machines_per_row_fig)
+    )
+    for i in range(first_machine, last_machine, machines_per_row_fig):
         chunk_df = df_sorted.iloc[i : i + machines_per_row_fig]
         num_in_chunk = len(chunk_df)
 
@@ -793,14 +831,13 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
         }
 
         # Build figure for this set of machines
-        fig_machine_row = make_subplots(
+        fig_machine_row = FigureBuilder(
             rows=1,
             cols=num_in_chunk,
             subplot_titles=subplot_titles,
             horizontal_spacing=0.04,
         )
 
-        first_subplot = True  # To control legend duplicates
         max_y_val_chunk = 0.0
 
         for j in range(num_in_chunk):
@@ -809,24 +846,28 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
 
             max_y_val_chunk = max(max_y_val_chunk, max(y_vals) if y_vals else 0)
 
-            for k, reason_name in enumerate(x_vals):
-                fig_machine_row.add_trace(
-                    go.Bar(
-                        x=[reason_name],
-                        y=[y_vals[k]],
-                        name=reason_name,
-                        marker_color=color_mapping_chunk.get(
+            # One trace per machine subplot; bar colors come from the marker array
+            fig_machine_row.add_trace(
+                dict(
+                    type="bar",
+                    x=x_vals,
+                    y=y_vals,
+                    name=subplot_titles[j],
+                    marker_color=[
+                        color_mapping_chunk.get(
                             reason_name, base_colors[k % len(base_colors)]
-                        ),
-                        legendgroup=reason_name,
-                        showlegend=first_subplot,
-                        text=[y_vals[k]],
-                        textposition="auto",
-                    ),
-                    row=1,
-                    col=j + 1,
-                )
-            first_subplot = False  # Legend only for first subplot
+                        )
+                        for k, reason_name in enumerate(x_vals)
+                    ],
+                    showlegend=False,
+                    # Strings, as go.Bar's validator would make them
+                    text=[str(val) for val in y_vals],
+                    textposition="auto",
+                    hoverinfo="x+y",
+                ),
+                row=1,
+                col=j + 1,
+            )
 
         # Y-axis scaling
         y_max = max_y_val_chunk * 1.1 if max_y_val_chunk > 0 else 10
@@ -840,16 +881,7 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
             title_text=f"{period} Stop Reasons – Machines {i+1}-{i+num_in_chunk}",
             title_x=0.5,
             title_font_size=title_font_size,
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="top",
-                y=-0.2,
-                xanchor="center",
-                x=0.5,
-                font_size=legend_font_size,
-                bgcolor="rgba(0,0,0,0)",
-            ),
+            showlegend=False,  # Reason names are shown as x-axis categories
             paper_bgcolor="rgba(0,0,0,0)",
             plot_bgcolor="rgba(0,0,0,0)",
             font_color="#fdfefe",
@@ -864,9 +896,9 @@ def create_chart6_figure_detail(period: str, dfs: Dict[str, Dict[str, pd.DataFra
         fig_machine_row.update_layout(**machine_row_layout_args)
         fig_machine_row.update_annotations(font_size=subplot_title_font_size)
 
-        output_figures.append(fig_machine_row)
+        output_figures.append(fig_machine_row.build(validate))
 
-    if not output_figures:
+    if not output_figures and include_summary:
         logger.warning(
             f"No figures generated for chart6_figure_detail, '{period}'. Returning error."
         )
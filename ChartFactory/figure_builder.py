@@ -0,0 +1,238 @@
+import copy
+import logging
+from typing import Dict, List, Optional
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+logger = logging.getLogger(__name__)
+
+# Property names that really contain an underscore (not "magic underscore" paths)
+_UNDERSCORE_PROPS = {
+    "error_x",
+    "error_y",
+    "error_z",
+    "paper_bgcolor",
+    "plot_bgcolor",
+    "copy_ystyle",
+    "copy_zstyle",
+}
+
+_default_template = None
+
+
+def _get_default_template() -> dict:
+    """Plain-dict copy of the active plotly template (what go.Figure embeds)."""
+    global _default_template
+    if _default_template is None:
+        _default_template = pio.templates[pio.templates.default].to_plotly_json()
+    return _default_template
+
+
+def _merge(target: dict, updates: dict):
+    """Recursively merge *updates* into *target* (plotly update semantics)."""
+    for key, value in updates.items():
+        if key in _UNDERSCORE_PROPS or "_" not in key:
+            path = [key]
+        else:
+            path = key.split("_")
+            # Keep real underscore names intact, e.g. "error_y_color" -> error_y.color
+            for i in range(len(path) - 1):
+                if "_".join(path[i : i + 2]) in _UNDERSCORE_PROPS:
+                    path[i : i + 2] = ["_".join(path[i : i + 2])]
+                    break
+        node = target
+        for part in path[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        last = path[-1]
+        if isinstance(value, dict):
+            child = node.get(last)
+            if not isinstance(child, dict):
+                child = node[last] = {}
+            _merge(child, value)
+        else:
+            node[last] = value
+
+
+def _to_plain(trace) -> dict:
+    """Return a trace as a plain dict, expanding magic underscore keys."""
+    if isinstance(trace, dict):
+        plain = {}
+        _merge(plain, trace)
+        return plain
+    return trace.to_plotly_json()
+
+
+class FigureBuilder:
+    """
+    Lightweight stand-in for go.Figure / make_subplots.
+
+    Assembles the figure as plain data/layout dicts without plotly's per-call
+    property validation. It mirrors the subset of the plotly API used by the
+    chart factories (add_trace, update_layout, update_xaxes, update_yaxes,
+    add_annotation, update_annotations) and reproduces make_subplots' axis
+    domains and subplot titles, so both paths render the same figure.
+
+    Use to_dict() for the fast path (dcc.Graph accepts plain dicts) or
+    to_figure() to validate the result once as a go.Figure.
+    """
+
+    def __init__(
+        self,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+        subplot_titles: Optional[List[str]] = None,
+        horizontal_spacing: Optional[float] = None,
+        vertical_spacing: Optional[float] = None,
+        specs: Optional[List[List[dict]]] = None,
+    ):
+        self.data: List[dict] = []
+        self.layout: Dict = {"template": _get_default_template()}
+        self._grid = {}
+        if rows is not None or cols is not None:
+            self._make_grid(
+                rows or 1,
+                cols or 1,
+                subplot_titles,
+                horizontal_spacing,
+                vertical_spacing,
+                specs,
+            )
+
+    def _make_grid(
+        self, rows, cols, subplot_titles, horizontal_spacing, vertical_spacing, specs
+    ):
+        """Compute subplot domains the same way plotly.subplots.make_subplots does."""
+        if horizontal_spacing is None:
+            horizontal_spacing = 0.2 / cols
+        if vertical_spacing is None:
+            vertical_spacing = 0.3 / rows
+        width = (1.0 - horizontal_spacing * (cols - 1)) / cols
+        height = (1.0 - vertical_spacing * (rows - 1)) / rows
+
+        annotations = []
+        subplot_titles = list(subplot_titles or [])
+        index = 0
+        for r in range(1, rows + 1):
+            y_top = 1.0 - (r - 1) * (height + vertical_spacing)
+            y_domain = [y_top - height, y_top]
+            for c in range(1, cols + 1):
+                x_start = (c - 1) * (width + horizontal_spacing)
+                x_domain = [x_start, x_start + width]
+                spec = specs[r - 1][c - 1] if specs else None
+                is_domain = bool(spec) and spec.get("type") in ("domain", "pie")
+
+                if is_domain:
+                    self._grid[(r, c)] = {"domain": {"x": x_domain, "y": y_domain}}
+                else:
+                    index += 1
+                    suffix = "" if index == 1 else str(index)
+                    self.layout[f"xaxis{suffix}"] = {
+                        "anchor": f"y{suffix}",
+                        "domain": x_domain,
+                    }
+                    self.layout[f"yaxis{suffix}"] = {
+                        "anchor": f"x{suffix}",
+                        "domain": y_domain,
+                    }
+                    self._grid[(r, c)] = {"xaxis": f"x{suffix}", "yaxis": f"y{suffix}"}
+
+                title_pos = (r - 1) * cols + (c - 1)
+                if title_pos < len(subplot_titles) and subplot_titles[title_pos]:
+                    annotations.append(
+                        {
+                            "font": {"size": 16},
+                            "showarrow": False,
+                            "text": subplot_titles[title_pos],
+                            "x": (x_domain[0] + x_domain[1]) / 2,
+                            "xanchor": "center",
+                            "xref": "paper",
+                            "y": y_domain[1],
+                            "yanchor": "bottom",
+                            "yref": "paper",
+                        }
+                    )
+        if annotations:
+            self.layout["annotations"] = annotations
+
+    def _axis_names(self, axis: str, row=None, col=None) -> List[str]:
+        names = []
+        for (r, c), cell in self._grid.items():
+            if axis not in cell:
+                continue
+            if (row is None or r == row) and (col is None or c == col):
+                names.append(cell[axis].replace(axis[0], f"{axis[0]}axis", 1))
+        if not self._grid and row is None and col is None:
+            names.append(f"{axis[0]}axis")
+        return names
+
+    def add_trace(self, trace, row: Optional[int] = None, col: Optional[int] = None):
+        """Add a trace (plain dict or plotly trace object) to the figure."""
+        plain = _to_plain(trace)
+        if row is not None and col is not None:
+            plain.update(self._grid[(row, col)])
+        self.data.append(plain)
+        return self
+
+    def add_traces(self, traces, rows=None, cols=None):
+        for i, trace in enumerate(traces):
+            self.add_trace(
+                trace,
+                row=rows[i] if rows is not None else None,
+                col=cols[i] if cols is not None else None,
+            )
+        return self
+
+    def update_layout(self, dict1: Optional[dict] = None, **kwargs):
+        updates = dict(dict1 or {}, **kwargs)
+        if "template" in updates:
+            # The default template is shared between builders: replace, never merge
+            self.layout["template"] = updates.pop("template")
+        _merge(self.layout, updates)
+        return self
+
+    def update_xaxes(self, dict1: Optional[dict] = None, row=None, col=None, **kwargs):
+        for name in self._axis_names("xaxis", row, col):
+            _merge(self.layout.setdefault(name, {}), dict(dict1 or {}, **kwargs))
+        return self
+
+    def update_yaxes(self, dict1: Optional[dict] = None, row=None, col=None, **kwargs):
+        for name in self._axis_names("yaxis", row, col):
+            _merge(self.layout.setdefault(name, {}), dict(dict1 or {}, **kwargs))
+        return self
+
+    def add_annotation(self, dict1: Optional[dict] = None, **kwargs):
+        annotation = {}
+        _merge(annotation, dict(dict1 or {}, **kwargs))
+        self.layout.setdefault("annotations", []).append(annotation)
+        return self
+
+    def update_annotations(self, dict1: Optional[dict] = None, **kwargs):
+        for annotation in self.layout.get("annotations", []):
+            _merge(annotation, dict(dict1 or {}, **kwargs))
+        return self
+
+    def to_dict(self) -> dict:
+        """Return the figure as a plain {"data": [...], "layout": {...}} dict."""
+        return {"data": self.data, "layout": self.layout}
+
+    def to_figure(self) -> go.Figure:
+        """Return the figure as a validated go.Figure."""
+        return go.Figure(
+            {"data": self.data, "layout": copy.deepcopy(self.layout)},
+            skip_invalid=False,
+        )
+
+    def build(self, validate: bool = False):
+        """Return a go.Figure when *validate* is True, otherwise the plain dict."""
+        return self.to_figure() if validate else self.to_dict()
+
+
+def figure_to_dict(fig) -> dict:
+    """Return a go.Figure (or an already plain figure dict) as a plain dict."""
+    if isinstance(fig, dict):
+        return fig
+    return fig.to_plotly_json()
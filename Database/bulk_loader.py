@@ -0,0 +1,337 @@
+"""
+Bulk loader for the dashboard tables, replacing the row-by-row INSERT scripts
+(sql/import_db*.sql, sql/import_data_newchart5tbl*.sql) for seeding and
+refreshing data.
+
+Loads CSV / Parquet files (or a synthetic plant, see Database/synthetic_data.py)
+into existing tables of the configured backend, in batched transactions:
+- SQL Server: pyodbc fast_executemany (DatabaseConnection enables it), or
+  BULK INSERT when --bulk-dir names a share the server can read
+- MySQL: multi-row INSERTs (pymysql batches executemany), or
+  LOAD DATA LOCAL INFILE with --method load-data (needs local_infile=ON)
+- SQLite: executemany
+
+Create the tables first with the DDL part of the import scripts
+(sql/import_db_sqlite.sql for SQLite).
+
+Usage (from the project root):
+    python -m Database.bulk_loader data/batch_queued.csv machine_status=status.parquet
+    python -m Database.bulk_loader --synthetic 1000 --weeks 4 --replace
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+METHODS = ("auto", "executemany", "load-data", "bulk-insert")
+
+
+def read_source(path: str) -> pd.DataFrame:
+    """Read a CSV (UTF-8, header row) or Parquet file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return pd.read_parquet(path)
+    if extension in (".csv", ".txt"):
+        # Keep empty strings as strings, numeric / date columns are coerced
+        # against the table schema in align_to_table()
+        return pd.read_csv(
+            path,
+            encoding="utf-8-sig",
+            dtype=str,
+            keep_default_na=False,
+            na_values=["NULL", "\\N"],
+        )
+    raise ValueError(f"Unsupported source file type: {path}")
+
+
+def _python_type(column_type):
+    try:
+        return column_type.python_type
+    except NotImplementedError:
+        return str
+
+
+def align_to_table(df: pd.DataFrame, columns: list, table: str) -> pd.DataFrame:
+    """
+    Order and convert `df` for `table`.
+
+    Args:
+        df: Source rows.
+        columns: Column dicts of the table (sqlalchemy inspector get_columns).
+        table: Table name, for log messages.
+
+    Returns:
+        pd.DataFrame: Every table column in table order (missing ones NULL),
+            numbers and dates parsed (integers as nullable Int64).
+    """
+    names = [column["name"] for column in columns]
+    extra = [c for c in df.columns if c not in names]
+    missing = [c for c in names if c not in df.columns]
+    if extra:
+        logger.warning(f"{table}: ignoring columns not in the table: {extra}")
+    if missing:
+        logger.warning(f"{table}: columns missing from the source: {missing}")
+
+    aligned = df.reindex(columns=names)
+    for column in columns:
+        name = column["name"]
+        python_type = _python_type(column["type"])
+        series = aligned[name]
+        if python_type is datetime:
+            aligned[name] = pd.to_datetime(series, errors="coerce")
+        elif python_type is int:
+            aligned[name] = pd.to_numeric(series, errors="coerce").astype("Int64")
+        elif issubclass(python_type, (float, Decimal)):
+            aligned[name] = pd.to_numeric(series, errors="coerce")
+    return aligned
+
+
+def _batches(df: pd.DataFrame, batch_size: int):
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start : start + batch_size]
+
+
+def _load_executemany(db, table, df, batch_size):
+    """One INSERT executemany per batch, each batch in its own transaction."""
+    batches = 0
+    for batch in _batches(df, batch_size):
+        with db.engine.begin() as conn:
+            batch.to_sql(table, conn, if_exists="append", index=False)
+        batches += 1
+        logger.debug(f"{table}: batch {batches} ({len(batch)} rows) committed")
+    return batches
+
+
+def _write_csv(
+    df: pd.DataFrame, path: str, null_marker: str, date_format: str, escape=False
+):
+    if escape:
+        # LOAD DATA reads backslash escapes, so literal backslashes are doubled
+        df = df.copy()
+        for name in df.columns:
+            if df[name].map(lambda v: isinstance(v, str) and "\\" in v).any():
+                df[name] = df[name].map(
+                    lambda v: v.replace("\\", "\\\\") if isinstance(v, str) else v
+                )
+    df.to_csv(
+        path,
+        index=False,
+        encoding="utf-8",
+        na_rep=null_marker,
+        date_format=date_format,
+        lineterminator="\n",
+    )
+
+
+def _load_data_infile(db, table, df, batch_size):
+    """MySQL LOAD DATA LOCAL INFILE, one file and transaction per batch."""
+    engine = create_engine(
+        db.engine.url,
+        poolclass=NullPool,
+        connect_args={"charset": "utf8mb4", "local_infile": True},
+    )
+    column_list = ", ".join(f"`{name}`" for name in df.columns)
+    batches = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"{table}.csv")
+        for batch in _batches(df, batch_size):
+            _write_csv(
+                batch,
+                path,
+                null_marker="\\N",
+                date_format="%Y-%m-%d %H:%M:%S.%f",
+                escape=True,
+            )
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{table}` "
+                    "CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    "ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                    f"IGNORE 1 LINES ({column_list})"
+                )
+            batches += 1
+    engine.dispose()
+    return batches
+
+
+def _bulk_insert(db, table, df, batch_size, bulk_dir):
+    """SQL Server BULK INSERT from a CSV written to a share the server reads."""
+    path = os.path.join(bulk_dir, f"{table}-{uuid.uuid4().hex}.csv")
+    # BULK INSERT maps fields by position and reads empty fields as NULL;
+    # [datetime] only parses up to milliseconds, so seconds are written
+    _write_csv(df, path, null_marker="", date_format="%Y-%m-%d %H:%M:%S")
+    try:
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"BULK INSERT [dbo].[{table}] FROM '{path}' WITH ("
+                "FORMAT = 'CSV', FIRSTROW = 2, CODEPAGE = '65001', "
+                f"FIELDQUOTE = '\"', ROWTERMINATOR = '0x0a', BATCHSIZE = {batch_size}, "
+                "TABLOCK)"
+            )
+    finally:
+        os.remove(path)
+    return -(-len(df) // batch_size)
+
+
+def _resolve_method(db, method, bulk_dir):
+    if method == "auto":
+        return "bulk-insert" if bulk_dir and db.backend == "mssql" else "executemany"
+    if method == "load-data" and db.backend != "mysql":
+        raise ValueError("--method load-data is only supported on MySQL")
+    if method == "bulk-insert" and (db.backend != "mssql" or not bulk_dir):
+        raise ValueError("--method bulk-insert needs SQL Server and --bulk-dir")
+    return method
+
+
+def load_dataframe(
+    db,
+    table: str,
+    df: pd.DataFrame,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    replace: bool = False,
+    method: str = "auto",
+    bulk_dir: str = None,
+) -> dict:
+    """
+    Bulk load `df` into an existing table.
+
+    Args:
+        db: DatabaseConnection of the target database.
+        table: Table name.
+        df: Rows to load, columns named like the table's.
+        batch_size: Rows per batch / transaction.
+        replace: Delete the table's rows first.
+        method: "auto", "executemany", "load-data" (MySQL) or "bulk-insert" (SQL Server).
+        bulk_dir: Directory shared with SQL Server for BULK INSERT.
+
+    Returns:
+        dict: Table, method, rows, batches, seconds and rows_per_second.
+    """
+    method = _resolve_method(db, method, bulk_dir)
+    inspector = inspect(db.engine)
+    if not inspector.has_table(table):
+        logger.error(f"Table {table} does not exist in the {db.backend_label} database")
+        raise ValueError(f"Unknown table: {table}")
+    df = align_to_table(df, inspector.get_columns(table), table)
+
+    start = time.perf_counter()
+    if replace:
+        with db.engine.begin() as conn:
+            deleted = conn.execute(text(f"DELETE FROM {table}")).rowcount
+        logger.info(f"{table}: deleted {deleted} rows")
+
+    if method == "load-data":
+        batches = _load_data_infile(db, table, df, batch_size)
+    elif method == "bulk-insert":
+        batches = _bulk_insert(db, table, df, batch_size, bulk_dir)
+    else:
+        batches = _load_executemany(db, table, df, batch_size)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "table": table,
+        "method": method,
+        "rows": len(df),
+        "batches": batches,
+        "seconds": seconds,
+        "rows_per_second": len(df) / seconds if seconds else 0.0,
+    }
+    logger.info(
+        f"{table}: loaded {len(df)} rows in {batches} batches, {seconds:.2f}s "
+        f"({stats['rows_per_second']:.0f} rows/s, {method})"
+    )
+    return stats
+
+
+def _parse_source(source: str):
+    """`table=path` or `path` (table named after the file)."""
+    if "=" in source:
+        table, path = source.split("=", 1)
+    else:
+        path = source
+        table = os.path.splitext(os.path.basename(path))[0]
+    return table, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load dashboard tables")
+    parser.add_argument("sources", nargs="*", help="path or table=path (CSV/Parquet)")
+    parser.add_argument(
+        "--synthetic", type=int, metavar="MACHINES", help="Load a synthetic plant"
+    )
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--credentials", help="Defaults to $DASHBOARD_DB_CREDENTIALS")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--replace", action="store_true", help="Delete rows first")
+    parser.add_argument("--method", choices=METHODS, default="auto")
+    parser.add_argument("--bulk-dir", help="Share readable by SQL Server (BULK INSERT)")
+    args = parser.parse_args()
+    if not args.sources and not args.synthetic:
+        parser.error("give source files or --synthetic")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.credentials:
+        # Also for the module-level db instance created on import
+        os.environ["DASHBOARD_DB_CREDENTIALS"] = args.credentials
+    from Database.database_connection import DatabaseConnection
+
+    db = DatabaseConnection()
+
+    frames = {}
+    if args.synthetic:
+        from Database.synthetic_data import generate_tables
+
+        frames.update(generate_tables(args.synthetic, args.weeks, args.seed))
+    for source in args.sources:
+        table, path = _parse_source(source)
+        frames[table] = read_source(path)
+
+    results = []
+    inspector = inspect(db.engine)
+    for table, df in frames.items():
+        if args.synthetic and not inspector.has_table(table):
+            logger.warning(f"Skipping {table}: not in the {db.backend_label} database")
+            continue
+        results.append(
+            load_dataframe(
+                db,
+                table,
+                df,
+                batch_size=args.batch_size,
+                replace=args.replace,
+                method=args.method,
+                bulk_dir=args.bulk_dir,
+            )
+        )
+
+    total_rows = sum(r["rows"] for r in results)
+    total_seconds = sum(r["seconds"] for r in results)
+    print(f"\n{'table':28} {'method':12} {'rows':>10} {'seconds':>9} {'rows/s':>10}")
+    for r in results:
+        print(
+            f"{r['table']:28} {r['method']:12} {r['rows']:>10} "
+            f"{r['seconds']:>9.2f} {r['rows_per_second']:>10.0f}"
+        )
+    if total_seconds:
+        print(
+            f"{'total':28} {'':12} {total_rows:>10} {total_seconds:>9.2f} "
+            f"{total_rows / total_seconds:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+from datetime import datetime, timedelta
+
+CHART5_BUCKET_ENV_VAR = "DASHBOARD_CHART5_BUCKET_MINUTES"
+
+# start_time windows of chart 5, relative to now
+CHART5_TIME_WINDOWS = {
+    "24_hrs": {  # current time +/- 12 hours
+        "min_offset_from_now": timedelta(hours=-12),
+        "max_offset_from_now": timedelta(hours=12),
+    },
+    "48_hrs": {  # starts 24 hours ago, duration 48 hours (ends +24h from now)
+        "min_offset_from_now": timedelta(hours=-24),
+        "max_offset_from_now": timedelta(hours=24),
+    },
+    "72_hrs": {  # starts 24 hours ago, duration 72 hours (ends +48h from now)
+        "min_offset_from_now": timedelta(hours=-24),
+        "max_offset_from_now": timedelta(hours=48),
+    },
+}
+
+# "now" of chart 5 is floored to this bucket, so its queries, axis ticks and
+# figures stay the same (and shareable) for every refresh inside a bucket
+CHART5_BUCKET = timedelta(minutes=float(os.environ.get(CHART5_BUCKET_ENV_VAR, 5)))
+
+
+def bucket_now(now: datetime = None) -> datetime:
+    """`now` (default: the current time) floored to CHART5_BUCKET."""
+    now = now or datetime.now()
+    bucket_seconds = CHART5_BUCKET.total_seconds()
+    if bucket_seconds <= 0:
+        return now.replace(microsecond=0)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = (now - midnight).total_seconds()
+    return midnight + timedelta(seconds=elapsed - elapsed % bucket_seconds)
+
+
+def chart5_window(option: str, now: datetime) -> tuple:
+    """
+    (min, max) start_time of a chart 5 window around `now`.
+
+    Unknown options get the 24_hrs window.
+    """
+    config = CHART5_TIME_WINDOWS.get(option, CHART5_TIME_WINDOWS["24_hrs"])
+    return now + config["min_offset_from_now"], now + config["max_offset_from_now"]
@@ -0,0 +1,153 @@
+import logging
+from typing import Dict, Optional
+
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_integer_dtype,
+    is_numeric_dtype,
+)
+
+logger = logging.getLogger(__name__)
+
+# Column contract per chart data store.
+#   dtype   : "datetime" | "float" | "int" | "str"
+#   fill    : value used for missing entries (optional)
+#   required: rows missing this column's value are dropped (optional)
+# Columns that are absent from a frame are ignored, so one schema covers every
+# frame of a chart (avg / best / worst / all_machine ...).
+CHART_SCHEMAS: Dict[str, Dict[str, dict]] = {
+    "chart-1-data-store": {
+        "run": {"dtype": "float"},
+        "idle": {"dtype": "float"},
+        "down": {"dtype": "float"},
+        "repair": {"dtype": "float"},
+        "order_index": {"dtype": "int"},
+    },
+    "chart-3-data-store": {
+        "date": {"dtype": "datetime", "required": True},
+        "weight_kg": {"dtype": "float", "required": True},
+        "order_index": {"dtype": "int"},
+        "machine_name": {"dtype": "str"},
+    },
+    "chart-4-data-store": {
+        "water_ton": {"dtype": "float", "fill": 0.0},
+        "power_kwh": {"dtype": "float", "fill": 0.0},
+        "steam_ton": {"dtype": "float", "fill": 0.0},
+        "order_index": {"dtype": "int"},
+    },
+    "chart-5-data-store": {
+        "machine_name": {"dtype": "str", "required": True},
+        "state": {"dtype": "str", "required": True},
+        "start_time": {"dtype": "datetime", "required": True},
+        "expected_run_minutes": {"dtype": "float", "required": True},
+        "color": {"dtype": "float", "required": True},
+        "action_name": {"dtype": "str", "fill": "Activity"},
+    },
+    "chart-6-data-store": {
+        "run_hour": {"dtype": "float", "fill": 0.0},
+        "sum_hour": {"dtype": "float", "fill": 0.0},
+        "idle_hour": {"dtype": "float", "fill": 0.0},
+        "order_index": {"dtype": "int"},
+    },
+}
+
+
+def _has_dtype(series: pd.Series, dtype: str) -> bool:
+    """Whether the column already satisfies the contract (no cast needed)."""
+    if dtype == "datetime":
+        return is_datetime64_any_dtype(series)
+    if dtype == "float":
+        return is_numeric_dtype(series) and not is_bool_dtype(series)
+    if dtype == "int":
+        return is_integer_dtype(series)
+    if dtype == "str":
+        return series.dtype == object
+    return True
+
+
+def _cast(series: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "datetime":
+        return pd.to_datetime(series, errors="coerce")
+    if dtype == "float":
+        return pd.to_numeric(series, errors="coerce").astype("float64")
+    if dtype == "int":
+        numeric = pd.to_numeric(series, errors="coerce")
+        # Keep floats when values are missing; int64 cannot hold NaN
+        return numeric.astype("int64") if numeric.notna().all() else numeric
+    if dtype == "str":
+        return series.astype(object)
+    return series
+
+
+def normalize_frame(df: pd.DataFrame, schema: Dict[str, dict]) -> pd.DataFrame:
+    """
+    Apply a column contract to a DataFrame with vectorized casts.
+
+    Columns that already have the expected dtype are left untouched, so an
+    already normalized frame passes through without being re-parsed.
+
+    Args:
+        df: Frame to normalize. It is never modified in place.
+        schema: Column contract, see CHART_SCHEMAS.
+
+    Returns:
+        pd.DataFrame: The normalized frame (the input itself when nothing changed).
+    """
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return df
+
+    out = df
+    required = []
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        changed = False
+        dtype = spec.get("dtype")
+        if not _has_dtype(series, dtype):
+            series = _cast(series, dtype)
+            changed = True
+        if "fill" in spec and series.isna().any():
+            series = series.fillna(spec["fill"])
+            changed = True
+        if changed:
+            if out is df:
+                out = df.copy()
+            out[col] = series
+        if spec.get("required"):
+            required.append(col)
+
+    if required:
+        missing = out[required].isna().any(axis=1)
+        if missing.any():
+            logger.debug(f"Dropping {int(missing.sum())} rows missing {required}")
+            out = out[~missing].copy()
+    return out
+
+
+def normalize_chart_data(chart_key: str, chart_data: Optional[dict]) -> Optional[dict]:
+    """
+    Normalize every DataFrame of a chart data store entry ({period: {key: df}}).
+
+    Args:
+        chart_key: Data store id, e.g. "chart-5-data-store".
+        chart_data: The chart's nested dict of DataFrames.
+
+    Returns:
+        dict: The same structure with normalized frames.
+    """
+    schema = CHART_SCHEMAS.get(chart_key)
+    if schema is None or not isinstance(chart_data, dict):
+        return chart_data
+
+    normalized = {}
+    for period, period_data in chart_data.items():
+        if not isinstance(period_data, dict):
+            normalized[period] = period_data
+            continue
+        normalized[period] = {
+            key: normalize_frame(value, schema) for key, value in period_data.items()
+        }
+    return normalized
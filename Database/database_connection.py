@@ -5,9 +5,10 @@ import pandas as pd
 import urllib.parse
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import QueuePool
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from contextlib import contextmanager
 import os
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -15,12 +16,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Points DatabaseConnection at another credentials file, e.g. a local SQLite
+# stand-in created by Database/synthetic_data.py
+CREDENTIALS_ENV_VAR = "DASHBOARD_DB_CREDENTIALS"
+DEFAULT_CREDENTIALS_PATH = "env/db_credentials.yml"
+
+# `backend` values of the credentials file and their display names
+BACKEND_LABELS = {
+    "mssql": "SQL Server",
+    "mysql": "MySQL",
+    "sqlite": "SQLite",
+}
+
+# Pool defaults for the server backends, each overridable in the credentials
+# file. LIFO reuse keeps a few connections hot and lets the rest idle out.
+POOL_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,  # Recycle connections every 30 minutes
+    "pool_use_lifo": True,
+}
+
+# Version / server / database queries used by test_connection()
+TEST_QUERIES = {
+    "mssql": "SELECT @@VERSION as version, @@SERVERNAME as server_name, DB_NAME() as database_name",
+    "mysql": "SELECT VERSION() as version, @@hostname as server_name, DATABASE() as database_name",
+    "sqlite": "SELECT 'SQLite ' || sqlite_version() as version, 'local' as server_name, '' as database_name",
+}
+
+# Seconds the dashboard reads from the primary after the read replica failed,
+# before the replica is tried again (`replica_retry_seconds` in the credentials)
+REPLICA_RETRY_SECONDS = 60
+
 
 class DatabaseConnection:
-    def __init__(self, credentials_path="env/db_credentials.yml"):
-        """Initialize MS SQL Server database connection with credentials from YAML file."""
+    def __init__(self, credentials_path=None):
+        """
+        Initialize database connection with credentials from YAML file.
+
+        The credentials file defaults to $DASHBOARD_DB_CREDENTIALS, then
+        env/db_credentials.yml. Its optional `backend` key selects the engine:
+        "mssql" (default), "mysql" or "sqlite" (`database` is then the file path).
+        Pool settings (pool_size, max_overflow, pool_timeout, pool_recycle)
+        may be overridden there too.
+
+        The dashboard only reads, so its queries (execute_query,
+        execute_sql_file) can be routed away from the primary:
+        - `read_replica`: `true` to connect again with ApplicationIntent=ReadOnly
+          (an availability group listener routes that to a readable secondary),
+          or a mapping of the keys that differ for the replica (host, port, ...).
+          Reads fall back to the primary while the replica is unreachable.
+        - `read_isolation`: isolation level of the reads, e.g. "SNAPSHOT" or
+          "READ UNCOMMITTED", so they do not wait on the writers' locks.
+        Writes (execute_non_query) always go to the primary.
+        """
+        if credentials_path is None:
+            credentials_path = os.environ.get(
+                CREDENTIALS_ENV_VAR, DEFAULT_CREDENTIALS_PATH
+            )
         self.credentials = self._load_credentials(credentials_path)
+        self.backend = str(self.credentials.get("backend", "mssql")).lower()
+        if self.backend not in BACKEND_LABELS:
+            logger.error(
+                f"Unknown database backend {self.backend!r}, "
+                f"expected one of {', '.join(BACKEND_LABELS)}"
+            )
+            raise ValueError(f"Unknown database backend: {self.backend}")
+        self.backend_label = BACKEND_LABELS[self.backend]
         self.engine = self._create_engine()
+        self.read_isolation = self.credentials.get("read_isolation")
+        self.replica_retry_seconds = self.credentials.get(
+            "replica_retry_seconds", REPLICA_RETRY_SECONDS
+        )
+        self.read_engine = self._create_read_engine()
+        self._replica_down_until = 0.0
 
     def _load_credentials(self, credentials_path):
         """Load database credentials from YAML file."""
@@ -34,18 +104,48 @@ class DatabaseConnection:
             logger.error(f"Error parsing credentials file: {e}")
             raise
 
-    def _create_engine(self):
+    def _create_engine(self, credentials=None, read_only=False):
+        """Create SQLAlchemy engine for the configured backend."""
+        credentials = credentials or self.credentials
+        if self.backend == "sqlite":
+            return self._create_sqlite_engine(credentials)
+        if self.backend == "mysql":
+            return self._create_mysql_engine(credentials)
+        return self._create_mssql_engine(credentials, read_only)
+
+    def _create_read_engine(self):
+        """Engine of the read replica, None when reads go to the primary."""
+        replica = self.credentials.get("read_replica")
+        if not replica:
+            return None
+        overrides = replica if isinstance(replica, dict) else {}
+        logger.info(f"Dashboard reads are routed to a {self.backend_label} replica")
+        return self._create_engine({**self.credentials, **overrides}, read_only=True)
+
+    @staticmethod
+    def _pool_options(credentials):
+        """QueuePool settings shared by the server backends."""
+        options = {
+            key: credentials.get(key, default) for key, default in POOL_DEFAULTS.items()
+        }
+        return {
+            "poolclass": QueuePool,
+            "pool_pre_ping": True,  # Verify connections before use
+            **options,
+        }
+
+    def _create_mssql_engine(self, credentials, read_only=False):
         """Create SQLAlchemy engine with connection pooling for MS SQL Server."""
         try:
             # Get ODBC driver preference from credentials, default to ODBC Driver 18
-            driver = self.credentials.get("driver", "ODBC Driver 18 for SQL Server")
+            driver = credentials.get("driver", "ODBC Driver 18 for SQL Server")
 
             # Build connection string for SQL Server
-            server = self.credentials["host"]
-            port = self.credentials.get("port", 1433)
-            database = self.credentials["database"]
-            username = self.credentials["username"]
-            password = self.credentials["password"]
+            server = credentials["host"]
+            port = credentials.get("port", 1433)
+            database = credentials["database"]
+            username = credentials["username"]
+            password = credentials["password"]
 
             # Additional connection parameters to handle WinError 10054
             connection_params = {
@@ -57,16 +157,18 @@ class DatabaseConnection:
                 "TrustServerCertificate": "yes",  # Important for TLS issues
                 "Connection Timeout": "30",
                 "Command Timeout": "30",
-                "ApplicationIntent": "ReadWrite",
+                # ReadOnly lets the listener route to a readable secondary
+                "ApplicationIntent": "ReadOnly" if read_only else "ReadWrite",
                 "ConnectRetryCount": "3",
                 "ConnectRetryInterval": "10",
                 "Encrypt": "yes",  # Force encryption
                 "MultipleActiveResultSets": "False",
-                "Packet Size": "4096",
+                # Larger TDS packets mean fewer round trips for big result sets
+                "Packet Size": str(credentials.get("packet_size", 32767)),
             }
 
             # Add authentication method
-            auth_method = self.credentials.get("authentication", "sql")
+            auth_method = credentials.get("authentication", "sql")
             if auth_method.lower() == "windows":
                 connection_params["Trusted_Connection"] = "yes"
                 # Remove username/password for Windows auth
@@ -90,62 +192,117 @@ class DatabaseConnection:
 
             return create_engine(
                 sqlalchemy_url,
-                poolclass=QueuePool,
-                pool_size=5,
-                max_overflow=10,
-                pool_timeout=30,
-                pool_recycle=1800,  # Recycle connections every 30 minutes
-                pool_pre_ping=True,  # Verify connections before use
+                **self._pool_options(credentials),
+                echo=False,
+                # Send executemany() parameters as one array instead of
+                # one round trip per row
+                fast_executemany=True,
+                connect_args={"timeout": 30},  # pyodbc login timeout
+                execution_options={"isolation_level": "READ_COMMITTED"},
+            )
+        except Exception as e:
+            logger.error(f"Error creating SQL Server database engine: {e}")
+            raise
+
+    def _create_mysql_engine(self, credentials):
+        """Create SQLAlchemy engine with connection pooling for MySQL (pymysql)."""
+        try:
+            server = credentials["host"]
+            port = credentials.get("port", 3306)
+            database = credentials["database"]
+            username = urllib.parse.quote_plus(str(credentials["username"]))
+            password = urllib.parse.quote_plus(str(credentials["password"]))
+
+            sqlalchemy_url = (
+                f"mysql+pymysql://{username}:{password}@{server}:{port}/{database}"
+                "?charset=utf8mb4"
+            )
+
+            logger.info(f"Connecting to MySQL: {server}:{port}, Database: {database}")
+
+            return create_engine(
+                sqlalchemy_url,
+                **self._pool_options(credentials),
+                echo=False,
+                connect_args={"charset": "utf8mb4", "use_unicode": True},
+                # Server-side cursors (SSCursor): rows stream from the server
+                # instead of being buffered in full before pandas copies them
+                execution_options={
+                    "stream_results": credentials.get("stream_results", True)
+                },
+            )
+        except Exception as e:
+            logger.error(f"Error creating MySQL database engine: {e}")
+            raise
+
+    def _create_sqlite_engine(self, credentials):
+        """Create SQLAlchemy engine for a local SQLite database file."""
+        database = credentials["database"]
+        if database != ":memory:" and not os.path.exists(database):
+            logger.error(
+                f"SQLite database not found: {database}. "
+                "Create it with `python -m Database.synthetic_data`"
+            )
+            raise FileNotFoundError(database)
+        try:
+            logger.info(f"Connecting to SQLite database: {database}")
+            return create_engine(
+                f"sqlite:///{database}",
                 echo=False,
                 connect_args={
                     "check_same_thread": False,
                     "timeout": 30,
                 },
-                execution_options={"isolation_level": "READ_COMMITTED"},
             )
         except Exception as e:
-            logger.error(f"Error creating SQL Server database engine: {e}")
+            logger.error(f"Error creating SQLite database engine: {e}")
             raise
 
-    def connect(self):
+    def connect(self, replica=False):
         """Establish database connection and return a connection object."""
+        label = f"{self.backend_label} {'read replica' if replica else 'database'}"
         try:
-            conn = self.engine.connect()
-            logger.info("Connected to SQL Server database successfully")
+            conn = (self.read_engine if replica else self.engine).connect()
+            logger.info(f"Connected to {label} successfully")
             return conn
         except SQLAlchemyError as e:
-            logger.error(f"Error while connecting to SQL Server database: {e}")
-            # Log specific error codes that might help with debugging
-            if "10054" in str(e):
-                logger.error(
-                    "WinError 10054 detected - Connection was forcibly closed by remote host"
-                )
-                logger.error(
-                    "This may be due to TLS/SSL configuration, firewall, or network issues"
-                )
-            elif "18456" in str(e):
-                logger.error("SQL Server login failed - Check username/password")
-            elif "2" in str(e):
-                logger.error(
-                    "SQL Server not found - Check server name and network connectivity"
-                )
+            logger.error(f"Error while connecting to {label}: {e}")
+            if self.backend == "mssql":
+                self._log_mssql_error_hints(e)
             raise
 
+    @staticmethod
+    def _log_mssql_error_hints(e):
+        """Log specific error codes that might help with debugging."""
+        if "10054" in str(e):
+            logger.error(
+                "WinError 10054 detected - Connection was forcibly closed by remote host"
+            )
+            logger.error(
+                "This may be due to TLS/SSL configuration, firewall, or network issues"
+            )
+        elif "18456" in str(e):
+            logger.error("SQL Server login failed - Check username/password")
+        elif "2" in str(e):
+            logger.error(
+                "SQL Server not found - Check server name and network connectivity"
+            )
+
     def close(self, conn):
         """Close database connection."""
         try:
             if conn:
                 conn.close()
-                logger.info("SQL Server database connection closed")
+                logger.info(f"{self.backend_label} database connection closed")
         except SQLAlchemyError as e:
-            logger.error(f"Error closing SQL Server database connection: {e}")
+            logger.error(f"Error closing {self.backend_label} database connection: {e}")
 
     @contextmanager
-    def get_connection(self):
+    def get_connection(self, replica=False):
         """Context manager for database connections."""
         conn = None
         try:
-            conn = self.connect()
+            conn = self.connect(replica)
             yield conn
         except Exception as e:
             logger.error(f"Error in database connection context: {e}")
@@ -154,6 +311,58 @@ class DatabaseConnection:
             if conn:
                 self.close(conn)
 
+    def _replica_available(self):
+        return (
+            self.read_engine is not None
+            and time.monotonic() >= self._replica_down_until
+        )
+
+    def _read(self, read_func):
+        """
+        Run read_func(conn) on the read replica when there is a healthy one,
+        else on the primary.
+
+        A replica that cannot be reached is skipped for replica_retry_seconds,
+        the failed read is retried on the primary. Query errors are raised as is.
+        """
+        if self._replica_available():
+            try:
+                conn = self.connect(replica=True)
+            except SQLAlchemyError:
+                self._mark_replica_down()
+            else:
+                try:
+                    result = read_func(self._with_read_isolation(conn))
+                except DBAPIError as e:
+                    # Lost the replica mid-query, anything else is the query's fault
+                    if not e.connection_invalidated:
+                        raise
+                    self._mark_replica_down()
+                else:
+                    if self._replica_down_until:
+                        logger.info(
+                            "Read replica is back, dashboard reads use it again"
+                        )
+                        self._replica_down_until = 0.0
+                    return result
+                finally:
+                    self.close(conn)
+        with self.get_connection() as conn:
+            return read_func(self._with_read_isolation(conn))
+
+    def _mark_replica_down(self):
+        self._replica_down_until = time.monotonic() + self.replica_retry_seconds
+        logger.warning(
+            f"Read replica unavailable, reading from the primary for the "
+            f"next {self.replica_retry_seconds}s"
+        )
+
+    def _with_read_isolation(self, conn):
+        # Reset when the connection goes back to the pool
+        if self.read_isolation:
+            conn.execution_options(isolation_level=self.read_isolation)
+        return conn
+
     def execute_sql_file(self, sql_filepath_or_query, params=None):
         """Execute SQL commands from a file or raw query and return results as a DataFrame."""
         try:
@@ -169,9 +378,9 @@ class DatabaseConnection:
             if params:
                 sql_commands = sql_commands.format(**params)
 
-            with self.get_connection() as conn:
-                result = pd.read_sql(text(sql_commands), conn, params=params)
-                return result
+            return self._read(
+                lambda conn: pd.read_sql(text(sql_commands), conn, params=params)
+            )
 
         except SQLAlchemyError as e:
             logger.error(f"Error executing SQL: {e}")
@@ -201,9 +410,9 @@ class DatabaseConnection:
     def execute_query(self, query, params=None):
         """Execute a raw SQL query and return results as a DataFrame."""
         try:
-            with self.get_connection() as conn:
-                result = pd.read_sql(text(query), conn, params=params)
-                return result
+            return self._read(
+                lambda conn: pd.read_sql(text(query), conn, params=params)
+            )
         except SQLAlchemyError as e:
             logger.error(f"Error executing query: {e}")
             raise
@@ -229,22 +438,31 @@ class DatabaseConnection:
         """Test the database connection and return connection info."""
         try:
             with self.get_connection() as conn:
-                result = conn.execute(
-                    text(
-                        "SELECT @@VERSION as version, @@SERVERNAME as server_name, DB_NAME() as database_name"
-                    )
-                )
-                info = result.fetchone()
+                info = conn.execute(text(TEST_QUERIES[self.backend])).fetchone()
                 logger.info(f"Connection test successful: {info}")
-                return {
+                result = {
                     "version": info[0],
                     "server_name": info[1],
-                    "database_name": info[2],
+                    "database_name": info[2] or self.credentials["database"],
                     "status": "Connected",
                 }
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
             return {"status": "Failed", "error": str(e)}
+        if self.read_engine is not None:
+            result["read_replica"] = self.check_read_replica()
+        return result
+
+    def check_read_replica(self):
+        """Health check of the read replica: "Connected" or "Failed: <error>"."""
+        try:
+            with self.get_connection(replica=True) as conn:
+                conn.execute(text(TEST_QUERIES[self.backend])).fetchone()
+        except Exception as e:
+            self._mark_replica_down()
+            return f"Failed: {e}"
+        self._replica_down_until = 0.0
+        return "Connected"
 
 
 # Create a singleton instance
@@ -1,32 +1,91 @@
 import numpy as np
 from Database.database_connection import DatabaseConnection
 import pandas as pd
-import yaml
 import logging
 from Database.serialize_df import serialize_dataframe_dict
+from Database.resource_cache import resource_cache, read_sql, load_yaml
+from Database.chart_schema import normalize_chart_data
+from Database.payload_capture import payload_recorder
+from Database.last_snapshot import last_snapshot
+from Database.multi_plant import PlantGroup
+from Database.step_progress import refresh_step_progress
+from Database.chart5_windows import (
+    CHART5_TIME_WINDOWS,
+    bucket_now,
+    chart5_window,
+)
+from Database.stop_reason_topk import (
+    TOP_REASON_COLUMNS,
+    compute_top_reasons,
+    widen_top_reasons,
+)
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Periods read together by chart 3 (current and previous, for comparison)
+CHART3_PERIODS = {
+    "今天": ["今天", "昨日"],
+    "本周": ["本周", "上周"],
+    "本月": ["本月", "上月"],
+}
+
 db = DatabaseConnection()
 
 
 def get_all_charts_data(db) -> dict:
     """
     Get all charts data from the database.(unserialized dataframes// serializing in layout.py)
+
+    `db` is a DatabaseConnection or, in multi-plant mode, a PlantGroup
+    (Database/multi_plant.py) fetching every plant concurrently.
     """
-    dfs = {
-        "chart-1-data-store": get_MachineUsage_data(db),
-        "chart-2-data-store": get_MachineStatus_data(db),
-        "chart-3-data-store": get_chart3_data(db),
-        "chart-4-data-store": get_chart4_data(db),
-        "chart-5-data-store": get_chart5_data(db),
-        "chart-6-data-store": get_chart6_data(db),
-    }
-    # No serialization here, done inside get_MachineUsage_data
+    if isinstance(db, PlantGroup):
+        dfs = db.fetch(fetch_charts_data)
+    else:
+        dfs = fetch_charts_data(db)
+    publish_charts_data(dfs)
     return dfs
 
 
+def publish_charts_data(dfs: dict):
+    """Hand a complete, freshly fetched chart data dict to the recorders."""
+    # Opt-in capture for offline replay (DASHBOARD_CAPTURE_DIR)
+    payload_recorder.capture_charts_data(dfs)
+
+
+def get_startup_charts_data(db) -> tuple:
+    """
+    Chart data to build the layout with at boot.
+
+    The last snapshot saved on disk when there is one, so the dashboard starts
+    in milliseconds (and during a database outage); the first auto refresh
+    then brings fresh data. Otherwise the data is fetched (and saved for the
+    next boot).
+
+    Returns:
+        tuple: (charts_data, as_of), as_of is the fetch timestamp of the disk
+            snapshot or None for freshly fetched data.
+    """
+    cached = last_snapshot.load()
+    if cached is not None:
+        return cached
+    charts_data = get_all_charts_data(db)
+    last_snapshot.save(charts_data)
+    return charts_data, None
+
+
+def fetch_charts_data(db) -> dict:
+    """Run every chart fetcher on one connection."""
+    # The same part fetchers the refresh scheduler runs, so the full fetch
+    # and the per-part refreshes cannot drift apart
+    parts = {}
+    for fetch in CHART_PART_FETCHERS.values():
+        parts.update(fetch(db))
+    # No serialization here, done inside get_MachineUsage_data
+    return {key: parts[key] for key in sorted(parts)}
+
+
 def get_MachineUsage_data(db) -> pd.DataFrame:
     """
     Get machine usage data from the database.
@@ -41,11 +100,9 @@ def get_MachineUsage_data(db) -> pd.DataFrame:
     file = f"1_{chartname}.sql"
     file_name = file.split(".")[0]
     # load replace yml using unicodedecode
-    with open(f"sql/{file_name}_replace.yml", "r", encoding="utf-8") as f:
-        replace_dict = yaml.safe_load(f)
+    replace_dict = load_yaml(f"sql/{file_name}_replace.yml")
     # replace period_replace in sql file
-    with open(f"sql/{file}", "r", encoding="utf-8") as sql_file:
-        sql_commands = sql_file.read()
+    sql_commands = read_sql(file)
     # for period in replace_dict["period_replace"]:
     #     Q = sql_commands.format(period_replace=period)
     #     dfs_machine_usage[period] = db.execute_query(Q)
@@ -80,7 +137,7 @@ def get_MachineUsage_data(db) -> pd.DataFrame:
             "all_machine": all_machine,
         }
 
-    return dfs
+    return normalize_chart_data("chart-1-data-store", dfs)
 
 
 def get_avg_chart1(df):
@@ -99,106 +156,132 @@ def get_avg_chart1(df):
     return df_avg
 
 
-def get_MachineStatus_data(db, lang: str = "zh_cn") -> pd.DataFrame:
+# Machine status table columns and their headers per language
+MACHINE_STATUS_COLUMNS = [
+    "machine_name",
+    "state",
+    "batch_no",
+    "steps",
+    "expected_finish_time",
+]
+MACHINE_STATUS_HEADERS = {
+    "zh_hant": {
+        "machine_name": "機號",
+        "state": "狀態",
+        "user_prompt": "叫人",
+        "num_of_alarms": "警報",
+        "mt_temperature": "溫度C",
+        "batch_no": "批次號",
+        "program_name": "程序名",
+        "current_step": "當前步驟",
+        "next_step": "下一步",
+        "minutes_run": "運行(分鐘)",
+        "expected_finish_time": "預計完成時間",
+        "steps": "步驟",
+    },
+    "zh_cn": {
+        "machine_name": "机号",
+        "state": "状态",
+        "user_prompt": "叫人",
+        "num_of_alarms": "警报",
+        "mt_temperature": "温度C",
+        "batch_no": "批次号",
+        "program_name": "程序名",
+        "current_step": "当前步骤",
+        "next_step": "下一步",
+        "minutes_run": "运行(分钟)",
+        "expected_finish_time": "预计完成时间",
+        "steps": "步骤",
+    },
+    "en": {
+        "pass": "pass",
+    },
+}
+
+
+def build_machine_status_view(df: pd.DataFrame, lang: str = "zh_cn") -> pd.DataFrame:
     """
-    Get machine usage data from the database.
-
-    Returns:
-        pd.DataFrame: DataFrame containing machine usage data
+    Machine status table (MACHINE_STATUS_COLUMNS, headers in `lang`) from
+    machine_status rows with total_steps_cnt / current_step_cnt.
     """
-    col_rename = {
-        "zh_hant": {
-            "machine_name": "機號",
-            "state": "狀態",
-            "user_prompt": "叫人",
-            "num_of_alarms": "警報",
-            "mt_temperature": "溫度C",
-            "batch_no": "批次號",
-            "program_name": "程序名",
-            "current_step": "當前步驟",
-            "next_step": "下一步",
-            "minutes_run": "運行(分鐘)",
-            "expected_finish_time": "預計完成時間",
-            "steps": "步驟",
-        },
-        "zh_cn": {
-            "machine_name": "机号",
-            "state": "状态",
-            "user_prompt": "叫人",
-            "num_of_alarms": "警报",
-            "mt_temperature": "温度C",
-            "batch_no": "批次号",
-            "program_name": "程序名",
-            "current_step": "当前步骤",
-            "next_step": "下一步",
-            "minutes_run": "运行(分钟)",
-            "expected_finish_time": "预计完成时间",
-            "steps": "步骤",
-        },
-        "en": {
-            "pass": "pass",
+    # "<total>/<current>", missing counts shown as <NA> like Int64 -> str did
+    counts = (
+        df[["total_steps_cnt", "current_step_cnt"]]
+        .astype("Int64")
+        .astype("string")
+        .fillna("<NA>")
+    )
+    steps = counts["total_steps_cnt"] + "/" + counts["current_step_cnt"]
+
+    # Truncate batch_no longer than 6 characters to "..." + its last 6
+    batch_no = df["batch_no"]
+    batch_str = batch_no.astype("string")
+    is_long = (batch_str.str.len() > 6).fillna(False).astype(bool)
+    batch_no = batch_no.where(~is_long, "..." + batch_str.str[-6:])
+
+    view = pd.DataFrame(
+        {
+            "machine_name": df["machine_name"],
+            "state": df["state"],
+            "batch_no": batch_no,
+            "steps": steps.astype(object),
+            "expected_finish_time": pd.to_datetime(
+                df["expected_finish_time"]
+            ).dt.strftime("%m-%d %H:%M"),
         },
-    }
-    dfs = {}
-    # load chart 1 sql
-    chartname = "machine_status"
-    # * Desktop version
-    file = f"2_{chartname}_desktop.sql"
-    # replace period_replace in sql file
-    with open(f"sql/{file}", "r", encoding="utf-8") as sql_file:
-        Q = sql_file.read()
+        columns=MACHINE_STATUS_COLUMNS,
+    )
+    view = view.sort_values(by="machine_name", ascending=True)
+    return view.rename(columns=MACHINE_STATUS_HEADERS[lang])
 
-    df = db.execute_query(Q)
-    dfs["desktop"] = {"all_machine": df}
 
-    # * Mobile version
-    file = f"2_{chartname}_mobile.sql"
-    # replace period_replace in sql file
-    with open(f"sql/{file}", "r", encoding="utf-8") as sql_file:
-        Q = sql_file.read()
-
-    df_mobile = db.execute_query(Q)
-    for col in [
-        "total_steps_cnt",
-        "current_step_cnt",
-    ]:
-        df_mobile[col] = df_mobile[col].astype("Int64").astype(str)
-    df_mobile["steps"] = (
-        (df_mobile["total_steps_cnt"]) + "/" + (df_mobile["current_step_cnt"])
-    )
+def get_MachineStatus_data(
+    db, lang: str = "zh_cn", step_progress: pd.DataFrame = None
+) -> pd.DataFrame:
+    """
+    Get machine status data from the database.
 
-    # Truncate batch_no if length > 5, keep last 4 characters with "..." prefix
-    if "batch_no" in df_mobile.columns:
-        df_mobile["batch_no"] = df_mobile["batch_no"].apply(
-            lambda x: f"...{str(x)[-6:]}" if pd.notna(x) and len(str(x)) > 6 else x
-        )
+    One machine_status query; desktop and mobile share the same read-only
+    table view.
 
-    # Also apply the same logic to desktop dataframe
-    # if "batch_no" in df.columns:
-    #     df["batch_no"] = df["batch_no"].apply(
-    #         lambda x: f"...{str(x)[-6:]}" if pd.notna(x) and len(str(x)) > 6 else x
-    #     )
-    # transform datetime
-    date_col = "expected_finish_time"
-    df_mobile[date_col] = pd.to_datetime(df_mobile[date_col]).dt.strftime("%m-%d %H:%M")
-    df_mobile = df_mobile.sort_values(by="machine_name", ascending=True)
-
-    cols = [
-        "machine_name",
-        "state",
-        "batch_no",
-        "steps",
-        "expected_finish_time",
-    ]
-    dfs["mobile"] = {"all_machine": df_mobile[cols]}
-    dfs["desktop"] = {"all_machine": df_mobile[cols]}
-
-    for mobile_option, df_dict in dfs.items():
-        for key, df_val in df_dict.items():
-            df_val = df_val.rename(columns=col_rename[lang])
-            dfs[mobile_option][key] = df_val
+    Args:
+        db: DatabaseConnection.
+        lang: Language of the column headers.
+        step_progress: Queue progress per machine from get_step_progress();
+            None runs the batch_queued aggregate of 2_machine_status_mobile.sql.
 
-    return dfs
+    Returns:
+        dict: {"desktop": {"all_machine": df}, "mobile": {"all_machine": df}}
+    """
+    if step_progress is not None:
+        df = db.execute_query(read_sql("2_machine_status_desktop.sql"))
+        df = df.merge(step_progress, on="machine_name", how="left")
+    else:
+        df = db.execute_query(read_sql("2_machine_status_mobile.sql"))
+
+    view = build_machine_status_view(df, lang)
+    return {"desktop": {"all_machine": view}, "mobile": {"all_machine": view}}
+
+
+def get_step_progress(db):
+    """
+    Queue progress per machine, kept up to date in process by a
+    StepProgressTracker (Database/step_progress.py) instead of grouping all of
+    batch_queued on every refresh.
+
+    Returns:
+        pd.DataFrame or None: None if it could not be built, get_MachineStatus_data
+            then falls back to the full aggregate query.
+    """
+    try:
+        # Multi-plant fetches record it per plant for the group view
+        maintained = getattr(db, "maintained_frame", None)
+        if maintained is not None:
+            return maintained("step_progress", refresh_step_progress)
+        return refresh_step_progress(db)
+    except Exception as e:
+        logger.error(f"Error building machine step progress: {e}")
+        return None
 
 
 # def get_monthly_dates_for_chart3(today, data_point_num=7):
@@ -264,18 +347,13 @@ def get_chart3_data(db) -> dict:
     avg is actually the total of all machines in this table
     """
     dfs = {}
-    period_replace = {
-        "今天": ["今天", "昨日"],
-        "本周": ["本周", "上周"],
-        "本月": ["本月", "上月"],
-    }
+    period_replace = CHART3_PERIODS
     data_point_num = 7
     chartname = "3_machine_production"
     file = f"{chartname}.sql"
     file_name = file.split(".")[0]
     # replace period_replace in sql file
-    with open(f"sql/{file}", "r", encoding="utf-8") as sql_file:
-        sql_commands = sql_file.read()
+    sql_commands = read_sql(file)
 
     for period in period_replace.keys():
         dfs[period] = {"all_machine": pd.DataFrame()}
@@ -288,7 +366,7 @@ def get_chart3_data(db) -> dict:
         df["mmdd"] = df["date"].dt.strftime("%m-%d")
 
         dfs[period]["all_machine"] = df
-    return dfs
+    return normalize_chart_data("chart-3-data-store", dfs)
 
     # Configurable date ranges (days to go back from latest date)
 
@@ -307,11 +385,9 @@ def get_chart4_data(db) -> pd.DataFrame:
     file = f"{chartname}.sql"
     file_name = file.split(".")[0]
     # load replace yml using unicodedecode
-    with open(f"sql/{file_name}_replace.yml", "r", encoding="utf-8") as f:
-        replace_dict = yaml.safe_load(f)
+    replace_dict = load_yaml(f"sql/{file_name}_replace.yml")
     # replace period_replace in sql file
-    with open(f"sql/{file}", "r", encoding="utf-8") as sql_file:
-        sql_commands = sql_file.read()
+    sql_commands = read_sql(file)
 
     # Process each period
     for period in replace_dict["period_replace"]:
@@ -341,10 +417,7 @@ def get_chart4_data(db) -> pd.DataFrame:
         all_machine = df[df["order_index"] == 1].sort_values(
             by=["steam_ton", "power_kwh", "water_ton"], ascending=True
         )
-        for col in ["water_ton", "power_kwh", "steam_ton"]:
-            for df_label in [best, worst, all_machine]:
-                df_label[col] = df_label[col].fillna(0)
-
+        # Missing metrics are filled with 0 by the chart 4 schema
         dfs[period] = {
             "avg": avg,
             "best": best,
@@ -352,7 +425,7 @@ def get_chart4_data(db) -> pd.DataFrame:
             "all_machine": all_machine,
         }
 
-    return dfs
+    return normalize_chart_data("chart-4-data-store", dfs)
 
 
 def get_avg_chart4(df):
@@ -372,18 +445,20 @@ def get_avg_chart4(df):
     return df_avg
 
 
-def get_chart5_data(db) -> dict:
+def get_chart5_data(db, now: datetime = None) -> dict:
     """
     Get machine batch queued data from the database for different time windows.
     The time windows are:
     - 24_hrs: Current time +/- 12 hours.
     - 48_hrs: Window starts 24 hours before current time, ends 24 hours after current time. (48h duration)
     - 72_hrs: Window starts 24 hours before current time, ends 48 hours after current time. (72h duration)
+
+    The current time is floored to the chart 5 bucket (Database/chart5_windows.py),
+    so every refresh inside a bucket sends the same SQL.
     """
     sql_file_path = "sql/5_batch_queued.sql"
     try:
-        with open(sql_file_path, "r", encoding="utf-8") as f:
-            Q_template = f.read()
+        Q_template = resource_cache.read_text(sql_file_path)
     except FileNotFoundError:
         logger.error(f"SQL file not found: {sql_file_path}")
         # Return empty data for all options if SQL file is missing
@@ -397,29 +472,13 @@ def get_chart5_data(db) -> dict:
 
     results = {}
     # TODO change back to now
-    now = datetime.now()
+    now = now or bucket_now()
     # now = datetime.strptime("2025-04-07 05:00:00", "%Y-%m-%d %H:%M:%S")
     # Standard SQL datetime format, ensure your database expects this format
     time_format = "%Y-%m-%d %H:%M:%S"
 
-    time_configs = {
-        "24_hrs": {  # current time +/- 12 hours
-            "min_offset_from_now": timedelta(hours=-12),
-            "max_offset_from_now": timedelta(hours=12),
-        },
-        "48_hrs": {  # starts 24 hours ago, duration 48 hours (ends +24h from now)
-            "min_offset_from_now": timedelta(hours=-24),
-            "max_offset_from_now": timedelta(hours=24),
-        },
-        "72_hrs": {  # starts 24 hours ago, duration 72 hours (ends +48h from now)
-            "min_offset_from_now": timedelta(hours=-24),
-            "max_offset_from_now": timedelta(hours=48),
-        },
-    }
-
-    for option, config in time_configs.items():
-        min_start_time_dt = now + config["min_offset_from_now"]
-        max_start_time_dt = now + config["max_offset_from_now"]
+    for option in CHART5_TIME_WINDOWS:
+        min_start_time_dt, max_start_time_dt = chart5_window(option, now)
 
         min_start_time_str = min_start_time_dt.strftime(time_format)
         max_start_time_str = max_start_time_dt.strftime(time_format)
@@ -439,7 +498,7 @@ def get_chart5_data(db) -> dict:
 
         results[option] = {"all_machine": df}
 
-    return results
+    return normalize_chart_data("chart-5-data-store", results)
 
 
 def get_chart6_data(db) -> dict:
@@ -452,20 +511,17 @@ def get_chart6_data(db) -> dict:
     3. For order_index = 0, pick the machine with highest sum_hour and lowest sum_hour
     4. Also, get the count of machine with order_index = 0
     5. df_overall is [machine_avg['sum_hour'], machine_avg['sum_hour']/machine_count]
-    6. For highest & lowest machine, pick the top 5 reason, among all columns starts with 'reason' of each machine, drop the rest of the
-    columns, except machine name and the top 5 reasons
-    7. Put them into {period: {avg: machine_avg, highest: machine_highest, lowest: machine_lowest}}
+    6. Pick the top 5 reasons (columns starting with 'reason') of every machine at once, stored in long
+    format as top_reasons; highest & lowest keep machine name, idle_hour and their top 5 reasons
+    7. Put them into {period: {all_machine, highest, lowest, overall, top_reasons}}
     """
     dfs = {}
 
     # Load replace yml using unicode decode
-    with open("sql/1_machine_usage_replace.yml", "r", encoding="utf-8") as f:
-        replace_dict = yaml.safe_load(f)
+    replace_dict = load_yaml("sql/1_machine_usage_replace.yml")
 
     # Load SQL file
-    sql_file_path = "sql/6_stop_reason.sql"
-    with open(sql_file_path, "r", encoding="utf-8") as f:
-        sql_commands = f.read()
+    sql_commands = read_sql("6_stop_reason.sql")
 
     # Process each period
     for period in replace_dict["period_replace"]:
@@ -559,52 +615,11 @@ def get_chart6_data(db) -> dict:
             else:
                 df_overall = pd.DataFrame()
 
-            # Step 6: For highest & lowest machine, pick top 5 reasons
-            def process_machine_reasons(machine_df):
-                if machine_df.empty:
-                    return machine_df
-
-                # Find columns that start with 'reason'
-                reason_columns = [
-                    col for col in machine_df.columns if col.startswith("reason")
-                ]
-
-                if not reason_columns:
-                    # If no reason columns, return machine_name and idle_hour if available
-                    keep_cols = ["machine_name"]
-                    if "idle_hour" in machine_df.columns:
-                        keep_cols.append("idle_hour")
-                    return machine_df[keep_cols] if keep_cols else machine_df
-
-                # Get top 5 reasons by value for each machine
-                processed_machines = []
-                for idx, row in machine_df.iterrows():
-                    # Start with basic machine data
-                    machine_data = {"machine_name": row.get("machine_name", "Unknown")}
-                    if "idle_hour" in row:
-                        machine_data["idle_hour"] = row["idle_hour"]
-
-                    # Get reason values and sort them
-                    reason_values = {}
-                    for col in reason_columns:
-                        if pd.notna(row[col]) and row[col] != 0:
-                            reason_values[col] = row[col]
-
-                    # Sort by value and take top 5
-                    top_reasons = sorted(
-                        reason_values.items(), key=lambda x: x[1], reverse=True
-                    )[:5]
-
-                    # Add top 5 reason columns with their original names and values
-                    for reason_col, value in top_reasons:
-                        machine_data[reason_col] = value
-
-                    processed_machines.append(machine_data)
-
-                return pd.DataFrame(processed_machines)
-
-            highest_processed = process_machine_reasons(highest_machine)
-            lowest_processed = process_machine_reasons(lowest_machine)
+            # Step 6: Top 5 reasons of every machine in one vectorized pass,
+            # reused by the summary (highest/lowest), cards and detail views
+            top_reasons = compute_top_reasons(machine_all, k=5)
+            highest_processed = widen_top_reasons(highest_machine, top_reasons)
+            lowest_processed = widen_top_reasons(lowest_machine, top_reasons)
 
             # Step 7: Store in the result dictionary
             dfs[period] = {
@@ -612,6 +627,7 @@ def get_chart6_data(db) -> dict:
                 "highest": highest_processed,
                 "lowest": lowest_processed,
                 "overall": df_overall,
+                "top_reasons": top_reasons,
             }
 
             logger.info(f"Chart6: Successfully processed data for period {period}")
@@ -627,6 +643,57 @@ def get_chart6_data(db) -> dict:
                 "highest": pd.DataFrame(),
                 "lowest": pd.DataFrame(),
                 "overall": pd.DataFrame(),
+                "top_reasons": pd.DataFrame(columns=TOP_REASON_COLUMNS),
             }
 
-    return dfs
+    return normalize_chart_data("chart-6-data-store", dfs)
+
+
+def fetch_status_charts(db) -> dict:
+    """Charts 2 and 5, the live machine and queue state, refreshed together."""
+    return {
+        "chart-2-data-store": get_MachineStatus_data(
+            db, step_progress=get_step_progress(db)
+        ),
+        "chart-5-data-store": get_chart5_data(db),
+    }
+
+
+def _single_chart_fetcher(chart_key: str, get_data):
+    def fetch_chart(db) -> dict:
+        return {chart_key: get_data(db)}
+
+    fetch_chart.__name__ = f"fetch_{chart_key.replace('-', '_')}"
+    return fetch_chart
+
+
+# Parts of the chart data that can be refreshed independently
+# (Database/refresh_scheduler.py); fetch_charts_data() merges them all
+CHART_PART_KEYS = {
+    "status": ("chart-2-data-store", "chart-5-data-store"),
+    "usage": ("chart-1-data-store",),
+    "production": ("chart-3-data-store",),
+    "resources": ("chart-4-data-store",),
+    "stop_reasons": ("chart-6-data-store",),
+}
+CHART_PART_FETCHERS = {
+    "status": fetch_status_charts,
+    "usage": _single_chart_fetcher("chart-1-data-store", get_MachineUsage_data),
+    "production": _single_chart_fetcher("chart-3-data-store", get_chart3_data),
+    "resources": _single_chart_fetcher("chart-4-data-store", get_chart4_data),
+    "stop_reasons": _single_chart_fetcher("chart-6-data-store", get_chart6_data),
+}
+
+
+def fetch_chart_part(db, part: str) -> dict:
+    """
+    Fetch one part of the chart data (see CHART_PART_FETCHERS).
+
+    Returns:
+        dict: {chart_key: chart data} of the part's charts; a PlantViews in
+            multi-plant mode.
+    """
+    fetch = CHART_PART_FETCHERS[part]
+    if isinstance(db, PlantGroup):
+        return db.fetch(fetch)
+    return fetch(db)
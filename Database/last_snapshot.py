@@ -0,0 +1,122 @@
+"""
+Last good chart data on disk, for warm restarts.
+
+Every chart data the dashboards refresh to (boot fetch, auto refresh, tiered
+refresh) is written in the background (Database.snapshot_io: compressed, temp
+file + rename) to $DASHBOARD_LAST_SNAPSHOT (default env/last_snapshot); tools
+calling get_all_charts_data() directly write nothing. On boot the dashboards
+render that file right away, marked "data as of <fetch time>", and the first
+auto refresh replaces it with fresh data. The dashboards therefore start even
+while the database is down.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from Database.snapshot_io import is_snapshot_file, read_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+LAST_SNAPSHOT_ENV_VAR = "DASHBOARD_LAST_SNAPSHOT"
+DEFAULT_LAST_SNAPSHOT_PATH = "env/last_snapshot"
+
+# Bump when the structure of get_all_charts_data() changes, so a snapshot
+# written by an older version is ignored instead of breaking the layout
+LAST_SNAPSHOT_FORMAT = 1
+
+
+class LastSnapshot:
+    """
+    Keeps the newest chart data on disk. Writes run one at a time in a
+    background thread; data arriving while a write runs only keeps the
+    newest, so a refresh never waits for pickling and compression.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._latest = None
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="last-snapshot"
+        )
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get(LAST_SNAPSHOT_ENV_VAR, DEFAULT_LAST_SNAPSHOT_PATH))
+
+    def save(self, charts_data: dict):
+        """Queue a write of get_all_charts_data() output."""
+        with self._lock:
+            self._latest = (charts_data, time.time())
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._executor.submit(self._write_latest)
+
+    def _write_latest(self):
+        with self._lock:
+            charts_data, fetched_at = self._latest
+            self._latest = None
+            self._scheduled = False
+        try:
+            start = time.perf_counter()
+            path = write_snapshot(
+                {
+                    "meta": {"format": LAST_SNAPSHOT_FORMAT, "fetched_at": fetched_at},
+                    "charts_data": charts_data,
+                },
+                self.path,
+                level=1,
+            )
+            logger.debug(
+                f"Saved last snapshot to {path} in {time.perf_counter() - start:.2f}s"
+            )
+        except Exception as e:
+            logger.error(f"Error saving the last snapshot: {e}")
+
+    def _existing_file(self) -> Optional[str]:
+        directory, name = os.path.split(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            return None
+        files = [
+            os.path.join(directory, f)
+            for f in os.listdir(directory)
+            if f.startswith(name) and is_snapshot_file(f)
+        ]
+        return max(files, key=os.path.getmtime) if files else None
+
+    def load(self) -> Optional[tuple]:
+        """
+        Read the snapshot written by a previous run.
+
+        Returns:
+            tuple: (charts_data, fetched_at timestamp), or None when there is
+                no usable snapshot.
+        """
+        path = self._existing_file()
+        if path is None:
+            return None
+        try:
+            start = time.perf_counter()
+            snapshot = read_snapshot(path)
+        except Exception as e:
+            logger.error(f"Error reading the last snapshot {path}: {e}")
+            return None
+        meta = snapshot.get("meta", {})
+        if meta.get("format") != LAST_SNAPSHOT_FORMAT:
+            logger.warning(f"Ignoring {path}: written by another dashboard version")
+            return None
+        logger.info(
+            f"Loaded last snapshot {path} in {time.perf_counter() - start:.2f}s "
+            f"(data from {time.time() - meta['fetched_at']:.0f}s ago)"
+        )
+        return snapshot["charts_data"], meta["fetched_at"]
+
+
+# Shared instance, configured from the environment
+last_snapshot = LastSnapshot.from_env()
@@ -0,0 +1,295 @@
+"""
+Multi-plant mode: one dashboard server for several plant databases.
+
+Enabled by DASHBOARD_PLANTS pointing at a YAML file:
+
+    timeout: 20            # seconds a refresh waits for the plants
+    plants:
+      - id: B
+        name: 染厂B
+        credentials: env/db_credentials_b.yml
+      - id: C
+        name: 染厂C
+        credentials: env/db_credentials_c.yml
+
+Every refresh fetches all plants concurrently. Each plant gets its own view,
+and a group view is built from the same query results merged with a plant
+dimension: a `plant` column, machine names prefixed "<plant id>-", and the
+per-plant summary rows recombined. A plant that misses the deadline is served
+from its last good fetch while its query keeps running in the background, so
+it never stalls the others.
+
+Views are picked with ?plant=<id> in the dashboard URL (default: group).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+import yaml
+
+from Database.database_connection import DatabaseConnection, db
+
+logger = logging.getLogger(__name__)
+
+PLANTS_ENV_VAR = "DASHBOARD_PLANTS"
+GROUP_VIEW = "all"
+
+# Per-plant summary rows of the source tables (order_index value) and how the
+# group view recombines them: "drop" lets the fetchers recompute the average
+# over every machine, "sum" adds the plant totals up per period and date.
+SUMMARY_ROWS = {
+    "overall_usage": (0, "drop"),
+    "machine_production_waste": (0, "drop"),
+    "production_volume_log": (0, "sum"),
+}
+
+_LITERAL = re.compile(r"'[^']*'")
+_FROM_TABLE = re.compile(r"\bfrom\s+\[?(?:dbo\]?\.\[?)?(\w+)", re.IGNORECASE)
+
+
+def _query_signature(query: str) -> str:
+    """The query with its literals (periods, times) blanked out."""
+    return " ".join(_LITERAL.sub("?", query).split())
+
+
+class _QueryLog:
+    """Keys queries by signature and occurrence, e.g. the 2nd period query."""
+
+    def __init__(self):
+        self._seen = defaultdict(int)
+
+    def key(self, query: str) -> tuple:
+        signature = _query_signature(query)
+        self._seen[signature] += 1
+        return signature, self._seen[signature]
+
+
+class RecordingConnection:
+    """Runs the fetchers' queries on one plant and keeps every result."""
+
+    def __init__(self, db):
+        self.db = db
+        self.results = {}
+        self._log = _QueryLog()
+
+    def execute_query(self, query, params=None):
+        df = self.db.execute_query(query, params)
+        self.results[self._log.key(query)] = df
+        return df
+
+    def maintained_frame(self, name: str, refresh):
+        """
+        A frame the plant keeps up to date in process (refresh(db), e.g. the
+        step progress), recorded like a query result under `name`.
+        """
+        df = refresh(self.db)
+        self.results[self._log.key(name)] = df
+        return df
+
+
+class MergedConnection:
+    """
+    Answers the fetchers' queries from the recorded plant results, so the
+    group view costs no extra database round trips.
+    """
+
+    def __init__(self, recordings: dict):
+        self.recordings = recordings
+        self._log = _QueryLog()
+
+    def execute_query(self, query, params=None):
+        key = self._log.key(query)
+        frames = [
+            _with_plant(results[key], plant_id)
+            for plant_id, results in self.recordings.items()
+            if key in results
+        ]
+        if not frames:
+            raise LookupError(f"No plant recorded the query: {key[0][:80]}")
+        merged = pd.concat(frames, ignore_index=True)
+        match = _FROM_TABLE.search(query)
+        table = match.group(1).lower() if match else None
+        return _combine_summary_rows(merged, table)
+
+    def maintained_frame(self, name: str, refresh):
+        """The plants' recorded frames of `name`, merged."""
+        return self.execute_query(name)
+
+
+def _with_plant(df: pd.DataFrame, plant_id: str) -> pd.DataFrame:
+    df = df.copy()
+    df["plant"] = plant_id
+    if "machine_name" in df.columns:
+        names = df["machine_name"]
+        df["machine_name"] = names.where(
+            names.isna(), f"{plant_id}-" + names.astype(str)
+        )
+    return df
+
+
+def _combine_summary_rows(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    if table not in SUMMARY_ROWS or "order_index" not in df.columns:
+        return df
+    order_index, how = SUMMARY_ROWS[table]
+    is_summary = df["order_index"] == order_index
+    machines = df[~is_summary]
+    if how == "drop" or not is_summary.any():
+        return machines.reset_index(drop=True)
+
+    summary = df[is_summary]
+    keys = [c for c in ("period", "date") if c in df.columns]
+    values = [
+        c
+        for c in summary.select_dtypes("number").columns
+        if c not in keys and c != "order_index"
+    ]
+    combined = summary.groupby(keys, as_index=False, sort=False).agg(
+        {
+            **{c: "sum" for c in values},
+            **{c: "first" for c in summary.columns if c not in keys + values},
+        }
+    )
+    # Plant totals share one name, e.g. "平均", without the plant prefix
+    combined["machine_name"] = summary["machine_name"].iloc[0].split("-", 1)[-1]
+    combined["plant"] = GROUP_VIEW
+    return pd.concat([machines, combined[df.columns]], ignore_index=True).reset_index(
+        drop=True
+    )
+
+
+class PlantViews(dict):
+    """
+    Group-wide chart data, with the per-plant chart data in `plants`.
+
+    Behaves like any get_all_charts_data() result (the group view);
+    resolve_charts_data() picks a plant from it when the handle names one.
+    """
+
+    def __init__(self, group_data: dict, plants: dict):
+        super().__init__(group_data)
+        self.plants = plants
+
+
+class PlantGroup:
+    def __init__(self, plants: list, timeout: float = 20):
+        """
+        Args:
+            plants: [{"id", "name", "credentials"}], see the module docstring.
+            timeout: Seconds a refresh waits for the plants.
+        """
+        self.plants = [
+            {
+                "id": str(plant["id"]),
+                "name": plant.get("name", str(plant["id"])),
+                "db": DatabaseConnection(plant["credentials"]),
+            }
+            for plant in plants
+        ]
+        self.timeout = timeout
+        # One fetch in flight per plant and fetch function, each on its own
+        # thread: a hung plant (or part, see CHART_PART_FETCHERS) only ever
+        # holds its own thread, never the other plants' fetches
+        self._executors = {}
+        self._pending = {}
+        self._last = {}
+        self._last_group = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        logger.info(
+            f"Multi-plant mode: {[p['id'] for p in config['plants']]} from {path}"
+        )
+        return cls(config["plants"], timeout=config.get("timeout", 20))
+
+    def _fetch_plant(self, plant, fetch_func):
+        start = time.perf_counter()
+        recorder = RecordingConnection(plant["db"])
+        data = fetch_func(recorder)
+        with self._lock:
+            self._last[(plant["id"], fetch_func)] = {
+                "data": data,
+                "results": recorder.results,
+                "fetched_at": time.time(),
+            }
+        logger.info(
+            f"Plant {plant['id']} fetched in {time.perf_counter() - start:.2f}s"
+        )
+
+    def fetch(self, fetch_func) -> PlantViews:
+        """
+        Fetch every plant concurrently and build the group view.
+
+        Args:
+            fetch_func: Builds chart data from a connection (fetch_charts_data,
+                or one part of it, see CHART_PART_FETCHERS).
+
+        Returns:
+            PlantViews: Group view with the plant views in `plants`.
+        """
+        futures = []
+        with self._lock:
+            for plant in self.plants:
+                key = (plant["id"], fetch_func)
+                future = self._pending.get(key)
+                if future is None or future.done():
+                    executor = self._executors.get(key)
+                    if executor is None:
+                        executor = self._executors[key] = ThreadPoolExecutor(
+                            max_workers=1,
+                            thread_name_prefix=f"plant-fetch-{plant['id']}",
+                        )
+                    future = executor.submit(self._fetch_plant, plant, fetch_func)
+                    self._pending[key] = future
+                futures.append((plant, future))
+        wait([future for _, future in futures], timeout=self.timeout)
+
+        plants, recordings = {}, {}
+        for plant, future in futures:
+            if not future.done():
+                logger.warning(
+                    f"Plant {plant['id']} did not answer within {self.timeout}s"
+                )
+            elif future.exception() is not None:
+                logger.error(
+                    f"Error fetching plant {plant['id']}: {future.exception()}"
+                )
+            with self._lock:
+                last = self._last.get((plant["id"], fetch_func))
+            if last is None:
+                continue
+            if not future.done() or future.exception() is not None:
+                logger.warning(
+                    f"Serving plant {plant['id']} data from "
+                    f"{time.time() - last['fetched_at']:.0f}s ago"
+                )
+            plants[plant["id"]] = last["data"]
+            recordings[plant["id"]] = last["results"]
+
+        if not plants:
+            raise RuntimeError("No plant data available")
+        try:
+            self._last_group[fetch_func] = fetch_func(MergedConnection(recordings))
+        except Exception as e:
+            logger.error(f"Error building the group view: {e}", exc_info=True)
+            if fetch_func not in self._last_group:
+                raise
+        return PlantViews(self._last_group[fetch_func], plants)
+
+
+def _data_source():
+    path = os.environ.get(PLANTS_ENV_VAR)
+    return PlantGroup.from_file(path) if path else db
+
+
+# What the dashboards fetch from: the plant group when DASHBOARD_PLANTS is set,
+# otherwise the single database connection
+data_source = _data_source()
@@ -0,0 +1,217 @@
+"""
+Opt-in recorder of production payloads for offline replay
+(benchmarks/replay_captures.py).
+
+Enabled by environment variables:
+    DASHBOARD_CAPTURE_DIR        directory for the captures (required to enable)
+    DASHBOARD_CAPTURE_CALLBACKS  "1" to also log Dash callback requests
+    DASHBOARD_CAPTURE_INTERVAL   minimum seconds between chart data captures (300)
+    DASHBOARD_CAPTURE_KEEP       number of chart data captures kept (200)
+
+Chart data captures are written as compressed snapshots (Database.snapshot_io)
+named charts-<YYYYmmdd-HHMMSS>; callback requests are appended to
+callbacks-<app>-<YYYYmmdd>.jsonl.gz.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import g, request
+
+from Database.snapshot_io import is_snapshot_file, read_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_DIR_ENV_VAR = "DASHBOARD_CAPTURE_DIR"
+CAPTURE_CALLBACKS_ENV_VAR = "DASHBOARD_CAPTURE_CALLBACKS"
+CAPTURE_INTERVAL_ENV_VAR = "DASHBOARD_CAPTURE_INTERVAL"
+CAPTURE_KEEP_ENV_VAR = "DASHBOARD_CAPTURE_KEEP"
+
+CHARTS_PREFIX = "charts-"
+CALLBACKS_PREFIX = "callbacks-"
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+
+class PayloadRecorder:
+    """
+    Writes captures in a background thread, so neither a refresh nor a
+    callback request waits for pickling, compression or disk I/O. Frames are
+    only read, never copied.
+    """
+
+    def __init__(
+        self,
+        capture_dir=None,
+        capture_callbacks: bool = False,
+        min_interval: float = 300,
+        keep: int = 200,
+    ):
+        self.capture_dir = capture_dir
+        self.capture_callbacks = bool(capture_dir) and capture_callbacks
+        self.min_interval = min_interval
+        self.keep = keep
+        self._last_capture = 0.0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            capture_dir=os.environ.get(CAPTURE_DIR_ENV_VAR) or None,
+            capture_callbacks=os.environ.get(CAPTURE_CALLBACKS_ENV_VAR) == "1",
+            min_interval=float(os.environ.get(CAPTURE_INTERVAL_ENV_VAR, 300)),
+            keep=int(os.environ.get(CAPTURE_KEEP_ENV_VAR, 200)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.capture_dir)
+
+    def capture_charts_data(self, charts_data: dict):
+        """Queue a capture of get_all_charts_data() output (rate limited)."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            if now - self._last_capture < self.min_interval:
+                return
+            self._last_capture = now
+        self._get_executor().submit(self._write_charts_data, charts_data, now)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # A single writer thread: captures are written in order, one at a time
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="payload-capture"
+                )
+            return self._executor
+
+    def _write_charts_data(self, charts_data: dict, timestamp: float):
+        try:
+            captured_at = datetime.fromtimestamp(timestamp)
+            name = f"{CHARTS_PREFIX}{captured_at.strftime(TIMESTAMP_FORMAT)}"
+            path = write_snapshot(
+                {
+                    "meta": {
+                        "captured_at": captured_at.isoformat(timespec="seconds"),
+                        "timestamp": timestamp,
+                    },
+                    "charts_data": charts_data,
+                },
+                os.path.join(self.capture_dir, name),
+            )
+            logger.info(f"Captured chart data to {path}")
+            self._prune()
+        except Exception as e:
+            logger.error(f"Error capturing chart data: {e}")
+
+    def _prune(self):
+        captures = list_chart_captures(self.capture_dir)
+        for _, path in captures[: max(0, len(captures) - self.keep)]:
+            os.remove(path)
+
+    def capture_callback(self, app_name: str, record: dict):
+        """Queue one callback request record for today's log."""
+        if not self.capture_callbacks:
+            return
+        self._get_executor().submit(
+            self._write_callback, app_name, record, datetime.now()
+        )
+
+    def _write_callback(self, app_name: str, record: dict, received_at: datetime):
+        day = received_at.strftime("%Y%m%d")
+        path = os.path.join(
+            self.capture_dir, f"{CALLBACKS_PREFIX}{app_name}-{day}.jsonl.gz"
+        )
+        try:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            os.makedirs(self.capture_dir, exist_ok=True)
+            # Each append is its own gzip member; readers see one stream
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write(line)
+        except Exception as e:
+            logger.error(f"Error capturing callback request: {e}")
+
+
+# Shared recorder, configured from the environment
+payload_recorder = PayloadRecorder.from_env()
+
+
+def register_callback_capture(app, app_name: str):
+    """
+    Log every /_dash-update-component request (body, status, server time and
+    response size) when DASHBOARD_CAPTURE_CALLBACKS=1.
+
+    Register it after register_compression so the uncompressed size is logged.
+    """
+    if not payload_recorder.capture_callbacks:
+        return
+    endpoint = app.config.routes_pathname_prefix + "_dash-update-component"
+
+    @app.server.before_request
+    def start_callback_capture():
+        if request.path == endpoint:
+            g.callback_capture_start = time.perf_counter()
+
+    @app.server.after_request
+    def finish_callback_capture(response):
+        start = g.pop("callback_capture_start", None)
+        if start is not None:
+            payload_recorder.capture_callback(
+                app_name,
+                {
+                    "timestamp": time.time(),
+                    "body": request.get_json(silent=True),
+                    "status": response.status_code,
+                    "duration_ms": (time.perf_counter() - start) * 1000,
+                    "bytes": len(response.get_data()),
+                },
+            )
+        return response
+
+    logger.info(
+        f"Capturing {app_name} callback requests to {payload_recorder.capture_dir}"
+    )
+
+
+def _capture_timestamp(name: str):
+    match = re.search(r"(\d{8}-\d{6})", name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), TIMESTAMP_FORMAT).timestamp()
+
+
+def list_chart_captures(capture_dir: str) -> list:
+    """[(timestamp, path)] of the chart data captures, oldest first."""
+    captures = []
+    for name in os.listdir(capture_dir):
+        if name.startswith(CHARTS_PREFIX) and is_snapshot_file(name):
+            timestamp = _capture_timestamp(name)
+            if timestamp is not None:
+                captures.append((timestamp, os.path.join(capture_dir, name)))
+    return sorted(captures)
+
+
+def load_chart_capture(path: str) -> dict:
+    """{"meta": ..., "charts_data": ...} of one capture."""
+    return read_snapshot(path)
+
+
+def iter_callback_records(capture_dir: str):
+    """Yield (app_name, record) from every callback log, file by file."""
+    for name in sorted(os.listdir(capture_dir)):
+        if not (name.startswith(CALLBACKS_PREFIX) and name.endswith(".jsonl.gz")):
+            continue
+        app_name = name[len(CALLBACKS_PREFIX) :].rsplit("-", 1)[0]
+        with gzip.open(os.path.join(capture_dir, name), "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield app_name, json.loads(line)
@@ -0,0 +1,407 @@
+"""
+Query plan and index advisor for the dashboard SQL (sql/[1-6]_*.sql).
+
+Runs every query the fetchers issue on a refresh against the configured
+backend with its plan command (SHOWPLAN_XML on SQL Server, EXPLAIN on MySQL,
+EXPLAIN QUERY PLAN on SQLite), flags table scans and sorts, and recommends
+index DDL for the access path of each query that is not covered by an
+existing index. With --apply the indexes are created and the queries timed
+again, giving a before/after report.
+
+Usage (from the project root):
+    python -m Database.query_advisor --repeat 5
+    python -m Database.query_advisor --apply --ddl-out sql/dashboard_indexes.sql
+    python -m Database.query_advisor --apply --rollback   (measure only)
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+# Access path of every dashboard query: (table, index columns[, included
+# columns]). Equality filters first, then range / ORDER BY / GROUP BY columns.
+# Included columns are INCLUDE columns on SQL Server and trailing key columns
+# elsewhere.
+QUERY_INDEXES = {
+    "1_machine_usage.sql": ("overall_usage", ["period"]),
+    "2_machine_status_desktop.sql": ("machine_status", []),  # whole table
+    # GROUP BY machine_name with min/max(position): answered from the index
+    "2_machine_status_mobile.sql": ("batch_queued", ["machine_name", "position"]),
+    # Step progress (Database/step_progress.py): rows modified since the
+    # high-water mark on every refresh; the seed runs once per reseed
+    "2_machine_step_progress_high_water.sql": ("batch_queued", ["modified_time"]),
+    "2_machine_step_progress_delta.sql": ("batch_queued", ["modified_time"]),
+    # period IN (...) ORDER BY date, machine_name: several periods cannot be
+    # read in date order from a (period, ...) index, so the index follows the
+    # ORDER BY and covers the filter and the selected columns
+    "3_machine_production.sql": (
+        "production_volume_log",
+        ["date", "machine_name"],
+        ["period", "weight_kg", "order_index"],
+    ),
+    "4_machine_waste.sql": ("machine_production_waste", ["period"]),
+    "5_batch_queued.sql": ("batch_queued", ["start_time"]),
+    "6_stop_reason.sql": ("stop_reasons_summary", ["period"]),
+}
+
+SHOWPLAN_NS = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+MSSQL_SCAN_OPS = ("Table Scan", "Clustered Index Scan", "Index Scan")
+
+
+def registered_queries(now: datetime = None) -> list:
+    """
+    Every query of a dashboard refresh, formatted like the fetchers do.
+
+    Returns:
+        list: [(sql file, label, SQL)]
+    """
+    from Database.chart5_windows import (
+        CHART5_TIME_WINDOWS,
+        bucket_now,
+        chart5_window,
+    )
+    from Database.fetch_all_charts_data import CHART3_PERIODS
+    from Database.resource_cache import load_yaml, read_sql
+
+    now = now or bucket_now()
+    periods = load_yaml("sql/1_machine_usage_replace.yml")["period_replace"]
+    waste_periods = load_yaml("sql/4_machine_waste_replace.yml")["period_replace"]
+    queries = []
+    for period in periods:
+        sql = read_sql("1_machine_usage.sql").format(period_replace=period)
+        queries.append(("1_machine_usage.sql", period, sql))
+    for file in ("2_machine_status_desktop.sql", "2_machine_status_mobile.sql"):
+        queries.append((file, "", read_sql(file)))
+    for period, values in CHART3_PERIODS.items():
+        period_values = ", ".join([f"'{p}'" for p in values])
+        sql = read_sql("3_machine_production.sql").format(period_replace=period_values)
+        queries.append(("3_machine_production.sql", period, sql))
+    for period in waste_periods:
+        sql = read_sql("4_machine_waste.sql").format(period_replace=period)
+        queries.append(("4_machine_waste.sql", period, sql))
+    for option in CHART5_TIME_WINDOWS:
+        min_start_time, max_start_time = chart5_window(option, now)
+        sql = read_sql("5_batch_queued.sql").format(
+            min_start_time=min_start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            max_start_time=max_start_time.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        queries.append(("5_batch_queued.sql", option, sql))
+    file = "2_machine_step_progress_high_water.sql"
+    queries.append((file, "", read_sql(file)))
+    sql = read_sql("2_machine_step_progress_delta.sql").format(
+        since=now.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    queries.append(("2_machine_step_progress_delta.sql", "", sql))
+    for period in periods:
+        sql = read_sql("6_stop_reason.sql").format(period_replace=period)
+        queries.append(("6_stop_reason.sql", period, sql))
+    return queries
+
+
+def explain(db, sql: str) -> list:
+    """
+    Plan of `sql` as findings.
+
+    Returns:
+        list: [{"kind": "scan" | "sort" | "temp" | "missing_index", "table", "detail"}]
+    """
+    sql = sql.strip().rstrip(";")
+    with db.engine.connect() as conn:
+        if db.backend == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            return _sqlite_findings([row[3] for row in rows])
+        if db.backend == "mysql":
+            result = conn.exec_driver_sql(f"EXPLAIN {sql}")
+            return _mysql_findings([dict(row._mapping) for row in result])
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.exec_driver_sql("SET SHOWPLAN_XML ON")
+        try:
+            plan_xml = conn.exec_driver_sql(sql).fetchone()[0]
+        finally:
+            conn.exec_driver_sql("SET SHOWPLAN_XML OFF")
+        return _mssql_findings(plan_xml)
+
+
+def _sqlite_findings(details: list) -> list:
+    findings = []
+    for detail in details:
+        words = detail.split()
+        if words[0] == "SCAN" and "COVERING INDEX" not in detail:
+            findings.append({"kind": "scan", "table": words[1], "detail": detail})
+        elif "USE TEMP B-TREE" in detail:
+            findings.append({"kind": "sort", "table": None, "detail": detail})
+    return findings
+
+
+def _mysql_findings(rows: list) -> list:
+    findings = []
+    for row in rows:
+        table, extra = row.get("table"), row.get("Extra") or ""
+        if row.get("type") in ("ALL", "index"):
+            detail = f"type={row['type']} key={row.get('key')} rows={row.get('rows')}"
+            findings.append({"kind": "scan", "table": table, "detail": detail})
+        if "filesort" in extra:
+            findings.append({"kind": "sort", "table": table, "detail": extra})
+        if "temporary" in extra:
+            findings.append({"kind": "temp", "table": table, "detail": extra})
+    return findings
+
+
+def _mssql_findings(plan_xml: str) -> list:
+    findings = []
+    root = ET.fromstring(plan_xml)
+    for relop in root.iter(f"{SHOWPLAN_NS}RelOp"):
+        op = relop.get("PhysicalOp")
+        obj = relop.find(f".//{SHOWPLAN_NS}Object")
+        table = obj.get("Table", "").strip("[]") if obj is not None else None
+        if op in MSSQL_SCAN_OPS:
+            detail = f"{op} est. rows={relop.get('EstimateRows')}"
+            findings.append({"kind": "scan", "table": table, "detail": detail})
+        elif op == "Sort":
+            findings.append({"kind": "sort", "table": None, "detail": op})
+    # The optimizer's own suggestions (sys.dm_db_missing_index_* of this plan)
+    for index in root.iter(f"{SHOWPLAN_NS}MissingIndex"):
+        key_columns, include = [], []
+        for group in index.iter(f"{SHOWPLAN_NS}ColumnGroup"):
+            names = [c.get("Name").strip("[]") for c in group]
+            if group.get("Usage") == "INCLUDE":
+                include += names
+            else:
+                key_columns += names
+        findings.append(
+            {
+                "kind": "missing_index",
+                "table": index.get("Table").strip("[]"),
+                "detail": f"columns={key_columns} include={include}",
+                "columns": key_columns,
+                "include": include,
+            }
+        )
+    return findings
+
+
+def time_query(db, sql: str, repeat: int) -> float:
+    """Median milliseconds to run `sql` and fetch every row."""
+    timings = []
+    for _ in range(repeat):
+        with db.engine.connect() as conn:
+            start = time.perf_counter()
+            conn.exec_driver_sql(sql).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _covered(indexes: list, columns: list) -> bool:
+    """Whether an existing index starts with `columns`."""
+    return any(index["column_names"][: len(columns)] == columns for index in indexes)
+
+
+def index_name(table: str, columns: list) -> str:
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def index_ddl(backend: str, table: str, columns: list, include=None) -> str:
+    name = index_name(table, columns)
+    if backend == "mssql":
+        ddl = (
+            f"CREATE NONCLUSTERED INDEX [{name}] ON [dbo].[{table}] "
+            f"({', '.join(f'[{c}]' for c in columns)})"
+        )
+        if include:
+            ddl += f" INCLUDE ({', '.join(f'[{c}]' for c in include)})"
+        return ddl + ";"
+    if backend == "mysql":
+        return (
+            f"CREATE INDEX `{name}` ON `{table}` "
+            f"({', '.join(f'`{c}`' for c in columns)});"
+        )
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)});"
+
+
+def drop_index_ddl(backend: str, table: str, columns: list) -> str:
+    name = index_name(table, columns)
+    if backend == "mssql":
+        return f"DROP INDEX [{name}] ON [dbo].[{table}];"
+    if backend == "mysql":
+        return f"DROP INDEX `{name}` ON `{table}`;"
+    return f"DROP INDEX IF EXISTS {name};"
+
+
+def recommend(db, plans: dict) -> list:
+    """
+    Index recommendations for the queries whose plans scan or sort.
+
+    Args:
+        db: DatabaseConnection.
+        plans: {sql file: findings of its queries}.
+
+    Returns:
+        list: [{"table", "columns", "include", "queries", "ddl"}], one per index.
+    """
+    inspector = inspect(db.engine)
+    recommendations = {}
+    for file, findings in plans.items():
+        table, columns, *include = QUERY_INDEXES[file]
+        include = include[0] if include else []
+        if db.backend != "mssql":
+            columns, include = columns + include, []
+        missing = [f for f in findings if f["kind"] == "missing_index"]
+        if missing:
+            # SQL Server knows best which columns its plan needs
+            table, columns, include = (
+                missing[0]["table"],
+                missing[0]["columns"],
+                missing[0]["include"],
+            )
+        elif not columns or not any(
+            f["kind"] in ("scan", "sort", "temp") for f in findings
+        ):
+            continue
+        if not inspector.has_table(table):
+            continue
+        if _covered(inspector.get_indexes(table), columns):
+            continue
+        key = (table, tuple(columns))
+        entry = recommendations.setdefault(
+            key,
+            {
+                "table": table,
+                "columns": columns,
+                "include": include,
+                "queries": [],
+                "ddl": index_ddl(db.backend, table, columns, include),
+            },
+        )
+        entry["queries"].append(file)
+    return list(recommendations.values())
+
+
+def remaining_findings(recommendation: dict, after: dict) -> list:
+    """
+    Findings an applied index was meant to remove that its queries' plans
+    still show; an empty list means the index is effective.
+    """
+    return [
+        f
+        for file in recommendation["queries"]
+        for f in after[file]["findings"]
+        if f["kind"] in ("scan", "sort", "temp", "missing_index")
+        and f["table"] in (recommendation["table"], None)
+    ]
+
+
+def analyze(db, queries: list, repeat: int) -> dict:
+    """{sql file: {"ms": total median ms over its queries, "findings": [...]}}"""
+    report = {}
+    for file, label, sql in queries:
+        entry = report.setdefault(file, {"ms": 0.0, "findings": []})
+        try:
+            findings = explain(db, sql)
+        except Exception as e:
+            logger.error(f"Error explaining {file} {label}: {e}")
+            findings = []
+        entry["findings"] += [f for f in findings if f not in entry["findings"]]
+        entry["ms"] += time_query(db, sql, repeat)
+    return report
+
+
+def print_report(before: dict, after: dict = None):
+    print(f"\n{'query':36} {'before ms':>10} {'after ms':>10}  findings")
+    for file, entry in before.items():
+        after_ms = f"{after[file]['ms']:10.1f}" if after else f"{'':>10}"
+        findings = "; ".join(
+            f"{f['kind']} {f['table'] or ''}".strip() for f in entry["findings"]
+        )
+        print(f"{file:36} {entry['ms']:10.1f} {after_ms}  {findings or '-'}")
+        if after:
+            for f in after[file]["findings"]:
+                print(f"{'':59}after: {f['kind']} {f['detail']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard query index advisor")
+    parser.add_argument("--credentials", help="Defaults to $DASHBOARD_DB_CREDENTIALS")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--apply", action="store_true", help="Create the indexes")
+    parser.add_argument(
+        "--rollback", action="store_true", help="Drop the created indexes afterwards"
+    )
+    parser.add_argument("--ddl-out", help="Write the recommended DDL to a file")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.credentials:
+        # Also for the module-level db instances created on import
+        os.environ["DASHBOARD_DB_CREDENTIALS"] = args.credentials
+    from Database.database_connection import DatabaseConnection
+
+    db = DatabaseConnection()
+    queries = registered_queries()
+    print(f"{len(queries)} queries on {db.backend_label}")
+
+    before = analyze(db, queries, args.repeat)
+    recommendations = recommend(
+        db, {file: entry["findings"] for file, entry in before.items()}
+    )
+    print("\nRecommended indexes:" if recommendations else "\nNo index recommended")
+    for r in recommendations:
+        print(f"  {r['ddl']}  -- {', '.join(r['queries'])}")
+    if args.ddl_out and recommendations:
+        with open(args.ddl_out, "w", encoding="utf-8") as f:
+            f.write("\n".join(r["ddl"] for r in recommendations) + "\n")
+        print(f"DDL written to {args.ddl_out}")
+
+    after = None
+    if args.apply and recommendations:
+        with db.engine.begin() as conn:
+            for r in recommendations:
+                conn.exec_driver_sql(r["ddl"].rstrip(";"))
+            if db.backend == "sqlite":
+                # SQL Server and InnoDB build index statistics on creation,
+                # SQLite's planner only sees the new indexes after ANALYZE
+                conn.exec_driver_sql("ANALYZE")
+        after = analyze(db, queries, args.repeat)
+        print("\nApplied indexes:")
+        for r in recommendations:
+            remaining = remaining_findings(r, after)
+            r["effective"] = not remaining
+            status = "effective" if not remaining else "NOT effective, plan still: "
+            print(
+                f"  {index_name(r['table'], r['columns'])}: {status}"
+                + "; ".join(f["detail"] for f in remaining)
+            )
+        if args.rollback:
+            with db.engine.begin() as conn:
+                for r in recommendations:
+                    conn.exec_driver_sql(
+                        drop_index_ddl(db.backend, r["table"], r["columns"]).rstrip(";")
+                    )
+    print_report(before, after)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "backend": db.backend,
+                    "before": before,
+                    "after": after,
+                    "recommendations": recommendations,
+                },
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+
+
+if __name__ == "__main__":
+    main()
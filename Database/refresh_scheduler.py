@@ -0,0 +1,174 @@
+"""
+Tiered refresh: each part of the chart data on its own cadence.
+
+Machine status and the batch queue (charts 2 and 5) change minute to minute;
+production volume, resource use and stop reasons (charts 3, 4 and 6) are
+upstream aggregates that change far less often. With DASHBOARD_REFRESH_TIERS=1
+an APScheduler BackgroundScheduler refreshes every part of
+CHART_PART_FETCHERS on its cadence in REFRESH_CADENCES, each run delayed by up
+to REFRESH_JITTER seconds so the parts (and server processes) do not hit the
+database in lockstep. Every refreshed part is combined with the latest other
+parts into a new snapshot, which the auto refresh callback hands to the
+clients instead of fetching itself.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from Database.fetch_all_charts_data import (
+    CHART_PART_FETCHERS,
+    CHART_PART_KEYS,
+    fetch_chart_part,
+    publish_charts_data,
+)
+from Database.last_snapshot import last_snapshot
+from Database.multi_plant import PlantGroup, PlantViews, data_source
+from Database.snapshot_store import snapshot_store
+
+logger = logging.getLogger(__name__)
+
+TIERED_REFRESH_ENV_VAR = "DASHBOARD_REFRESH_TIERS"
+
+# Seconds between two refreshes of each part
+REFRESH_CADENCES = {
+    "status": 60,
+    "usage": 60,
+    "production": 300,
+    "resources": 300,
+    "stop_reasons": 300,
+}
+# Up to this many seconds of random delay per run
+REFRESH_JITTER = 10
+
+
+class TieredRefresh:
+    def __init__(self, db, cadences: dict = None, jitter: float = REFRESH_JITTER):
+        """
+        Args:
+            db: DatabaseConnection or PlantGroup to fetch from.
+            cadences: Seconds between refreshes per part, REFRESH_CADENCES by default.
+            jitter: Maximum random delay of a run, in seconds.
+        """
+        self.db = db
+        self.cadences = {**REFRESH_CADENCES, **(cadences or {})}
+        self.jitter = jitter
+        self.snapshot = None
+        self._parts = {}
+        self._lock = threading.Lock()
+        self._scheduler = BackgroundScheduler(daemon=True)
+
+    def start(self, charts_data: dict, as_of: float = None):
+        """
+        Start refreshing, from the chart data the layout was built with.
+
+        Args:
+            charts_data: Initial chart data (get_startup_charts_data()).
+            as_of: Its fetch timestamp when it is the last snapshot saved on
+                disk; every part is then refreshed right away.
+        """
+        for part in CHART_PART_FETCHERS:
+            self._parts[part] = {
+                "data": self._select(charts_data, part),
+                "fetched_at": as_of if as_of is not None else time.time(),
+                "from_disk": as_of is not None,
+            }
+        now = datetime.now()
+        for part in CHART_PART_FETCHERS:
+            cadence = self.cadences[part]
+            self._scheduler.add_job(
+                self._refresh,
+                "interval",
+                args=[part],
+                id=f"refresh-{part}",
+                seconds=cadence,
+                jitter=self.jitter,
+                next_run_time=now + timedelta(seconds=0 if as_of else cadence),
+                max_instances=1,  # a slow part never runs twice at once
+                coalesce=True,
+                misfire_grace_time=cadence,
+            )
+        self._scheduler.start()
+        logger.info(f"Tiered refresh started: {self.cadences} (jitter {self.jitter}s)")
+
+    def shutdown(self):
+        self._scheduler.shutdown(wait=False)
+
+    @staticmethod
+    def _select(charts_data: dict, part: str):
+        """The part's charts of a complete chart data dict."""
+        keys = CHART_PART_KEYS[part]
+        selected = {key: charts_data[key] for key in keys}
+        plants = getattr(charts_data, "plants", None)
+        if plants is None:
+            return selected
+        return PlantViews(
+            selected,
+            {
+                plant_id: {key: plant_data[key] for key in keys}
+                for plant_id, plant_data in plants.items()
+            },
+        )
+
+    def _refresh(self, part: str):
+        start = time.perf_counter()
+        try:
+            data = fetch_chart_part(self.db, part)
+        except Exception as e:
+            logger.error(f"Tiered refresh: error fetching {part}: {e}", exc_info=True)
+            return
+        with self._lock:
+            self._parts[part] = {
+                "data": data,
+                "fetched_at": time.time(),
+                "from_disk": False,
+            }
+            charts_data, as_of = self._assemble()
+            self.snapshot = snapshot_store.put(charts_data, as_of=as_of)
+            # Under the lock, so parts finishing together hand their
+            # assemblies over in order; both only queue a background write
+            publish_charts_data(charts_data)
+            last_snapshot.save(charts_data)
+        logger.info(
+            f"Tiered refresh: {part} fetched in {time.perf_counter() - start:.2f}s, "
+            f"snapshot {self.snapshot['snapshot_id']} stored"
+        )
+
+    def _assemble(self):
+        """All parts in one chart data dict, and the oldest disk part's time."""
+        group = {}
+        for part in self._parts.values():
+            group.update(part["data"])
+        charts_data = dict(sorted(group.items()))
+
+        if isinstance(self.db, PlantGroup):
+            part_plants = [
+                getattr(part["data"], "plants", {}) for part in self._parts.values()
+            ]
+            # Plants missing from a part (never fetched yet) are left out
+            plant_ids = set.intersection(*(set(plants) for plants in part_plants))
+            plants = {}
+            for plant_id in plant_ids:
+                plant_data = {}
+                for part in part_plants:
+                    plant_data.update(part[plant_id])
+                plants[plant_id] = dict(sorted(plant_data.items()))
+            charts_data = PlantViews(charts_data, plants)
+
+        disk_times = [p["fetched_at"] for p in self._parts.values() if p["from_disk"]]
+        return charts_data, min(disk_times) if disk_times else None
+
+
+def _tiered_refresh():
+    if os.environ.get(TIERED_REFRESH_ENV_VAR) != "1":
+        return None
+    return TieredRefresh(data_source)
+
+
+# Started by the apps when DASHBOARD_REFRESH_TIERS=1, otherwise None and the
+# auto refresh fetches everything itself
+tiered_refresh = _tiered_refresh()
@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+import logging
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceCache:
+    """
+    In-memory cache for SQL templates and YAML config files.
+
+    Files are read and parsed once; afterwards a cheap os.stat() (at most once
+    every `check_interval` seconds per file) detects edits, so changed files
+    are hot-reloaded without restarting the dashboard.
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, check_interval: float = 2.0):
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_version(path: str):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _get(self, path: str, kind: str, loader):
+        key = (os.path.abspath(path), kind)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and now - entry["checked_at"] < self.check_interval:
+            return entry["value"]
+
+        version = self._file_version(path)
+        if entry is not None and entry["version"] == version:
+            entry["checked_at"] = now
+            return entry["value"]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["version"] != version:
+                if entry is not None:
+                    logger.info(f"Reloading changed resource: {path}")
+                entry = {"version": version, "value": loader(path), "derived": {}}
+                self._entries[key] = entry
+            entry["checked_at"] = now
+            return entry["value"]
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+        """Return the content of a text file (e.g. an SQL template)."""
+
+        def _load(p):
+            with open(p, "r", encoding=encoding) as f:
+                return f.read()
+
+        return self._get(path, "text", _load)
+
+    def load_yaml(self, path: str):
+        """Return the parsed content of a YAML file."""
+
+        def _load(p):
+            with open(p, "r", encoding="utf-8") as f:
+                return yaml.safe_load(f)
+
+        return self._get(path, "yaml", _load)
+
+    def derived(self, path: str, name: str, builder):
+        """
+        Memoize a value derived from a YAML file.
+
+        Args:
+            path: YAML file the value is derived from.
+            name: Name of the derived value.
+            builder: Callable receiving the parsed YAML and returning the value.
+
+        Returns:
+            The derived value, rebuilt only when the YAML file changes.
+        """
+        self.load_yaml(path)
+        entry = self._entries[(os.path.abspath(path), "yaml")]
+        derived = entry["derived"]
+        if name not in derived:
+            derived[name] = builder(entry["value"])
+        return derived[name]
+
+    def clear(self):
+        """Drop every cached resource."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared cache instance
+resource_cache = ResourceCache()
+
+
+def read_sql(file: str) -> str:
+    """Return the SQL template `sql/<file>`."""
+    return resource_cache.read_text(os.path.join("sql", file))
+
+
+def load_yaml(path: str):
+    """Return the parsed YAML file at `path`."""
+    return resource_cache.load_yaml(path)
@@ -0,0 +1,74 @@
+"""
+Compressed on-disk snapshots of chart data ({chart_key: {period: {key: df}}}).
+
+Frames are pickled, so dtypes, NULLs and odd values survive exactly, then
+compressed with zstandard (gzip when zstandard is not installed). Only load
+files this dashboard wrote: unpickling runs arbitrary code.
+"""
+
+import gzip
+import logging
+import os
+import pickle
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD_EXTENSION = ".pkl.zst"
+GZIP_EXTENSION = ".pkl.gz"
+
+
+def snapshot_extension() -> str:
+    """File extension written by write_snapshot on this installation."""
+    return ZSTD_EXTENSION if zstandard is not None else GZIP_EXTENSION
+
+
+def dumps_snapshot(payload, level: int = 3) -> bytes:
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=min(level * 2, 9))
+
+
+def loads_snapshot(data: bytes, compressed_with_zstd: bool):
+    if compressed_with_zstd:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst snapshots")
+        return pickle.loads(zstandard.ZstdDecompressor().decompress(data))
+    return pickle.loads(gzip.decompress(data))
+
+
+def write_snapshot(payload, path: str, level: int = 3) -> str:
+    """
+    Write a snapshot atomically (temp file + rename).
+
+    Args:
+        payload: Any picklable object, typically {"meta": ..., "charts_data": ...}.
+        path: Target path without extension; snapshot_extension() is appended.
+        level: Compression level.
+
+    Returns:
+        str: The written file path.
+    """
+    path = path + snapshot_extension()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dumps_snapshot(payload, level))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path: str):
+    """Read a snapshot written by write_snapshot."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return loads_snapshot(data, compressed_with_zstd=path.endswith(".zst"))
+
+
+def is_snapshot_file(name: str) -> bool:
+    return name.endswith(ZSTD_EXTENSION) or name.endswith(GZIP_EXTENSION)
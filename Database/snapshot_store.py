@@ -0,0 +1,134 @@
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Server-side store for fetched chart data ({chart_key: {period: {key: df}}}).
+
+    Instead of shipping every chart's serialized DataFrames to the browser,
+    `all-chart-data-store` only holds a small handle
+    ({"snapshot_id", "created_at"}); callbacks resolve it back to the
+    DataFrames kept here. The last `max_snapshots` snapshots are kept so
+    clients still holding a slightly older id keep working.
+
+    Snapshots are shared by all callbacks and clients of this process and
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_snapshots: int = 8):
+        self.max_snapshots = max_snapshots
+        self._snapshots = OrderedDict()
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def put(self, charts_data: dict, as_of: Optional[float] = None) -> dict:
+        """
+        Store a new snapshot.
+
+        Args:
+            charts_data: Result of get_all_charts_data().
+            as_of: Fetch timestamp of data older than this snapshot, e.g. the
+                last snapshot loaded from disk at boot; added to the handle.
+
+        Returns:
+            dict: The handle to put into `all-chart-data-store`.
+        """
+        created_at = time.time()
+        with self._lock:
+            snapshot_id = f"{int(created_at * 1000)}-{next(self._counter)}"
+            self._snapshots[snapshot_id] = charts_data
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        logger.debug(f"Stored chart data snapshot {snapshot_id}")
+        handle = {"snapshot_id": snapshot_id, "created_at": created_at}
+        if as_of is not None:
+            handle["as_of"] = as_of
+        return handle
+
+    def get(self, snapshot_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._snapshots.get(snapshot_id)
+
+    def latest(self) -> Optional[dict]:
+        with self._lock:
+            if not self._snapshots:
+                return None
+            return next(reversed(self._snapshots.values()))
+
+    def latest_id(self) -> Optional[str]:
+        with self._lock:
+            if not self._snapshots:
+                return None
+            return next(reversed(self._snapshots))
+
+
+# Shared store instance
+snapshot_store = SnapshotStore()
+
+
+def resolve_charts_data(store_data, fallback: bool = True) -> Optional[dict]:
+    """
+    Return the chart data referenced by an `all-chart-data-store` handle.
+
+    Falls back to the newest snapshot when the id is unknown (evicted, or
+    issued before a server restart / by another worker process), unless
+    `fallback` is False.
+
+    In multi-plant mode the handle may also name a plant ("plant"); its view
+    is returned instead of the group view.
+
+    Args:
+        store_data: The `all-chart-data-store` data
+            ({"snapshot_id", "created_at"[, "as_of"][, "plant"]}).
+
+    Returns:
+        dict: {chart_key: {period: {key: df}}}, or None if no snapshot exists.
+    """
+    snapshot_id = (
+        store_data.get("snapshot_id") if isinstance(store_data, dict) else None
+    )
+    charts_data = snapshot_store.get(snapshot_id) if snapshot_id else None
+    if charts_data is None:
+        if not fallback:
+            logger.warning(f"Snapshot '{snapshot_id}' not found")
+            return None
+        logger.warning(
+            f"Snapshot '{snapshot_id}' not found, falling back to the latest snapshot"
+        )
+        charts_data = snapshot_store.latest()
+
+    plant = store_data.get("plant") if isinstance(store_data, dict) else None
+    if plant and charts_data is not None:
+        plant_data = getattr(charts_data, "plants", {}).get(plant)
+        if plant_data is not None:
+            return plant_data
+    return charts_data
+
+
+def pin_snapshot(store_data) -> Optional[dict]:
+    """
+    The handle of the snapshot resolve_charts_data(store_data) resolves to,
+    for callbacks that must keep reading that very snapshot (e.g. the pages
+    of a detail view) while auto refreshes replace the client's handle.
+
+    Returns:
+        dict: {"snapshot_id"[, "plant"]}, or None if no snapshot exists.
+    """
+    snapshot_id = (
+        store_data.get("snapshot_id") if isinstance(store_data, dict) else None
+    )
+    if not snapshot_id or snapshot_store.get(snapshot_id) is None:
+        snapshot_id = snapshot_store.latest_id()
+    if snapshot_id is None:
+        return None
+    handle = {"snapshot_id": snapshot_id}
+    if isinstance(store_data, dict) and store_data.get("plant"):
+        handle["plant"] = store_data["plant"]
+    return handle
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import logging
+import weakref
+from collections import defaultdict
+
+import pandas as pd
+
+from Database.resource_cache import read_sql
+
+logger = logging.getLogger(__name__)
+
+STEP_PROGRESS_RESEED_ENV_VAR = "DASHBOARD_STEP_PROGRESS_RESEED"
+
+# Columns the machine status table joins on machine_name
+STEP_PROGRESS_COLUMNS = ["machine_name", "total_steps_cnt", "current_step_cnt"]
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class StepProgressTracker:
+    """
+    Queue progress of every machine (min / max position in batch_queued),
+    maintained in process instead of grouping all of batch_queued on every
+    machine status refresh (the subquery of 2_machine_status_mobile.sql).
+
+    Seeded once with the queued batches (rows with a position). Afterwards a
+    refresh only reads the rows modified after the high-water mark, the
+    largest modified_time seen truncated to the second
+    (2_machine_step_progress_delta.sql, a range on the modified_time index):
+    each replaces its batch, a batch without a position (finished) leaves the
+    queue, and only the machines touched are re-aggregated. Deleted rows, and
+    a row written in the very second of the mark after it was read, are never
+    returned by the delta, so the tracker reseeds every `reseed_interval`
+    seconds.
+    """
+
+    def __init__(self, reseed_interval: float = 3600):
+        self.reseed_interval = reseed_interval
+        # machine_name -> {batch_no: position} of the queued batches
+        self._queues = defaultdict(dict)
+        self._progress = {}
+        self._frame = pd.DataFrame(columns=STEP_PROGRESS_COLUMNS)
+        self._high_water = None
+        self._seeded_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(float(os.environ.get(STEP_PROGRESS_RESEED_ENV_VAR, 3600)))
+
+    def refresh(self, db) -> pd.DataFrame:
+        """
+        Bring the aggregate up to date and return it.
+
+        Returns:
+            pd.DataFrame: machine_name, total_steps_cnt (max position),
+                current_step_cnt (min position); machines without a queued
+                batch are left out. Shared between callers, read-only.
+        """
+        with self._lock:
+            if (
+                self._seeded_at is None
+                or time.monotonic() - self._seeded_at >= self.reseed_interval
+            ):
+                self._seed(db)
+            else:
+                self._apply_delta(db)
+            return self._frame
+
+    def _seed(self, db):
+        # High-water mark first: rows written meanwhile are read again by the
+        # next delta, which is harmless as rows replace their batch
+        high_water = db.execute_query(
+            read_sql("2_machine_step_progress_high_water.sql")
+        )
+        rows = db.execute_query(read_sql("2_machine_step_progress_seed.sql"))
+        self._queues = defaultdict(dict)
+        self._progress = {}
+        self._update(rows, replace=False)
+        self._high_water = _max_time(high_water["high_water"])
+        self._seeded_at = time.monotonic()
+        logger.info(
+            f"Step progress seeded: {len(rows)} queued batches of "
+            f"{len(self._progress)} machines"
+        )
+
+    def _apply_delta(self, db):
+        if self._high_water is None:
+            # Empty table at seed time: wait for the reseed
+            return
+        rows = db.execute_query(
+            read_sql("2_machine_step_progress_delta.sql").format(
+                since=self._high_water.strftime(TIME_FORMAT)
+            )
+        )
+        if rows.empty:
+            return
+        self._update(rows, replace=True)
+        self._high_water = max(self._high_water, _max_time(rows["modified_time"]))
+
+    def _update(self, rows: pd.DataFrame, replace: bool):
+        """Apply batch rows and re-aggregate the machines they belong to."""
+        positions = pd.to_numeric(rows["position"], errors="coerce")
+        touched = set()
+        for machine, batch, position in zip(
+            rows["machine_name"], rows["batch_no"], positions
+        ):
+            queue = self._queues[machine]
+            if pd.notna(position):
+                queue[batch] = position
+            elif replace:
+                queue.pop(batch, None)
+            touched.add(machine)
+        for machine in touched:
+            queue = self._queues[machine]
+            if queue:
+                self._progress[machine] = (max(queue.values()), min(queue.values()))
+            else:
+                self._queues.pop(machine, None)
+                self._progress.pop(machine, None)
+        self._frame = pd.DataFrame(
+            [(machine, *steps) for machine, steps in self._progress.items()],
+            columns=STEP_PROGRESS_COLUMNS,
+        )
+
+
+def _max_time(values: pd.Series):
+    latest = pd.to_datetime(values, errors="coerce").max()
+    return None if pd.isna(latest) else latest.to_pydatetime()
+
+
+# One tracker per database (a plant each in multi-plant mode)
+_trackers = weakref.WeakKeyDictionary()
+_trackers_lock = threading.Lock()
+
+
+def refresh_step_progress(db) -> pd.DataFrame:
+    """StepProgressTracker.refresh() with the tracker of the database `db`."""
+    with _trackers_lock:
+        tracker = _trackers.get(db)
+        if tracker is None:
+            tracker = _trackers[db] = StepProgressTracker.from_env()
+    return tracker.refresh(db)
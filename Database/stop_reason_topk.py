@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Long-format columns of the top-k table stored per period in chart 6 data
+TOP_REASON_COLUMNS = ["machine_name", "rank", "reason_col", "reason_hour"]
+
+
+def get_reason_columns(df: pd.DataFrame) -> list:
+    """Return the columns of *df* that hold stop reason hours ('reason1_hour' ...)."""
+    return [col for col in df.columns if str(col).startswith("reason")]
+
+
+def compute_top_reasons(df: pd.DataFrame, k: int = 5) -> pd.DataFrame:
+    """
+    Compute the top-k non-zero stop reasons for every machine in one pass.
+
+    The reason columns are stacked into a (machines x reasons) matrix and
+    sorted per row in one np.argsort call, so the cost does not depend on
+    Python-level loops over machines or reasons. Ties keep the column order.
+
+    Args:
+        df: Stop reason frame with a 'machine_name' column and 'reason*' columns.
+        k: Number of reasons to keep per machine (default: 5).
+
+    Returns:
+        pd.DataFrame: Long-format frame with columns
+            machine_name, rank (1 = largest), reason_col, reason_hour.
+            Zero and NULL reasons are dropped, so a machine may have fewer
+            than k rows (or none).
+    """
+    if df is None or df.empty or "machine_name" not in df.columns:
+        return pd.DataFrame(columns=TOP_REASON_COLUMNS)
+
+    reason_cols = get_reason_columns(df)
+    if not reason_cols or k <= 0:
+        return pd.DataFrame(columns=TOP_REASON_COLUMNS)
+
+    values = (
+        df[reason_cols]
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=float, na_value=np.nan)
+    )
+    values = np.nan_to_num(values, nan=0.0)
+    top_k = min(k, values.shape[1])
+
+    # Stable sort: value desc, ties in column order, like the sorted(...,
+    # reverse=True) this replaces (np.argpartition breaks ties arbitrarily);
+    # zeros sort last, as they are dropped before ranking
+    sort_key = np.where(values != 0, -values, np.inf)
+    top_idx = np.argsort(sort_key, axis=1, kind="stable")[:, :top_k]
+    top_vals = np.take_along_axis(values, top_idx, axis=1)
+
+    keep = top_vals != 0
+    machine_pos, rank_pos = np.nonzero(keep)
+
+    return pd.DataFrame(
+        {
+            "machine_name": df["machine_name"].to_numpy()[machine_pos],
+            "rank": rank_pos + 1,
+            "reason_col": np.asarray(reason_cols, dtype=object)[top_idx[keep]],
+            "reason_hour": top_vals[keep],
+        },
+        columns=TOP_REASON_COLUMNS,
+    )
+
+
+def top_reasons_by_machine(top_reasons: pd.DataFrame) -> dict:
+    """Group a long top-k frame into {machine_name: [(reason_col, hours), ...]}."""
+    if top_reasons is None or top_reasons.empty:
+        return {}
+    ordered = top_reasons.sort_values(by=["machine_name", "rank"], kind="stable")
+    result = {}
+    for machine_name, reason_col, hours in zip(
+        ordered["machine_name"], ordered["reason_col"], ordered["reason_hour"]
+    ):
+        result.setdefault(machine_name, []).append((reason_col, hours))
+    return result
+
+
+def widen_top_reasons(
+    machine_df: pd.DataFrame, top_reasons: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Build the wide 'highest' / 'lowest' frame used by the chart 6 summary.
+
+    Each row keeps machine_name, idle_hour (if present) and one column per
+    top reason, named after the original reason column.
+    """
+    if machine_df is None or machine_df.empty:
+        return machine_df
+
+    reasons = top_reasons_by_machine(top_reasons)
+    processed_machines = []
+    for _, row in machine_df.iterrows():
+        machine_name = row.get("machine_name", "Unknown")
+        machine_data = {"machine_name": machine_name}
+        if "idle_hour" in row:
+            machine_data["idle_hour"] = row["idle_hour"]
+        for reason_col, value in reasons.get(machine_name, []):
+            machine_data[reason_col] = value
+        processed_machines.append(machine_data)
+
+    return pd.DataFrame(processed_machines)
@@ -0,0 +1,111 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TTL_ENV_VAR = "DASHBOARD_REFRESH_TTL"
+MAX_STALENESS_ENV_VAR = "DASHBOARD_MAX_STALENESS"
+REFRESH_WAIT_ENV_VAR = "DASHBOARD_REFRESH_WAIT"
+
+
+class SwrCache:
+    """
+    Single-flight cache that falls back to stale values.
+
+    Per key, a value younger than `ttl` seconds is returned as is. Once it is
+    older, callers wait (up to `wait` seconds) for a fresh load; however many
+    callers miss at once, each key has at most one load in flight and they
+    all share its result. Only when that load fails or takes longer is the
+    previous value served, up to `max_stale` seconds old, while the load
+    keeps running in the background for the next caller.
+
+    Ages count from the start of the load that produced the value. A failed
+    load keeps the previous value. Values are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30,
+        max_stale: float = 600,
+        wait: float = 20,
+        max_workers: int = 4,
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.wait = wait
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="swr-load"
+        )
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=float(os.environ.get(REFRESH_TTL_ENV_VAR, 30)),
+            max_stale=float(os.environ.get(MAX_STALENESS_ENV_VAR, 600)),
+            wait=float(os.environ.get(REFRESH_WAIT_ENV_VAR, 20)),
+        )
+
+    def get(self, key, load, timeout: float = None):
+        """
+        Return the cached value of `key`, loading it with `load()` when needed.
+
+        Args:
+            key: Any hashable cache key.
+            load: Callable without arguments returning the value.
+            timeout: Seconds to wait for a load when no usable stale value is
+                cached (None waits for it to finish).
+
+        Returns:
+            The cached or loaded value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry["loaded_at"] if entry is not None else None
+            if age is not None and age < self.ttl:
+                return entry["value"]
+            future = self._inflight.get(key)
+            if future is None:
+                # _load's cleanup needs the lock, so it runs after this insert
+                future = self._executor.submit(self._load, key, load)
+                self._inflight[key] = future
+        if age is None or age >= self.max_stale:
+            return future.result(timeout)
+        try:
+            return future.result(self.wait)
+        except Exception as e:
+            reason = "timed out" if isinstance(e, FutureTimeoutError) else "failed"
+            logger.warning(f"Loading {key!r} {reason}, serving it from {age:.0f}s ago")
+            return entry["value"]
+
+    def _load(self, key, load):
+        started_at = time.monotonic()
+        try:
+            value = load()
+        except Exception as e:
+            logger.error(f"Error loading {key!r}: {e}")
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = {"value": value, "loaded_at": started_at}
+            logger.debug(f"Loaded {key!r} in {time.monotonic() - started_at:.2f}s")
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, key):
+        """Forget the value of `key`; the next get() loads it again."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# Cache of the auto refresh: one fetch per refresh interval for all clients
+charts_data_cache = SwrCache.from_env()
@@ -0,0 +1,428 @@
+"""
+Synthetic plant data for the local SQLite stand-in database.
+
+Builds the tables of sql/import_db.sql (overall_usage, machine_status,
+batch_queued, production_volume_log, machine_production_waste,
+stop_reasons_summary) for a plant of any size, so every fetcher and chart can
+be run and benchmarked without the production SQL Server.
+
+Usage (from the project root):
+    python -m Database.synthetic_data --machines 100 --weeks 4
+    set DASHBOARD_DB_CREDENTIALS=env/db_credentials_local.yml   (Windows)
+    export DASHBOARD_DB_CREDENTIALS=env/db_credentials_local.yml  (Linux)
+    python desktop_app.py
+
+Typical plant sizes are 10, 100 and 1000 machines.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DDL_PATH = "sql/import_db_sqlite.sql"
+DEFAULT_DB_PATH = "env/dashboard_local.db"
+DEFAULT_CREDENTIALS_PATH = "env/db_credentials_local.yml"
+
+NUM_REASONS = 31
+CENTRAL_ID = "B"
+TOTAL_MACHINE_NAME = "平均"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Current machine state and its share of the plant
+MACHINE_STATES = {"行机": 0.7, "暂停": 0.1, "停机": 0.12, "关机": 0.05, "维修": 0.03}
+PROGRAM_NAMES = [
+    "02 全毛染色98-40",
+    "03 棉染色60",
+    "05 涤纶染色130",
+    "0001 DEMO",
+    "0002 入布",
+]
+STEP_NAMES = ["入布", "前处理", "升温", "保温", "染色", "降温", "水洗", "皂洗", "出布"]
+ALARMS = ["缸体温度针故障", "主缸温度针故障", "副缸1温度针故障", "主泵过载", "水位异常"]
+
+
+def machine_names(num_machines: int) -> list:
+    width = max(2, len(str(num_machines)))
+    return [f"lan{i:0{width}d}" for i in range(1, num_machines + 1)]
+
+
+def _period_days(days: pd.DatetimeIndex, today: pd.Timestamp) -> dict:
+    """Day masks for the period keys used by the SQL files."""
+    week_start = today - pd.Timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    last_month_start = (month_start - pd.Timedelta(days=1)).replace(day=1)
+    return {
+        "今天": days == today,
+        "昨日": days == today - pd.Timedelta(days=1),
+        "本周": days >= week_start,
+        "上周": (days >= week_start - pd.Timedelta(days=7)) & (days < week_start),
+        "本月": days >= month_start,
+        "上月": (days >= last_month_start) & (days < month_start),
+    }
+
+
+def _simulate_days(names: list, days: pd.DatetimeIndex, now: datetime, rng) -> dict:
+    """
+    Per machine, per day hours / production / consumption, as (machines, days)
+    arrays.
+    """
+    num_machines, num_days = len(names), len(days)
+    shape = (num_machines, num_days)
+
+    hours = np.full(num_days, 24.0)
+    # Today only counts the hours elapsed so far
+    hours[-1] = max(0.5, (now - days[-1].to_pydatetime()).total_seconds() / 3600)
+
+    # Every machine has its own utilisation and split of the lost time
+    base_run = rng.beta(6, 3, num_machines)
+    run_frac = np.clip(base_run[:, None] + rng.normal(0, 0.08, shape), 0, 1)
+    loss_split = rng.dirichlet([6, 2, 1], num_machines)  # idle / down / repair
+    run_hour = run_frac * hours
+    lost_hour = hours - run_hour
+    idle_hour = lost_hour * loss_split[:, 0:1]
+    down_hour = lost_hour * loss_split[:, 1:2]
+    repair_hour = lost_hour - idle_hour - down_hour
+
+    capacity = rng.uniform(40, 250, num_machines)[:, None]  # kg per running hour
+    weight_kg = run_hour * capacity * rng.uniform(0.8, 1.1, shape)
+    water_ton = weight_kg * rng.uniform(0.05, 0.15, num_machines)[:, None]
+    power_kwh = weight_kg * rng.uniform(0.3, 1.5, num_machines)[:, None]
+    steam_ton = weight_kg * rng.uniform(0.02, 0.08, num_machines)[:, None]
+
+    # Lost time is spread over a few reasons, some much more common than others
+    popularity = rng.dirichlet(np.full(NUM_REASONS, 0.4))
+    reason_weights = rng.dirichlet(popularity * 20 + 1e-3, num_machines * num_days)
+    reason_weights[reason_weights < 0.05] = 0
+    reason_weights /= reason_weights.sum(axis=1, keepdims=True)
+    reason_hour = reason_weights.reshape(num_machines, num_days, NUM_REASONS) * (
+        lost_hour[:, :, None]
+    )
+
+    return {
+        "hours": np.broadcast_to(hours, shape),
+        "run_hour": run_hour,
+        "idle_hour": idle_hour,
+        "down_hour": down_hour,
+        "repair_hour": repair_hour,
+        "weight_kg": weight_kg,
+        "water_ton": water_ton,
+        "power_kwh": power_kwh,
+        "steam_ton": steam_ton,
+        "reason_hour": reason_hour,
+    }
+
+
+def _period_rows(names, period, date, refresh_time) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "central_id": CENTRAL_ID,
+            "central_name": "",
+            "period": period,
+            "date": date,
+            "machine_name": names,
+            "refresh_time": refresh_time,
+            "write_time": refresh_time,
+        }
+    )
+
+
+def build_summary_tables(names, days, sim, periods, refresh_time) -> dict:
+    """overall_usage, machine_production_waste and stop_reasons_summary."""
+    usage, waste, stops = [], [], []
+    for period, mask in periods.items():
+        if not mask.any():
+            continue
+        total = {
+            key: sim[key][:, mask].sum(axis=1) for key in sim if key != "reason_hour"
+        }
+        reasons = sim["reason_hour"][:, mask, :].sum(axis=1)
+        date = days[mask][0].strftime(TIME_FORMAT)
+        hours = np.where(total["hours"] > 0, total["hours"], 1)
+
+        df = _period_rows(names, period, date, refresh_time)
+        df["run"] = total["run_hour"] / hours * 100
+        df["idle"] = total["idle_hour"] / hours * 100
+        df["down"] = total["down_hour"] / hours * 100
+        df["repair"] = total["repair_hour"] / hours * 100
+        df["order_index"] = 1
+        df["weight_kg"] = total["weight_kg"].round().astype(int)
+        usage.append(df)
+
+        df = _period_rows(names, period, date, refresh_time)
+        df["water_ton"] = total["water_ton"]
+        df["power_kwh"] = total["power_kwh"]
+        df["steam_ton"] = total["steam_ton"]
+        df["order_index"] = 1
+        df["weight_kg"] = total["weight_kg"].round().astype(int)
+        waste.append(df)
+
+        # Machines are order_index 0, the plant average is order_index 1
+        df = _period_rows(names, period, date, refresh_time)
+        df["run_hour"] = total["run_hour"]
+        for i in range(NUM_REASONS):
+            df[f"reason{i + 1}_hour"] = reasons[:, i]
+        df["sum_hour"] = total["hours"]
+        df["order_index"] = 0
+        avg = df.iloc[0:1].copy()
+        numeric = ["run_hour", "sum_hour"] + [
+            f"reason{i + 1}_hour" for i in range(NUM_REASONS)
+        ]
+        avg[numeric] = df[numeric].mean().to_numpy()
+        avg["machine_name"] = TOTAL_MACHINE_NAME
+        avg["order_index"] = 1
+        stops.append(pd.concat([df, avg], ignore_index=True))
+
+    return {
+        "overall_usage": pd.concat(usage, ignore_index=True),
+        "machine_production_waste": pd.concat(waste, ignore_index=True),
+        "stop_reasons_summary": pd.concat(stops, ignore_index=True),
+    }
+
+
+def build_production_volume_log(names, days, sim, today, refresh_time) -> pd.DataFrame:
+    """
+    Chart 3 history: today vs the previous 6 days, this week vs the previous
+    weeks and this month vs the previous months.
+    """
+    weight = pd.DataFrame(sim["weight_kg"].T, index=days, columns=names)
+    week_start = today - pd.Timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+
+    weekly = weight.groupby(
+        weight.index - pd.to_timedelta(weight.index.weekday, unit="D")
+    )
+    monthly = weight.groupby(weight.index.to_period("M").to_timestamp())
+
+    frames = []
+    groups = {
+        ("今天", "昨日"): (weight, today),
+        ("本周", "上周"): (weekly.sum(), week_start),
+        ("本月", "上月"): (monthly.sum(), month_start),
+    }
+    for (current, previous), (table, current_start) in groups.items():
+        table = table.iloc[-7:]
+        for date, row in table.iterrows():
+            period = current if date == current_start else previous
+            df = pd.DataFrame(
+                {
+                    "central_id": CENTRAL_ID,
+                    "central_name": "",
+                    "period": period,
+                    "date": date.strftime(TIME_FORMAT),
+                    "machine_name": names + [TOTAL_MACHINE_NAME],
+                    "weight_kg": np.append(row.to_numpy(), row.sum()).round(2),
+                    "order_index": [1] * len(names) + [0],
+                    "refresh_time": refresh_time,
+                    "write_time": refresh_time,
+                }
+            )
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_batch_tables(names, now, weeks, rng) -> dict:
+    """
+    batch_queued (finished, running and queued batches) and machine_status
+    (one row per machine, matching its running batch).
+    """
+    states = rng.choice(
+        list(MACHINE_STATES), len(names), p=list(MACHINE_STATES.values())
+    )
+    start = now - timedelta(weeks=weeks)
+    horizon = now + timedelta(days=2)
+    refresh_time = now.strftime(TIME_FORMAT)
+
+    batches, status = [], []
+    for machine, state in zip(names, states):
+        # Batches run back to back with a short changeover in between
+        num = int((horizon - start).total_seconds() / 3600 / 3) + 4
+        run_minutes = rng.integers(30, 420, num)
+        gaps = rng.integers(5, 60, num)
+        offsets = np.concatenate([[0], np.cumsum(run_minutes + gaps)[:-1]])
+        starts = pd.Timestamp(start) + pd.to_timedelta(offsets, unit="m")
+        ends = starts + pd.to_timedelta(run_minutes, unit="m")
+        keep = starts < horizon
+        starts, ends, run_minutes = starts[keep], ends[keep], run_minutes[keep]
+
+        # Finished batches have no queue position; running is 1, queued 2, 3, ...
+        current = int(np.searchsorted(ends, pd.Timestamp(now)))
+        position = np.full(len(starts), np.nan)
+        position[current:] = np.arange(1, len(starts) - current + 1)
+        batch_no = [f"{machine[-3:]}{s:%m%d%H%M}" for s in starts]
+        programs = rng.choice(PROGRAM_NAMES, len(starts))
+        batches.append(
+            pd.DataFrame(
+                {
+                    "central_id": CENTRAL_ID,
+                    "central_name": "",
+                    "machine_name": machine,
+                    "state": state,
+                    "batch_no": batch_no,
+                    "color_text": -1,
+                    "color": rng.integers(-(2**24), 0, len(starts)),
+                    "position": position,
+                    "start_time": starts.strftime(TIME_FORMAT),
+                    "end_time": ends.strftime(TIME_FORMAT),
+                    "modified_time": refresh_time,
+                    "write_time": refresh_time,
+                    "program_name": programs,
+                    "start_mode": "提示",
+                    "expected_run_minutes": run_minutes,
+                    "color_code": "",
+                    "weight_kg": rng.integers(100, 1200, len(starts)),
+                    "worker_code": "",
+                    "customer_code": "",
+                    "product_code": "",
+                }
+            )
+        )
+
+        running = current < len(starts) and state in ("行机", "暂停")
+        step = int(rng.integers(0, len(STEP_NAMES) - 1))
+        alarms = list(rng.choice(ALARMS, int(rng.integers(0, 3)), replace=False))
+        alarms += [""] * (5 - len(alarms))
+        status.append(
+            {
+                "central_id": CENTRAL_ID,
+                "central_name": "",
+                "machine_name": machine,
+                "state": state,
+                "num_of_idle_reasons": 0,
+                "num_of_alarms": len([a for a in alarms if a]),
+                "idle_reason": "",
+                "alarm": alarms[0],
+                "user_prompt": "叫人" if rng.random() < 0.05 else "",
+                "mt_temperature": f"{rng.uniform(25, 130) if running else 25.0:.1f}℃",
+                "batch_no": batch_no[current] if running else "",
+                "program_name": programs[current] if running else "",
+                "current_step": STEP_NAMES[step] if running else "",
+                "next_step": STEP_NAMES[step + 1] if running else "",
+                "minutes_run": (
+                    int((pd.Timestamp(now) - starts[current]).total_seconds() // 60)
+                    if running
+                    else 0
+                ),
+                "expected_finish_time": (
+                    ends[current].strftime(TIME_FORMAT)
+                    if running
+                    else "2001-01-01 00:00:00"
+                ),
+                "batch_water_kg": 0,
+                "batch_power_kwh": 0,
+                "batch_steam_kg": 0,
+                "water_meter_ton": 0,
+                "power_meter_kwh": 0,
+                "steam_meter_ton": 0,
+                "idle_reason_2": "",
+                "idle_reason_3": "",
+                "idle_reason_4": "",
+                "idle_reason_5": "",
+                "alarm_2": alarms[1],
+                "alarm_3": alarms[2],
+                "alarm_4": alarms[3],
+                "alarm_5": alarms[4],
+                "status_refresh_time": refresh_time,
+                "status_write_time": refresh_time,
+            }
+        )
+
+    return {
+        "batch_queued": pd.concat(batches, ignore_index=True),
+        "machine_status": pd.DataFrame(status),
+    }
+
+
+def generate_tables(
+    num_machines: int = 100, weeks: int = 4, seed: int = 0, now: datetime = None
+) -> dict:
+    """
+    Generate every dashboard table for a synthetic plant.
+
+    Args:
+        num_machines: Number of dye machines.
+        weeks: Weeks of history (batches and daily production) before now.
+        seed: Random seed, the same seed gives the same plant.
+        now: Reference time, defaults to the current time.
+
+    Returns:
+        dict: {table_name: pd.DataFrame}
+    """
+    rng = np.random.default_rng(seed)
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    today = pd.Timestamp(now).normalize()
+    days = pd.date_range(end=today, periods=max(1, weeks * 7), freq="D")
+    names = machine_names(num_machines)
+    refresh_time = now.strftime(TIME_FORMAT)
+
+    sim = _simulate_days(names, days, now, rng)
+    periods = _period_days(days, today)
+    tables = build_summary_tables(names, days, sim, periods, refresh_time)
+    tables["production_volume_log"] = build_production_volume_log(
+        names, days, sim, today, refresh_time
+    )
+    tables.update(build_batch_tables(names, now, weeks, rng))
+    return tables
+
+
+def create_sqlite_database(
+    db_path: str = DEFAULT_DB_PATH,
+    num_machines: int = 100,
+    weeks: int = 4,
+    seed: int = 0,
+) -> dict:
+    """
+    (Re)create the SQLite stand-in database and fill it with synthetic data.
+
+    Returns:
+        dict: Row count per table.
+    """
+    tables = generate_tables(num_machines=num_machines, weeks=weeks, seed=seed)
+    with open(DDL_PATH, "r", encoding="utf-8") as f:
+        ddl = f.read()
+
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(ddl)
+        for name, df in tables.items():
+            df.to_sql(name, conn, if_exists="append", index=False, chunksize=10000)
+        conn.commit()
+    finally:
+        conn.close()
+
+    counts = {name: len(df) for name, df in tables.items()}
+    logger.info(f"Created {db_path} with {num_machines} machines: {counts}")
+    return counts
+
+
+def write_credentials(db_path: str, credentials_path: str = DEFAULT_CREDENTIALS_PATH):
+    """Credentials file selecting the SQLite backend of DatabaseConnection."""
+    with open(credentials_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump({"backend": "sqlite", "database": db_path}, f)
+    logger.info(f"Wrote {credentials_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the local SQLite database")
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--credentials", default=DEFAULT_CREDENTIALS_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    create_sqlite_database(args.db, args.machines, args.weeks, args.seed)
+    write_credentials(args.db, args.credentials)
+
+
+if __name__ == "__main__":
+    main()
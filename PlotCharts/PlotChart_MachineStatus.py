@@ -1,4 +1,3 @@
-from Database.database_connection import db
 import logging
 import dash_bootstrap_components as dbc
 from dash import dcc, html
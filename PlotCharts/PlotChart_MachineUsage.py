@@ -1,4 +1,3 @@
-from Database.database_connection import db
 from ChartFactory.chart_factory_MachineUasge import (
     MachineUsageChart,
 )
@@ -0,0 +1,144 @@
+import gzip
+import logging
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Only text payloads are worth compressing (figures, table records, css/js)
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/css",
+    "text/html",
+    "image/svg+xml",
+)
+
+
+def _accepted_encoding(accept_encoding: str):
+    """Pick the best encoding the client accepts: br > gzip > none."""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if part.strip() and not part.strip().endswith("q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(
+    data: bytes, encoding: str, gzip_level: int, brotli_quality: int
+) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class _CompressedCache:
+    """Small LRU of compressed static assets, keyed by fingerprinted URL."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def register_compression(
+    server,
+    min_size: int = 1024,
+    gzip_level: int = 6,
+    brotli_quality: int = 5,
+    report_sizes: bool = True,
+):
+    """
+    Compress text responses of the Flask server (callback payloads, layout,
+    dependencies and static assets) with Brotli or gzip.
+
+    Every compressed response carries `X-Uncompressed-Length` next to
+    `Content-Length`, and the size is logged at DEBUG level so the saving
+    per endpoint can be checked in the browser or the server log.
+
+    Args:
+        server: The Flask server shared by the Dash app.
+        min_size: Responses smaller than this (bytes) are sent as is.
+        gzip_level: gzip compression level (1-9).
+        brotli_quality: Brotli quality (0-11). Callback responses are
+            compressed on every request, so a mid quality keeps CPU low.
+        report_sizes: Log original / compressed size per response.
+    """
+    static_cache = _CompressedCache()
+
+    @server.after_request
+    def compress_response(response):
+        try:
+            if (
+                response.status_code != 200
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or "Content-Encoding" in response.headers
+            ):
+                return response
+
+            encoding = _accepted_encoding(request.headers.get("Accept-Encoding", ""))
+            response.vary.add("Accept-Encoding")
+            if encoding is None:
+                return response
+
+            # Static files are streamed by send_file; read them into memory
+            response.direct_passthrough = False
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+
+            # Fingerprinted assets never change, compress them only once
+            immutable = "immutable" in response.headers.get("Cache-Control", "")
+            cache_key = (request.full_path, encoding)
+            compressed = static_cache.get(cache_key) if immutable else None
+            if compressed is None:
+                compressed = _compress(data, encoding, gzip_level, brotli_quality)
+                if immutable:
+                    static_cache.put(cache_key, compressed)
+
+            response.set_data(compressed)
+            response.headers["Content-Encoding"] = encoding
+            response.headers["X-Uncompressed-Length"] = str(len(data))
+            etag, weak = response.get_etag()
+            if etag:
+                # The encoded body differs from the identity one
+                response.set_etag(f"{etag}-{encoding}", weak=weak)
+
+            if report_sizes:
+                logger.debug(
+                    f"{request.path}: {len(data)} -> {len(compressed)} bytes "
+                    f"({encoding}, {len(compressed) / len(data):.0%})"
+                )
+        except Exception as e:
+            logger.error(f"Error compressing response for {request.path}: {e}")
+        return response
+
+    logger.info(
+        f"Response compression enabled ({'br, ' if brotli is not None else ''}gzip)"
+    )
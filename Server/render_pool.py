@@ -0,0 +1,201 @@
+"""
+Optional process pool for the CPU-bound figure rendering.
+
+Building plotly figures and serializing them holds the GIL, so a heavy render
+(e.g. the chart 4 or 6 detail page) inside a Flask request thread stalls the
+callbacks of every other client on the same server. With
+DASHBOARD_RENDER_PROCESSES=<n> the callbacks submit RenderJobs to n worker
+processes instead, and get the figures back as plotly JSON, decoded into the
+plain dicts dcc.Graph accepts. Unset or 0 renders inline, as before.
+
+The workers are forked from the app by render_pool.start(), before it fetches
+any data or starts any thread: forked workers already have the chart factories
+imported, while spawned ones would re-run the app script itself.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import plotly.io as pio
+
+logger = logging.getLogger(__name__)
+
+RENDER_PROCESSES_ENV_VAR = "DASHBOARD_RENDER_PROCESSES"
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    """
+    One figure render, picklable so it can run in a worker process.
+
+    Attributes:
+        factory: Chart factory: a module-level function or a method of a
+            picklable object (e.g. MachineUsageChart), pickled by reference.
+        args: Positional arguments of the factory (period, chart data, ...).
+        kwargs: Keyword arguments of the factory.
+        layout: update_layout() arguments applied to the figure afterwards.
+    """
+
+    factory: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    layout: Optional[dict] = None
+
+    def run(self):
+        """Render in this process: a figure, or a list of them."""
+        figures = self.factory(*self.args, **self.kwargs)
+        if self.layout:
+            for fig in figures if isinstance(figures, list) else [figures]:
+                fig.update_layout(**self.layout)
+        return figures
+
+
+@dataclass(frozen=True)
+class RenderedFigures:
+    """A RenderJob's figures serialized by a worker, as plotly JSON."""
+
+    figures: tuple
+    is_list: bool
+
+    def decode(self):
+        """The figures as plain dicts, a list when the factory returned one."""
+        figures = [json.loads(fig) for fig in self.figures]
+        return figures if self.is_list else figures[0]
+
+
+def period_slice(chart_data: dict, period: str) -> dict:
+    """
+    The part of one chart's data a factory reads for a period.
+
+    Submitting only that part keeps the pickled jobs small; chart data
+    without the period is returned as is, for the factory to report.
+    """
+    if isinstance(chart_data, dict) and period in chart_data:
+        return {period: chart_data[period]}
+    return chart_data
+
+
+def _render_serialized(job: RenderJob) -> RenderedFigures:
+    """Worker side: render the job and serialize its figures."""
+    figures = job.run()
+    is_list = isinstance(figures, list)
+    return RenderedFigures(
+        figures=tuple(
+            pio.to_json(fig, validate=False)
+            for fig in (figures if is_list else [figures])
+        ),
+        is_list=is_list,
+    )
+
+
+def _ready():
+    return None
+
+
+class RenderPool:
+    def __init__(self, processes: int = 0):
+        """
+        Args:
+            processes: Worker processes; 0 renders inline in the caller.
+        """
+        if processes > 0 and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning(
+                f"{RENDER_PROCESSES_ENV_VAR} needs fork (not on Windows), "
+                "rendering inline"
+            )
+            processes = 0
+        self.processes = processes
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(int(os.environ.get(RENDER_PROCESSES_ENV_VAR, 0)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("fork"),
+                )
+            return self._executor
+
+    def _discard_if_broken(self, executor: ProcessPoolExecutor, future: Future):
+        """Drop a pool whose worker died; the next job starts a new one."""
+        if future.cancelled() or not isinstance(future.exception(), BrokenProcessPool):
+            return
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        logger.error("A render worker died, restarting the render pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """Fork the workers now (the apps call this before fetching any data)."""
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        # A fork pool forks all its workers on the first job
+        self._get_executor().submit(_ready).result()
+        logger.info(
+            f"Render pool started: {self.processes} worker processes "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    def submit(self, job: RenderJob) -> Future:
+        """
+        Start rendering a job; pass the future to result().
+
+        Inline (pool disabled) the job runs right away and the future is done.
+        """
+        if self.enabled:
+            executor = self._get_executor()
+            future = executor.submit(_render_serialized, job)
+            future.add_done_callback(
+                lambda done: self._discard_if_broken(executor, done)
+            )
+            return future
+        future = Future()
+        try:
+            future.set_result(job.run())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def result(self, future: Future):
+        """
+        The figure(s) of a submitted job; raises the error of its factory.
+
+        Pool renders are plain figure dicts, inline ones what the factory
+        returned (dcc.Graph accepts both).
+        """
+        value = future.result()
+        return value.decode() if isinstance(value, RenderedFigures) else value
+
+    def render(self, job: RenderJob):
+        """Render one job and wait for it."""
+        return self.result(self.submit(job))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared instance, configured from the environment
+render_pool = RenderPool.from_env()
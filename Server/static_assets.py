@@ -0,0 +1,93 @@
+"""
+Static asset helpers: locally served Bootstrap theme and long-lived cache
+headers for fingerprinted Dash assets.
+
+To serve Bootstrap from the dashboard itself (for clients without internet
+access), download it once on a machine that can reach the CDN:
+
+    python -m Server.static_assets
+"""
+
+import logging
+import os
+import urllib.request
+
+import dash_bootstrap_components as dbc
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
+# Every css file under assets/ is served by Dash automatically, with a
+# modification-time fingerprint (?m=...) in its URL
+LOCAL_BOOTSTRAP_PATH = os.path.join(ASSETS_DIR, "vendor", "bootstrap.min.css")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def bootstrap_stylesheets() -> list:
+    """
+    External stylesheets for the Dash app.
+
+    Returns an empty list when the Bootstrap theme has been downloaded into
+    assets/vendor (Dash then serves it like any other asset), otherwise the
+    CDN theme.
+    """
+    if os.path.exists(LOCAL_BOOTSTRAP_PATH):
+        return []
+    logger.warning(
+        "Local Bootstrap theme not found, loading it from the CDN. "
+        "Run `python -m Server.static_assets` to serve it locally."
+    )
+    return [dbc.themes.BOOTSTRAP]
+
+
+def register_asset_cache_headers(app):
+    """
+    Mark fingerprinted assets and component bundles as immutable.
+
+    Dash adds `?m=<mtime>` to asset URLs and a version fingerprint to
+    component bundle file names, so a changed file always gets a new URL and
+    the browser never needs to revalidate.
+
+    Flask runs after_request hooks in reverse order of registration; register
+    this after `register_compression` so the compressed copies of immutable
+    assets can be cached.
+
+    Args:
+        app: The Dash app.
+    """
+    assets_prefix = (
+        app.config.routes_pathname_prefix + app.config.assets_url_path.strip("/") + "/"
+    )
+    suites_prefix = app.config.routes_pathname_prefix + "_dash-component-suites/"
+
+    @app.server.after_request
+    def set_asset_cache_headers(response):
+        if response.status_code != 200:
+            return response
+        if request.path.startswith(assets_prefix) and "m" in request.args:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        elif request.path.startswith(suites_prefix) and (
+            response.cache_control.max_age == 31536000
+        ):
+            # Dash already caches fingerprinted bundles for a year
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+def download_bootstrap(
+    url: str = dbc.themes.BOOTSTRAP, path: str = LOCAL_BOOTSTRAP_PATH
+):
+    """Download the Bootstrap theme into assets/vendor."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with urllib.request.urlopen(url, timeout=30) as response:
+        content = response.read()
+    with open(path, "wb") as f:
+        f.write(content)
+    logger.info(f"Saved {url} to {path} ({len(content)} bytes)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    download_bootstrap()
@@ -0,0 +1,160 @@
+// Clientside callbacks for pure UI interactions (theme, period buttons,
+// table paging). They run in the browser and cost no server request.
+// Registered from Python with ClientsideFunction(namespace="dashboard", ...).
+
+(function () {
+    const COLOR_THEMES = {
+        dark_blue: {
+            background: "#061023",
+            text: "#fdfefe",
+            card: "#16213e",
+            border: "#3c3c3c",
+        },
+        black: {
+            background: "#202020",
+            text: "#fdfefe",
+            card: "#1a1a1a",
+            border: "#3c3c3c",
+        },
+    };
+
+    const TABLE_THEMES = {
+        black: {
+            header: {backgroundColor: "#2774a7", color: "#ffffff"},
+            rows: [
+                {if: {row_index: "odd"}, backgroundColor: "#202020"},
+                {if: {row_index: "even"}, backgroundColor: "#464646"},
+            ],
+            cell: {
+                textAlign: "center",
+                whiteSpace: "normal",
+                fontFamily: "Microsoft YaHei",
+                width: "auto",
+                padding: "8px",
+                color: "#fdfefe",
+            },
+        },
+        // dark_blue or default
+        dark_blue: {
+            header: {backgroundColor: "#2774a7", color: "#ffffff"},
+            rows: [
+                {if: {row_index: "odd"}, backgroundColor: "#061023"},
+                {if: {row_index: "even"}, backgroundColor: "#0c2149"},
+            ],
+            cell: {textAlign: "left", padding: "8px", color: "#fdfefe"},
+        },
+    };
+
+    // [states, backgroundColor, color] for the status column
+    const STATUS_STYLES = [
+        [["行機", "行机"], "#2ecc71", "white"], // Running - Green
+        [["暫停", "暂停"], "#f1c40f", "black"], // Paused - Yellow
+        [["停機", "停机"], "#e74c3c", "white"], // Stopped - Red
+    ];
+
+    // Shape name of chart 5's "now" line (NOW_LINE_NAME in chart_factory_chart5.py)
+    const NOW_LINE_NAME = "now-line";
+
+    function triggeredIndex() {
+        const ctx = window.dash_clientside.callback_context;
+        const triggered = ctx && ctx.triggered_id;
+        return triggered && typeof triggered === "object" ? triggered.index : null;
+    }
+
+    function statusConditionalStyling(statusColumn) {
+        if (!statusColumn) {
+            return [];
+        }
+        return STATUS_STYLES.map(([states, backgroundColor, color]) => ({
+            if: {
+                column_id: statusColumn,
+                filter_query: states
+                    .map((state) => `{${statusColumn}} eq "${state}"`)
+                    .join(" or "),
+            },
+            backgroundColor: backgroundColor,
+            color: color,
+        }));
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dashboard: {
+            // Pattern-matching button group -> store holding the clicked button's index
+            select_button_index: function (n_clicks_list, current) {
+                const index = triggeredIndex();
+                return index ? index : current;
+            },
+
+            select_theme: function (n_clicks_list, currentTheme) {
+                const theme = triggeredIndex();
+                return theme && COLOR_THEMES[theme] ? theme : currentTheme;
+            },
+
+            apply_theme: function (theme) {
+                const colors = COLOR_THEMES[theme] || COLOR_THEMES.black;
+                return {
+                    backgroundColor: colors.background,
+                    color: colors.text,
+                    width: "100vw",
+                    height: "100vh",
+                    overflowY: "auto",
+                    position: "relative",
+                };
+            },
+
+            // The status column is the table's second column
+            table_theme: function (theme, columns) {
+                const styles =
+                    (theme || "black") === "black" ? TABLE_THEMES.black : TABLE_THEMES.dark_blue;
+                let statusColumn = null;
+                if (columns && columns.length > 1 && columns[1]) {
+                    statusColumn = columns[1].id;
+                }
+                return [
+                    styles.header,
+                    styles.rows.concat(statusConditionalStyling(statusColumn)),
+                    styles.cell,
+                ];
+            },
+
+            // Advance one page per interval tick, looping back at the end.
+            // The first tick (n == 0) keeps the page Dash initialised with.
+            turn_page: function (n, current, pageCount) {
+                if (!pageCount) {
+                    pageCount = 1;
+                }
+                if (!n) {
+                    return current;
+                }
+                return ((current || 0) + 1) % pageCount;
+            },
+
+            // Chart 5's figure only changes once per time bucket; its "now"
+            // line is moved to the current time here. x values are the
+            // server's wall clock encoded as UTC (layout.meta.now_offset_ms).
+            place_now_line: function (figure, n, graphId) {
+                const noUpdate = window.dash_clientside.no_update;
+                const layout = figure && figure.layout;
+                const offset = layout && layout.meta && layout.meta.now_offset_ms;
+                const index = ((layout && layout.shapes) || []).findIndex(
+                    (shape) => shape.name === NOW_LINE_NAME
+                );
+                if (offset === undefined || index < 0 || !window.Plotly) {
+                    return noUpdate;
+                }
+                const now = Date.now() + offset;
+                // After dcc.Graph has drawn the new figure
+                window.requestAnimationFrame(() => {
+                    const graph = document.querySelector(`#${graphId} .js-plotly-plot`);
+                    if (graph) {
+                        window.Plotly.relayout(graph, {
+                            [`shapes[${index}].x0`]: now,
+                            [`shapes[${index}].x1`]: now,
+                        });
+                    }
+                });
+                return now;
+            },
+        },
+    });
+})();
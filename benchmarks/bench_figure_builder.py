@@ -0,0 +1,142 @@
+"""
+Benchmark the chart 4 / chart 6 detail factories on both figure paths.
+
+- validate=True : figures are returned as validated go.Figure objects
+- validate=False: figures are assembled by FigureBuilder as plain dicts
+
+Before timing, the script checks that both paths produce the same figure JSON.
+
+Usage (from the project root):
+    python -m benchmarks.bench_figure_builder --machines 60 --repeat 5
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from ChartFactory.chartfactory_chart4 import create_chart4_figure_detail
+from ChartFactory.chartfactory_chart6 import create_chart6_figure_detail
+from Database.stop_reason_topk import compute_top_reasons, widen_top_reasons
+
+PERIOD = "今天"
+
+
+def make_chart4_data(num_machines: int, rng) -> dict:
+    """Synthetic chart-4-data-store entry for one period."""
+    all_machine = pd.DataFrame(
+        {
+            "machine_name": [f"M{i:03d}" for i in range(num_machines)],
+            "water_ton": rng.uniform(0.01, 0.2, num_machines),
+            "power_kwh": rng.uniform(0.1, 2.0, num_machines),
+            "steam_ton": rng.uniform(0.01, 0.1, num_machines),
+            "order_index": 1,
+            "period": PERIOD,
+        }
+    ).sort_values(by=["steam_ton", "power_kwh", "water_ton"])
+    avg = all_machine[["water_ton", "power_kwh", "steam_ton"]].mean().to_frame().T
+    return {
+        PERIOD: {
+            "avg": avg,
+            "best": all_machine.iloc[0:1],
+            "worst": all_machine.iloc[-1:],
+            "all_machine": all_machine,
+        }
+    }
+
+
+def make_chart6_data(num_machines: int, rng) -> dict:
+    """Synthetic chart-6-data-store entry for one period."""
+    all_machine = pd.DataFrame(
+        {
+            "machine_name": [f"M{i:03d}" for i in range(num_machines)],
+            "order_index": 0,
+            "run_hour": rng.uniform(0, 100, num_machines),
+            "sum_hour": 168.0,
+        }
+    )
+    for j in range(1, 32):
+        hours = rng.uniform(0, 20, num_machines)
+        hours[rng.random(num_machines) < 0.7] = 0
+        all_machine[f"reason{j}_hour"] = hours
+    all_machine["idle_hour"] = all_machine["sum_hour"] - all_machine["run_hour"]
+    top_reasons = compute_top_reasons(all_machine, k=5)
+    highest = all_machine.loc[[all_machine["idle_hour"].idxmax()]]
+    lowest = all_machine.loc[[all_machine["idle_hour"].idxmin()]]
+    idle_total = all_machine["idle_hour"].sum()
+    return {
+        PERIOD: {
+            "all_machine": all_machine,
+            "highest": widen_top_reasons(highest, top_reasons),
+            "lowest": widen_top_reasons(lowest, top_reasons),
+            "overall": pd.DataFrame(
+                {
+                    "total_idle_hour": [idle_total],
+                    "avg_per_machine": [idle_total / num_machines],
+                    "machine_count": [num_machines],
+                }
+            ),
+            "top_reasons": top_reasons,
+        }
+    }
+
+
+def _figure_json(fig) -> dict:
+    return json.loads(pio.to_json(fig if isinstance(fig, dict) else fig.to_dict()))
+
+
+def check_same_output(factory, dfs) -> bool:
+    """Both paths must produce the same figure JSON."""
+    validated = factory(PERIOD, dfs, validate=True)
+    plain = factory(PERIOD, dfs, validate=False)
+    return len(validated) == len(plain) and all(
+        _figure_json(a) == _figure_json(b) for a, b in zip(validated, plain)
+    )
+
+
+def time_factory(factory, dfs, validate: bool, repeat: int) -> float:
+    """Best wall time (seconds) of `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        factory(PERIOD, dfs, validate=validate)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--machines", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cases = {
+        "create_chart4_figure_detail": (
+            create_chart4_figure_detail,
+            make_chart4_data(args.machines, rng),
+        ),
+        "create_chart6_figure_detail": (
+            create_chart6_figure_detail,
+            make_chart6_data(args.machines, rng),
+        ),
+    }
+
+    print(f"{args.machines} machines, best of {args.repeat} runs")
+    print(f"{'factory':32} {'go.Figure':>11} {'dict':>11} {'speedup':>8} same")
+    for name, (factory, dfs) in cases.items():
+        same = check_same_output(factory, dfs)
+        t_figure = time_factory(factory, dfs, True, args.repeat)
+        t_dict = time_factory(factory, dfs, False, args.repeat)
+        print(
+            f"{name:32} {t_figure * 1000:9.1f}ms {t_dict * 1000:9.1f}ms "
+            f"{t_figure / t_dict:7.1f}x {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Benchmark the dashboard data pipeline stage by stage on synthetic plants.
+
+Stages:
+- fetch      : each get_*_data against a local SQLite database
+- serialize  : serialize_dataframe_dict / deserialize_dataframe_dict per chart store
+- render     : each chart factory (desktop, mobile, detail variants and text cards)
+- callback   : Dash round trips through the Flask test client (dashboard
+               render callback and detail pages, desktop and mobile app)
+
+Every measurement records the best and median wall time, the peak Python
+memory of one extra traced run (tracemalloc) and the payload size in bytes.
+Results are written as JSON with stable keys, so two result files (e.g. from
+two commits) can be compared with --compare.
+
+Usage (from the project root):
+    python -m benchmarks.bench_pipeline --sizes 10 100 1000 --repeat 3
+    python -m benchmarks.bench_pipeline --compare old.json new.json
+"""
+
+import argparse
+import gzip
+import importlib
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+import plotly
+from plotly.utils import PlotlyJSONEncoder
+
+from benchmarks.dash_client import callback_request
+from Database.synthetic_data import create_sqlite_database, write_credentials
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+FETCHERS = [
+    ("chart-1-data-store", "get_MachineUsage_data"),
+    ("chart-2-data-store", "get_MachineStatus_data"),
+    ("chart-3-data-store", "get_chart3_data"),
+    ("chart-4-data-store", "get_chart4_data"),
+    ("chart-5-data-store", "get_chart5_data"),
+    ("chart-6-data-store", "get_chart6_data"),
+]
+PERIOD = "今天"
+CHART5_TIMEFRAME = "48_hrs"
+
+
+def payload_bytes(obj) -> int:
+    """Size of what Dash would send for `obj` (figures, components, frames)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, dict) and any(
+        isinstance(v, dict) and any(isinstance(f, pd.DataFrame) for f in v.values())
+        for v in obj.values()
+    ):
+        # {period: {key: df}} chart data
+        return sum(payload_bytes(f) for v in obj.values() for f in v.values())
+    return len(json.dumps(obj, cls=PlotlyJSONEncoder))
+
+
+def measure(func, repeat: int, trace_memory: bool = True) -> dict:
+    """Best / median time of `repeat` runs, plus peak memory of one traced run."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    peak_kb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "time_ms_best": round(min(times) * 1000, 3),
+        "time_ms_median": round(statistics.median(times) * 1000, 3),
+        "peak_kb": round(peak_kb, 1) if peak_kb is not None else None,
+        "payload_bytes": payload_bytes(result),
+        "_result": result,
+    }
+
+
+def record(results, size, stage, name, measurement, **extra):
+    row = {"machines": size, "stage": stage, "name": name}
+    row.update({k: v for k, v in measurement.items() if not k.startswith("_")})
+    row.update(extra)
+    results.append(row)
+    peak = "-" if row["peak_kb"] is None else f"{row['peak_kb'] / 1024:.1f}MB"
+    print(
+        f"{size:>6} {stage:10} {name:48} {row['time_ms_best']:10.1f}ms "
+        f"{peak:>8} {row['payload_bytes'] / 1024:10.1f}kB"
+    )
+    return measurement["_result"]
+
+
+def bench_fetch(db, size, repeat, results) -> dict:
+    from Database import fetch_all_charts_data
+
+    charts_data = {}
+    for key, fetcher_name in FETCHERS:
+        fetcher = getattr(fetch_all_charts_data, fetcher_name)
+        m = measure(lambda: fetcher(db), repeat)
+        charts_data[key] = record(results, size, "fetch", fetcher_name, m)
+    return charts_data
+
+
+def bench_serialize(charts_data, size, repeat, results):
+    from Database.serialize_df import (
+        deserialize_dataframe_dict,
+        serialize_dataframe_dict,
+    )
+
+    for key, data in charts_data.items():
+        m = measure(lambda: serialize_dataframe_dict(data), repeat)
+        serialized = record(results, size, "serialize", f"serialize {key}", m)
+        m = measure(lambda: deserialize_dataframe_dict(serialized), repeat)
+        m["payload_bytes"] = payload_bytes(serialized)
+        record(results, size, "serialize", f"deserialize {key}", m)
+
+
+def render_cases(charts_data, lang="zh_cn") -> list:
+    """(name, callable) for every figure / card factory the dashboard calls."""
+    from callbacks.detail_page_callbacks import charts_var as detail_charts_var
+    from callbacks.select_time_period_callback import (
+        CHART5_PAGE_SIZE,
+        TXT_CARDS_CONFIG,
+        _chart5_figures,
+        _chart5_figures_lock,
+        _get_charts_var,
+        _render_chart2_table,
+        _render_chart5_figure,
+    )
+
+    def render_chart5_page(mobile):
+        # Time the render, not a hit of the shared chart 5 figure cache
+        with _chart5_figures_lock:
+            _chart5_figures.clear()
+        return _render_chart5_figure(chart5, CHART5_TIMEFRAME, 0, mobile, lang)
+
+    cases = []
+    for chart_id, config in _get_charts_var(lang).items():
+        data = charts_data[f"{chart_id}-data-store"]
+        for variant in ("desktop", "mobile"):
+            factory = config[f"chart_factory_{variant}"]
+            cases.append(
+                (f"{chart_id} {variant}", lambda f=factory, d=data: f(PERIOD, d))
+            )
+    for chart_id, config in TXT_CARDS_CONFIG.items():
+        data = charts_data[f"{chart_id}-data-store"]
+        factory = config["card_factory"]
+        cases.append((f"{chart_id} cards", lambda f=factory, d=data: f(PERIOD, d)))
+
+    chart5 = charts_data["chart-5-data-store"]
+    for mobile in (False, True):
+        variant = "mobile" if mobile else "desktop"
+        cases.append(
+            (
+                f"chart-5 {variant} page",
+                lambda m=mobile: render_chart5_page(m),
+            )
+        )
+        cases.append(
+            (
+                f"chart-2 {variant} table",
+                lambda m=mobile: _render_chart2_table(
+                    charts_data["chart-2-data-store"], m
+                ),
+            )
+        )
+    cases.append(
+        (
+            f"chart-5 all machines ({CHART5_PAGE_SIZE}/page in app)",
+            lambda: detail_charts_var["chart-5"]["chart_factory"](
+                CHART5_TIMEFRAME, chart5
+            ),
+        )
+    )
+
+    for chart_id, config in detail_charts_var.items():
+        if chart_id in ("chart-2", "chart-5"):
+            continue
+        data = charts_data[f"{chart_id}-data-store"]
+        factory = config["chart_factory"]
+        cases.append(
+            (f"{chart_id} detail", lambda f=factory, d=data: f(period=PERIOD, dfs=d))
+        )
+    chart2 = charts_data["chart-2-data-store"]["desktop"]["all_machine"]
+    cases.append(
+        (
+            "chart-2 detail",
+            lambda: detail_charts_var["chart-2"]["chart_factory"](chart2),
+        )
+    )
+    return cases
+
+
+def bench_render(charts_data, size, repeat, results):
+    for name, func in render_cases(charts_data):
+        record(results, size, "render", name, measure(func, repeat))
+
+
+def load_apps():
+    """Import the desktop and mobile apps (they connect on import)."""
+    return {
+        "desktop": importlib.import_module("desktop_app").desktop_app,
+        "mobile": importlib.import_module("mobile_app").mobile_app,
+    }
+
+
+def bench_callbacks(apps, charts_data, size, repeat, results):
+    from Database.snapshot_store import snapshot_store
+
+    handle = snapshot_store.put(charts_data)
+    values = {
+        "time-period-store": PERIOD,
+        "all-chart-data-store": handle,
+        "chart5-timeframe-store": CHART5_TIMEFRAME,
+        "mobile-interval": 0,
+    }
+    for variant, app in apps.items():
+        client = app.server.test_client()
+        dependencies = client.get("/_dash-dependencies").get_json()
+        requests = {
+            "render all (data refresh)": callback_request(
+                dependencies,
+                "..chart-1.figure",
+                values,
+                changed="all-chart-data-store",
+            ),
+        }
+        if variant == "mobile":
+            for chart_id in ("chart-1", "chart-4", "chart-5", "chart-6"):
+                detail_values = dict(values)
+                detail_values["mobile-url"] = f"/details/{chart_id}"
+                requests[f"detail {chart_id}"] = callback_request(
+                    dependencies, "mobile-page-content.children", detail_values
+                )
+
+        for name, body in requests.items():
+
+            def post(body=body):
+                response = client.post("/_dash-update-component", json=body)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name}: HTTP {response.status_code}")
+                return response.get_data()
+
+            m = measure(post, repeat, trace_memory=False)
+            m["gzip_bytes"] = len(gzip.compress(m["_result"], compresslevel=6))
+            record(
+                results,
+                size,
+                "callback",
+                f"{variant} {name}",
+                m,
+                gzip_bytes=m["gzip_bytes"],
+            )
+
+
+def git_commit() -> str:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return "unknown"
+
+
+def compare(old_path, new_path):
+    """Print time and payload ratios between two result files."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def key(row):
+        return row["machines"], row["stage"], row["name"]
+
+    old_rows = {key(r): r for r in old["results"]}
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'machines':>8} {'stage':10} {'name':48} {'time':>8} {'payload':>8}")
+    for row in new["results"]:
+        before = old_rows.get(key(row))
+        if before is None:
+            continue
+        time_ratio = row["time_ms_best"] / max(before["time_ms_best"], 1e-6)
+        size_ratio = row["payload_bytes"] / max(before["payload_bytes"], 1)
+        print(
+            f"{row['machines']:>8} {row['stage']:10} {row['name']:48} "
+            f"{time_ratio:7.2f}x {size_ratio:7.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        default=["fetch", "serialize", "render", "callback"],
+        choices=["fetch", "serialize", "render", "callback"],
+    )
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # The dashboard logs every render at INFO; keep the timings about the work
+    logging.disable(logging.INFO)
+
+    results = []
+    apps = None
+    with tempfile.TemporaryDirectory() as tmp:
+        # Set before the first import as well: the apps (callback stage) boot
+        # from and save to this file, never the deployment's env/last_snapshot
+        os.environ["DASHBOARD_LAST_SNAPSHOT"] = os.path.join(tmp, "last_snapshot")
+        for size in args.sizes:
+            db_path = os.path.join(tmp, f"plant_{size}.db")
+            credentials_path = os.path.join(tmp, f"plant_{size}.yml")
+            create_sqlite_database(db_path, size, args.weeks, args.seed)
+            write_credentials(db_path, credentials_path)
+            # Set before the first import: Database modules connect on import
+            os.environ["DASHBOARD_DB_CREDENTIALS"] = credentials_path
+            from Database.database_connection import DatabaseConnection
+
+            db = DatabaseConnection(credentials_path)
+
+            print(f"\n{size} machines, {args.weeks} weeks, best of {args.repeat}")
+            charts_data = bench_fetch(db, size, args.repeat, results)
+            if "serialize" in args.stages:
+                bench_serialize(charts_data, size, args.repeat, results)
+            if "render" in args.stages:
+                bench_render(charts_data, size, args.repeat, results)
+            if "callback" in args.stages:
+                if apps is None:
+                    apps = load_apps()
+                bench_callbacks(apps, charts_data, size, args.repeat, results)
+            db.engine.dispose()
+
+    if "fetch" not in args.stages:
+        results = [r for r in results if r["stage"] != "fetch"]
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    meta = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+        "platform": platform.platform(),
+        "sizes": args.sizes,
+        "weeks": args.weeks,
+        "repeat": args.repeat,
+        "seed": args.seed,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=1)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Helpers to talk to a Dash app the way the browser does: find callbacks in
+/_dash-dependencies, build /_dash-update-component bodies and read initial
+component props from /_dash-layout.
+"""
+
+
+def find_callback(dependencies, output_prefix):
+    """The callback spec whose output string starts with `output_prefix`."""
+    for spec in dependencies:
+        if spec.get("clientside_function"):
+            continue
+        if spec["output"].startswith(output_prefix):
+            return spec
+    raise KeyError(f"No server callback with output {output_prefix!r}")
+
+
+def _id_prop(item):
+    component_id, prop = item.rsplit(".", 1)
+    return {"id": component_id, "property": prop}
+
+
+def callback_request(dependencies, output_prefix, values, changed=None):
+    """
+    Build a /_dash-update-component body.
+
+    Args:
+        dependencies: JSON of /_dash-dependencies.
+        output_prefix: Start of the callback's output string, e.g. "..chart-1.figure".
+        values: {component_id: value} for the callback's inputs and states.
+        changed: Component id of the triggering input (default: first input).
+            Pass "" for Dash's initial call (nothing triggered).
+
+    Returns:
+        dict: Request body.
+    """
+    spec = find_callback(dependencies, output_prefix)
+    outputs = spec["output"].strip(".").split("...")
+    inputs = spec["inputs"]
+    if changed is None:
+        changed = inputs[0]["id"]
+    changed_prop_ids = [
+        f"{i['id']}.{i['property']}" for i in inputs if i["id"] == changed
+    ]
+
+    return {
+        "output": spec["output"],
+        "outputs": (
+            [_id_prop(o) for o in outputs] if len(outputs) > 1 else _id_prop(outputs[0])
+        ),
+        "inputs": [
+            dict(id=i["id"], property=i["property"], value=values.get(i["id"]))
+            for i in inputs
+        ],
+        "state": [
+            dict(id=s["id"], property=s["property"], value=values.get(s["id"]))
+            for s in spec["state"]
+        ],
+        "changedPropIds": changed_prop_ids,
+    }
+
+
+def find_prop(layout, component_id, prop):
+    """Initial value of `prop` of component `component_id` in a /_dash-layout tree."""
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        props = node.get("props", {})
+        if props.get("id") == component_id:
+            return props.get(prop)
+        stack.extend(v for v in props.values() if isinstance(v, (dict, list)))
+    return None
@@ -0,0 +1,365 @@
+"""
+Load generator: simulate N desktop and mobile dashboard clients.
+
+Each client loads the page like a browser (index, /_dash-layout,
+/_dash-dependencies, initial callbacks) and then replays a random but realistic
+sequence of callbacks against /_dash-update-component:
+
+- interval tick : auto refresh of the data store, then the render it triggers
+- period click  : render for another period (今天 / 本周 / 本月)
+- timeframe     : render of chart 5 for another timeframe
+- detail page   : (mobile) open a detail page, load more rows, go back
+
+The run is repeated for every client count in --clients and reports
+throughput, latency percentiles per action and the error rate.
+
+Usage (from the project root):
+    # start desktop + mobile servers on a synthetic 100 machine plant
+    python -m benchmarks.load_clients --serve --machines 100 --clients 1 5 10 20
+    # or against running servers
+    python -m benchmarks.load_clients --desktop-url http://127.0.0.1:8051 --clients 10
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from benchmarks.dash_client import callback_request, find_prop
+
+PERIODS = ["今天", "本周", "本月"]
+TIMEFRAMES = ["24_hrs", "48_hrs", "72_hrs"]
+DETAIL_CHARTS = ["chart-1", "chart-3", "chart-4", "chart-5", "chart-6"]
+PAGINATED_CHARTS = ["chart-1", "chart-4", "chart-6"]
+
+# Relative frequency of the user actions
+ACTION_WEIGHTS = {
+    "desktop": {"tick": 6, "period": 3, "timeframe": 1},
+    "mobile": {"tick": 4, "period": 3, "timeframe": 1, "detail": 2},
+}
+
+RENDER_OUTPUT = "..chart-1.figure"
+REFRESH_OUTPUT = "all-chart-data-store.data"
+PAGE_OUTPUT = "mobile-page-content.children"
+LOAD_MORE_OUTPUT = "..mobile-detail-rows.children"
+
+
+class Stats:
+    """Thread-safe request log: (action, latency seconds, ok, bytes)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = []
+
+    def add(self, action, latency, ok, size):
+        with self._lock:
+            self.rows.append((action, latency, ok, size))
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class SimulatedClient(threading.Thread):
+    def __init__(self, base_url, kind, stats, stop_event, think_time, seed):
+        super().__init__(daemon=True)
+        self.base_url = base_url.rstrip("/")
+        self.kind = kind
+        self.stats = stats
+        self.stop_event = stop_event
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+        self.values = {}
+        self.dependencies = []
+        self.n_intervals = 0
+
+    # ---- HTTP ----
+    def _request(self, action, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, timeout=60, **kwargs
+            )
+            ok = response.status_code in (200, 204)
+            size = len(response.content)
+        except requests.RequestException:
+            response, ok, size = None, False, 0
+        self.stats.add(f"{self.kind} {action}", time.perf_counter() - start, ok, size)
+        return response if ok else None
+
+    def _callback(self, action, output_prefix, changed=None):
+        body = callback_request(
+            self.dependencies, output_prefix, self.values, changed=changed
+        )
+        response = self._request(action, "POST", "/_dash-update-component", json=body)
+        if response is None or response.status_code == 204:
+            return {}
+        return response.json().get("response", {})
+
+    # ---- Page load ----
+    def load_page(self):
+        self._request("index", "GET", "/")
+        layout = self._request("layout", "GET", "/_dash-layout")
+        deps = self._request("dependencies", "GET", "/_dash-dependencies")
+        if layout is None or deps is None:
+            return False
+        layout = layout.json()
+        self.dependencies = deps.json()
+        for component_id, prop in [
+            ("time-period-store", "data"),
+            ("all-chart-data-store", "data"),
+            ("chart5-timeframe-store", "data"),
+        ]:
+            self.values[component_id] = find_prop(layout, component_id, prop)
+        self.values["mobile-interval"] = 0
+        self.values["mobile-url"] = "/"
+        # The figures come with the layout; the render callback has
+        # prevent_initial_call, only the mobile page router runs on load
+        if self.kind == "mobile":
+            self._callback("page", PAGE_OUTPUT)
+        return True
+
+    # ---- Actions ----
+    def tick(self):
+        self.n_intervals += 1
+        self.values["mobile-interval"] = self.n_intervals
+        response = self._callback("refresh", REFRESH_OUTPUT)
+        handle = response.get("all-chart-data-store", {}).get("data")
+        if handle:
+            self.values["all-chart-data-store"] = handle
+            self._callback("render (refresh)", RENDER_OUTPUT, "all-chart-data-store")
+
+    def period(self):
+        self.values["time-period-store"] = self.rng.choice(PERIODS)
+        self._callback("render (period)", RENDER_OUTPUT, "time-period-store")
+
+    def timeframe(self):
+        self.values["chart5-timeframe-store"] = self.rng.choice(TIMEFRAMES)
+        self._callback("render (timeframe)", RENDER_OUTPUT, "chart5-timeframe-store")
+
+    def detail(self):
+        chart_id = self.rng.choice(DETAIL_CHARTS)
+        self.values["mobile-url"] = f"/details/{chart_id}"
+        response = self._callback("detail page", PAGE_OUTPUT)
+        page = response.get("mobile-page-content", {}).get("children")
+        page_store = find_prop(page, "mobile-detail-page-store", "data")
+        if chart_id in PAGINATED_CHARTS and page_store:
+            self.values["mobile-detail-load-more"] = 1
+            self.values["mobile-detail-page-store"] = page_store
+            self._callback("detail load more", LOAD_MORE_OUTPUT)
+        self.values["mobile-url"] = "/"
+        self._callback("page", PAGE_OUTPUT)
+
+    def run(self):
+        if not self.load_page():
+            return
+        weights = ACTION_WEIGHTS[self.kind]
+        actions, action_weights = list(weights), list(weights.values())
+        while not self.stop_event.is_set():
+            action = self.rng.choices(actions, action_weights)[0]
+            getattr(self, action)()
+            self.stop_event.wait(self.rng.expovariate(1 / self.think_time))
+
+
+def run_stage(urls, num_clients, duration, think_time, seed):
+    """Run `num_clients` clients (split over desktop / mobile urls) for `duration` s."""
+    stats = Stats()
+    stop_event = threading.Event()
+    kinds = list(urls)
+    clients = [
+        SimulatedClient(
+            urls[kinds[i % len(kinds)]],
+            kinds[i % len(kinds)],
+            stats,
+            stop_event,
+            think_time,
+            seed + i,
+        )
+        for i in range(num_clients)
+    ]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    stop_event.wait(duration)
+    stop_event.set()
+    for client in clients:
+        client.join(timeout=60)
+    return stats, time.perf_counter() - start
+
+
+def summarize(stats, num_clients, elapsed) -> dict:
+    by_action = defaultdict(list)
+    for action, latency, ok, size in stats.rows:
+        by_action[action].append((latency, ok, size))
+
+    def _summary(rows):
+        latencies = [r[0] * 1000 for r in rows]
+        errors = sum(1 for r in rows if not r[1])
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": errors / len(rows) if rows else 0,
+            "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90),
+            "p99_ms": percentile(latencies, 99),
+            "mean_kb": statistics.mean(r[2] for r in rows) / 1024 if rows else 0,
+        }
+
+    overall = _summary([(r[1], r[2], r[3]) for r in stats.rows])
+    overall["throughput_rps"] = len(stats.rows) / elapsed if elapsed else 0
+    return {
+        "clients": num_clients,
+        "elapsed_s": elapsed,
+        "overall": overall,
+        "actions": {name: _summary(rows) for name, rows in sorted(by_action.items())},
+    }
+
+
+def print_summary(summary):
+    overall = summary["overall"]
+    print(
+        f"\n{summary['clients']} clients, {summary['elapsed_s']:.0f}s: "
+        f"{overall['requests']} requests, {overall['throughput_rps']:.1f} req/s, "
+        f"errors {overall['error_rate']:.1%}, p50 {overall['p50_ms'] or 0:.0f}ms, "
+        f"p90 {overall['p90_ms'] or 0:.0f}ms, p99 {overall['p99_ms'] or 0:.0f}ms"
+    )
+    print(
+        f"  {'action':32} {'n':>6} {'err':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'kB':>8}"
+    )
+    for name, s in summary["actions"].items():
+        print(
+            f"  {name:32} {s['requests']:>6} {s['errors']:>5} {s['p50_ms']:>7.0f}ms "
+            f"{s['p90_ms']:>7.0f}ms {s['p99_ms']:>7.0f}ms {s['mean_kb']:>8.1f}"
+        )
+
+
+# ---- Local servers on a synthetic plant ----
+def start_servers(machines, weeks, tmp, desktop_port, mobile_port):
+    from Database.synthetic_data import create_sqlite_database, write_credentials
+
+    db_path = os.path.join(tmp, "plant.db")
+    credentials_path = os.path.join(tmp, "plant.yml")
+    create_sqlite_database(db_path, machines, weeks)
+    write_credentials(db_path, credentials_path)
+    env = dict(
+        os.environ,
+        DASHBOARD_DB_CREDENTIALS=credentials_path,
+        # Boot from the synthetic plant, not the deployment's warm-restart
+        # snapshot, and leave that one alone
+        DASHBOARD_LAST_SNAPSHOT=os.path.join(tmp, "last_snapshot"),
+    )
+
+    processes, urls = [], {}
+    for kind, port in (("desktop", desktop_port), ("mobile", mobile_port)):
+        module = f"{kind}_app"
+        code = (
+            f"import {module}; "
+            f"{module}.{module}.run(host='127.0.0.1', port={port}, threaded=True)"
+        )
+        log = open(os.path.join(tmp, f"{kind}.log"), "w")
+        processes.append(
+            subprocess.Popen(
+                [sys.executable, "-c", code], env=env, stdout=log, stderr=log
+            )
+        )
+        urls[kind] = f"http://127.0.0.1:{port}"
+
+    for kind, url in urls.items():
+        deadline = time.time() + 120
+        while True:
+            try:
+                if requests.get(url + "/", timeout=5).status_code == 200:
+                    break
+            except requests.RequestException:
+                pass
+            if time.time() > deadline:
+                stop_servers(processes)
+                raise RuntimeError(f"{kind} server did not start, see {tmp}")
+            time.sleep(0.5)
+    return processes, urls
+
+
+def stop_servers(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--desktop-url")
+    parser.add_argument("--mobile-url")
+    parser.add_argument("--serve", action="store_true", help="Start local servers")
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--desktop-port", type=int, default=8061)
+    parser.add_argument("--mobile-port", type=int, default=8062)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per stage")
+    parser.add_argument(
+        "--think", type=float, default=2.0, help="Mean seconds between actions"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the summaries as JSON")
+    args = parser.parse_args()
+
+    urls = {}
+    if args.desktop_url:
+        urls["desktop"] = args.desktop_url
+    if args.mobile_url:
+        urls["mobile"] = args.mobile_url
+
+    processes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            if args.serve:
+                processes, urls = start_servers(
+                    args.machines, args.weeks, tmp, args.desktop_port, args.mobile_port
+                )
+            if not urls:
+                parser.error(
+                    "Pass --serve or at least one of --desktop-url/--mobile-url"
+                )
+
+            summaries = []
+            for num_clients in args.clients:
+                stats, elapsed = run_stage(
+                    urls, num_clients, args.duration, args.think, args.seed
+                )
+                summary = summarize(stats, num_clients, elapsed)
+                print_summary(summary)
+                summaries.append(summary)
+        finally:
+            stop_servers(processes)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"args": vars(args), "stages": summaries},
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Replay captured production payloads without a database.
+
+Captures are recorded by the dashboard when DASHBOARD_CAPTURE_DIR is set
+(see Database/payload_capture.py):
+- every chart data capture is fed through all chart factories
+  (the render cases of bench_pipeline);
+- with DASHBOARD_CAPTURE_CALLBACKS=1, the logged callback requests are
+  replayed against desktop / mobile apps built on the captured data, and the
+  replay time is compared with the server time measured in production.
+
+Usage (from the project root):
+    python -m benchmarks.replay_captures captures/ --repeat 3
+    python -m benchmarks.replay_captures captures/ --stages callback --limit 500
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from bisect import bisect_right
+from collections import defaultdict
+
+from benchmarks.bench_pipeline import measure, render_cases
+from Database.payload_capture import (
+    iter_callback_records,
+    list_chart_captures,
+    load_chart_capture,
+)
+
+LANG = "zh_cn"
+DATA_STORE_ID = "all-chart-data-store"
+
+
+def replay_renders(captures, repeat, results):
+    print(f"{'capture':28} {'render':48} {'best':>10} {'kB':>9}")
+    for _, path in captures:
+        capture = load_chart_capture(path)
+        captured_at = capture["meta"]["captured_at"]
+        for name, func in render_cases(capture["charts_data"], LANG):
+            try:
+                m = measure(func, repeat, trace_memory=False)
+            except Exception as e:
+                # Real data finds the bugs synthetic data does not
+                print(f"{captured_at:28} {name:48} FAILED: {e}")
+                results.append(
+                    {
+                        "capture": captured_at,
+                        "stage": "render",
+                        "name": name,
+                        "error": str(e),
+                    }
+                )
+                continue
+            m.pop("_result")
+            results.append(
+                {"capture": captured_at, "stage": "render", "name": name, **m}
+            )
+            print(
+                f"{captured_at:28} {name:48} {m['time_ms_best']:8.1f}ms "
+                f"{m['payload_bytes'] / 1024:9.1f}"
+            )
+
+
+def build_replay_app(kind, charts_data):
+    """A desktop / mobile app with the production callbacks, minus the DB refresh."""
+    import dash_bootstrap_components as dbc
+    from dash import Dash
+
+    from callbacks.select_time_period_callback import (
+        register_chart5_timeframe_callbacks,
+        register_dashboard_render_callback,
+        register_time_period_callbacks,
+    )
+
+    mobile = kind == "mobile"
+    app = Dash(
+        f"replay_{kind}",
+        external_stylesheets=[dbc.themes.BOOTSTRAP],
+        suppress_callback_exceptions=True,
+    )
+    if mobile:
+        from callbacks.detail_page_callbacks import (
+            register_detail_page_callbacks,
+            register_table_click_url_push,
+        )
+        from layouts.mobile_dashboard_layout import create_mobile_layout
+
+        app.layout = create_mobile_layout(
+            initial_charts_data=charts_data,
+            color_theme="black",
+            lang=LANG,
+            default_period="今天",
+        )
+        register_table_click_url_push(app=app)
+        register_detail_page_callbacks(app=app, lang=LANG)
+    else:
+        from callbacks.refresher_callback import register_chart2_page_turner
+        from layouts.desktop_dashboard_layout import create_desktop_layout
+
+        app.layout = create_desktop_layout(
+            initial_charts_data=charts_data,
+            color_theme="black",
+            lang=LANG,
+            default_period="今天",
+        )
+        register_chart2_page_turner(app)
+    register_time_period_callbacks(app=app, mobile=mobile, lang=LANG)
+    register_chart5_timeframe_callbacks(app=app, mobile=mobile, lang=LANG)
+    register_dashboard_render_callback(app=app, mobile=mobile, lang=LANG)
+    return app
+
+
+def _with_handle(body, handle):
+    """Point the captured data store handle at the replayed snapshot."""
+    body = json.loads(json.dumps(body))
+    for item in body.get("inputs", []) + body.get("state", []):
+        if isinstance(item, dict) and item.get("id") == DATA_STORE_ID:
+            item["value"] = handle
+    return body
+
+
+def _callback_name(app_name, body):
+    output = body.get("output", "").strip(".").split("...")[0]
+    changed = ",".join(p.split(".")[0] for p in body.get("changedPropIds", []))
+    return f"{app_name} {output} <- {changed or 'initial'}"
+
+
+def replay_callbacks(capture_dir, captures, limit, results):
+    from Database.snapshot_store import snapshot_store
+
+    if not captures:
+        print("No chart data captures to replay callbacks against")
+        return
+    timestamps = [timestamp for timestamp, _ in captures]
+    handles, apps, clients = {}, {}, {}
+    timings = defaultdict(list)
+    skipped = 0
+
+    for count, (app_name, record) in enumerate(iter_callback_records(capture_dir)):
+        if limit and count >= limit:
+            break
+        body = record.get("body")
+        if not body or record.get("status") not in (200, 204):
+            skipped += 1
+            continue
+
+        # The newest capture taken before the request
+        index = max(0, bisect_right(timestamps, record["timestamp"]) - 1)
+        if index not in handles:
+            charts_data = load_chart_capture(captures[index][1])["charts_data"]
+            handles[index] = snapshot_store.put(charts_data)
+        if app_name not in apps:
+            charts_data = snapshot_store.get(handles[index]["snapshot_id"])
+            apps[app_name] = build_replay_app(app_name, charts_data)
+            clients[app_name] = apps[app_name].server.test_client()
+
+        if body.get("output") not in apps[app_name].callback_map:
+            skipped += 1
+            continue
+
+        start = time.perf_counter()
+        response = clients[app_name].post(
+            "/_dash-update-component", json=_with_handle(body, handles[index])
+        )
+        replay_ms = (time.perf_counter() - start) * 1000
+        timings[_callback_name(app_name, body)].append(
+            (record.get("duration_ms"), replay_ms, response.status_code)
+        )
+
+    print(
+        f"\n{'callback':64} {'n':>5} {'prod p50':>9} {'replay p50':>11} {'errors':>7}"
+    )
+    for name, rows in sorted(timings.items()):
+        production = [r[0] for r in rows if r[0] is not None]
+        replay = [r[1] for r in rows]
+        errors = sum(1 for r in rows if r[2] not in (200, 204))
+        row = {
+            "stage": "callback",
+            "name": name,
+            "requests": len(rows),
+            "errors": errors,
+            "production_p50_ms": statistics.median(production) if production else None,
+            "replay_p50_ms": statistics.median(replay),
+            "replay_max_ms": max(replay),
+        }
+        results.append(row)
+        print(
+            f"{name[:64]:64} {len(rows):>5} "
+            f"{row['production_p50_ms'] or 0:>7.0f}ms {row['replay_p50_ms']:>9.0f}ms "
+            f"{errors:>7}"
+        )
+    if skipped:
+        print(
+            f"Skipped {skipped} requests (failed in production or not replayable, e.g. DB refresh)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("capture_dir")
+    parser.add_argument("--stages", nargs="+", default=["render", "callback"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--captures", type=int, default=0, help="Only the newest N chart captures"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=0, help="Replay at most N callback requests"
+    )
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    captures = list_chart_captures(args.capture_dir)
+    if args.captures:
+        captures = captures[-args.captures :]
+    print(f"{len(captures)} chart data captures in {args.capture_dir}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before the dashboard modules are imported: the replay apps must not
+        # touch the deployment's warm-restart snapshot (env/last_snapshot)
+        os.environ["DASHBOARD_LAST_SNAPSHOT"] = os.path.join(tmp, "last_snapshot")
+        if "render" in args.stages:
+            replay_renders(captures, args.repeat, results)
+        if "callback" in args.stages:
+            replay_callbacks(args.capture_dir, captures, args.limit, results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import logging
+import math
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Output, Input, State
+from dash import html, dcc, Output, Input, State, Patch
 import plotly.graph_objects as go  # Import go for placeholder
 from ChartFactory.chart_factory_MachineUasge import MachineUsageChart
 from ChartFactory.chartfactory_chart2 import create_chart2_figure_detail
@@ -11,7 +12,8 @@ from ChartFactory.chart_factory_chart5 import create_chart5_figure
 from ChartFactory.chartfactory_chart6 import create_chart6_figure_detail
 from dash.dependencies import ALL
 from dash import callback_context
-from Database.serialize_df import deserialize_dataframe_dict
+from Database.snapshot_store import pin_snapshot, resolve_charts_data
+from Server.render_pool import RenderJob, period_slice, render_pool
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +69,49 @@ charts_var = {
 }
 
 
+# Detail views built page by page: summary first, then machine rows on "load more"
+PAGINATED_CHARTS = ["chart-1", "chart-4", "chart-6"]
+DETAIL_MACHINES_PER_ROW = 3  # machines per detail figure
+DETAIL_ROWS_PER_PAGE = 3  # detail figures built and sent per page
+LOAD_MORE_STYLE = {"width": "100%"}
+LOAD_MORE_HIDDEN_STYLE = {"display": "none"}
+
+
+def _count_detail_rows(chart_data, period) -> int:
+    """Number of machine figures in the detail view of a period."""
+    try:
+        return math.ceil(
+            len(chart_data[period]["all_machine"]) / DETAIL_MACHINES_PER_ROW
+        )
+    except Exception:
+        return 0
+
+
+def _create_detail_graph_rows(chart_id, figures, first_index=0):
+    """Wrap detail figures in rows of full-width graphs."""
+    return [
+        dbc.Row(
+            dbc.Col(
+                dcc.Graph(
+                    id=f"mobile-detail-chart-{chart_id}-{first_index + i}",
+                    figure=fig,
+                    style={
+                        "height": "45vh",
+                        "width": "100%",
+                    },
+                    config={
+                        "displayModeBar": False,
+                        "responsive": True,
+                    },
+                ),
+                width=12,
+            ),
+            className="mb-5",  # Add  bottom margin between charts
+        )
+        for i, fig in enumerate(figures)
+    ]
+
+
 # Placeholder figure function (can be defined elsewhere too)
 def create_generic_placeholder_figure(title="Loading..."):
     fig = go.Figure()
@@ -127,7 +172,7 @@ def register_detail_page_callbacks(
     detail_figure_generators : dict
         Dict mapping chart_id -> generator function
         Each generator should have signature: func(period, chart_data)
-        where chart_data is the deserialized data from CHART_DATA_STORE_ID
+        where chart_data is the snapshot data referenced by CHART_DATA_STORE_ID
     chart_title : dict
         Dict mapping chart_id -> display title for the detail view
     layout_func : function
@@ -151,7 +196,7 @@ def register_detail_page_callbacks(
 
         pathname: str - The current URL path
         period_data: Any - Data from the time-period-store (selected period)
-        chart_data: dict - Serialized chart data from CHART_DATA_STORE_ID
+        chart_data: dict - Snapshot handle from CHART_DATA_STORE_ID
         """
 
         if pathname == "/" or pathname is None:
@@ -197,8 +242,11 @@ def register_detail_page_callbacks(
             f"DETAIL DEBUG: Using PERIOD_STORE_ID={PERIOD_STORE_ID} to access store data"
         )
 
-        # Check for chart_data
-        chart_data = all_chart_data.get(f"{chart_id}-data-store", None)
+        # Check for chart_data (resolved from the server-side snapshot); the
+        # pages of the detail view all come from this one snapshot
+        snapshot = pin_snapshot(all_chart_data)
+        charts_data = resolve_charts_data(snapshot) or {}
+        chart_data = charts_data.get(f"{chart_id}-data-store", None)
         chart_data_desc = "None or not dict"
         if chart_data and isinstance(chart_data, dict):
             chart_data_desc = f"Dict with keys: {list(chart_data.keys())}"
@@ -232,9 +280,8 @@ def register_detail_page_callbacks(
             #     f"DETAIL DEBUG: Final period being used={period}, from store={period_data}, default={default_period}"
             # )
 
-            # Deserialize the chart data
-
-            deserialized_chart_data = deserialize_dataframe_dict(chart_data)
+            # DataFrames come straight from the snapshot, no deserialization
+            deserialized_chart_data = chart_data
 
             # Check if deserialization was successful
             if deserialized_chart_data is None or (
@@ -268,12 +315,62 @@ def register_detail_page_callbacks(
                         className="mb-3",
                     )
                 ]
+            elif chart_id in PAGINATED_CHARTS:
+                # Summary and first page of machine rows; the rest on "load more"
+                logger.info(
+                    f"DETAIL DEBUG: Creating first detail page for {chart_id} with chart_factory"
+                )
+                figures = render_pool.render(
+                    RenderJob(
+                        chart_factory,
+                        kwargs=dict(
+                            period=data_key,
+                            dfs=period_slice(deserialized_chart_data, data_key),
+                            row_count=DETAIL_ROWS_PER_PAGE,
+                        ),
+                    )
+                )
+                total_rows = _count_detail_rows(deserialized_chart_data, data_key)
+                has_more = total_rows > DETAIL_ROWS_PER_PAGE
+                graph_components = [
+                    html.Div(
+                        id="mobile-detail-rows",
+                        children=_create_detail_graph_rows(chart_id, figures),
+                    ),
+                    dcc.Store(
+                        id="mobile-detail-page-store",
+                        data={
+                            "chart_id": chart_id,
+                            "snapshot": snapshot,
+                            "period": data_key,
+                            "next_row": DETAIL_ROWS_PER_PAGE,
+                            "next_index": len(figures),
+                            "total_rows": total_rows,
+                        },
+                    ),
+                    dbc.Button(
+                        "加载更多",
+                        id="mobile-detail-load-more",
+                        color="secondary",
+                        size="sm",
+                        className="mb-3",
+                        style=LOAD_MORE_STYLE if has_more else LOAD_MORE_HIDDEN_STYLE,
+                    ),
+                ]
             else:
                 # Call the generator function with deserialized data
                 logger.info(
                     f"DETAIL DEBUG: Creating detail figure for {chart_id} with chart_factory"
                 )
-                figures = chart_factory(period=data_key, dfs=deserialized_chart_data)
+                figures = render_pool.render(
+                    RenderJob(
+                        chart_factory,
+                        kwargs=dict(
+                            period=data_key,
+                            dfs=period_slice(deserialized_chart_data, data_key),
+                        ),
+                    )
+                )
                 logger.info(
                     f"DETAIL DEBUG: Got {len(figures) if isinstance(figures, list) else 1} figures"
                 )
@@ -282,27 +379,7 @@ def register_detail_page_callbacks(
                 graph_components = []
                 if isinstance(figures, list):
                     # Create a graph component for each figure in the array
-                    for i, fig in enumerate(figures):
-                        graph_components.append(
-                            dbc.Row(
-                                dbc.Col(
-                                    dcc.Graph(
-                                        id=f"mobile-detail-chart-{chart_id}-{i}",
-                                        figure=fig,
-                                        style={
-                                            "height": "45vh",
-                                            "width": "100%",
-                                        },
-                                        config={
-                                            "displayModeBar": False,
-                                            "responsive": True,
-                                        },
-                                    ),
-                                    width=12,
-                                ),
-                                className="mb-5",  # Add  bottom margin between charts
-                            )
-                        )
+                    graph_components = _create_detail_graph_rows(chart_id, figures)
                 else:
                     # Single figure case
                     graph_components = [
@@ -414,4 +491,76 @@ def register_detail_page_callbacks(
                 ],
             )
 
+    @app.callback(
+        Output("mobile-detail-rows", "children"),
+        Output("mobile-detail-page-store", "data"),
+        Output("mobile-detail-load-more", "style"),
+        Input("mobile-detail-load-more", "n_clicks"),
+        State("mobile-detail-page-store", "data"),
+        prevent_initial_call=True,
+    )
+    def load_more_detail_rows(n_clicks, page_state):
+        """
+        Build the next page of machine rows and append it to the detail view.
+
+        The rows come from the snapshot the view was opened with: data of a
+        later refresh may order the machines differently.
+        """
+        if not n_clicks or not page_state:
+            return dash.no_update, dash.no_update, dash.no_update
+
+        chart_id = page_state["chart_id"]
+        next_row = page_state["next_row"]
+        total_rows = page_state["total_rows"]
+        if next_row >= total_rows:
+            return dash.no_update, dash.no_update, LOAD_MORE_HIDDEN_STYLE
+
+        charts_data = resolve_charts_data(page_state.get("snapshot"), fallback=False)
+        if charts_data is None:
+            # Evicted meanwhile; reopening the view starts from fresh data
+            logger.warning(
+                f"DETAIL DEBUG: Snapshot of the {chart_id} detail view is gone, "
+                "no more rows"
+            )
+            return dash.no_update, dash.no_update, LOAD_MORE_HIDDEN_STYLE
+
+        try:
+            chart_data = charts_data.get(f"{chart_id}-data-store", None)
+            figures = render_pool.render(
+                RenderJob(
+                    charts_var[chart_id]["chart_factory"],
+                    kwargs=dict(
+                        period=page_state["period"],
+                        dfs=period_slice(chart_data, page_state["period"]),
+                        include_summary=False,
+                        row_start=next_row,
+                        row_count=DETAIL_ROWS_PER_PAGE,
+                    ),
+                )
+            )
+        except Exception as e:
+            logger.error(
+                f"DETAIL DEBUG: Error loading rows {next_row}+ for chart {chart_id}: {e}",
+                exc_info=True,
+            )
+            return dash.no_update, dash.no_update, dash.no_update
+
+        # Send only the new rows; the client appends them to the existing ones
+        rows = Patch()
+        rows.extend(
+            _create_detail_graph_rows(chart_id, figures, page_state["next_index"])
+        )
+        next_row += DETAIL_ROWS_PER_PAGE
+        page_state = {
+            **page_state,
+            "next_row": next_row,
+            "next_index": page_state["next_index"] + len(figures),
+        }
+        logger.info(f"DETAIL DEBUG: Loaded {len(figures)} more figures for {chart_id}")
+        return (
+            rows,
+            page_state,
+            LOAD_MORE_STYLE if next_row < total_rows else LOAD_MORE_HIDDEN_STYLE,
+        )
+
     # logger.info(f"Mobile page callbacks registered for chart {chart_id}.")
@@ -1,11 +1,24 @@
 import dash
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Output, Input, State, callback_context, ALL
-import json
+from dash import (
+    html,
+    dcc,
+    Output,
+    Input,
+    State,
+    ClientsideFunction,
+    ALL,
+    callback_context,
+    no_update,
+)
 import logging
+import threading
 import pandas as pd
-from Database.serialize_df import deserialize_dataframe_dict
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import parse_qs
+from Database.snapshot_store import resolve_charts_data, snapshot_store
 from ChartFactory.chart_factory_MachineUasge import MachineUsageChart
 from ChartFactory.chartfactory_chart3 import (
     create_chart3_figure,
@@ -16,6 +29,8 @@ from ChartFactory.chartfactory_chart4 import (
     create_chart4_figure_mobile,
 )
 from ChartFactory.chart_factory_chart5 import create_chart5_figure
+from Database.chart5_windows import bucket_now
+from Server.render_pool import RenderJob, period_slice, render_pool
 from ChartFactory.chartfactory_chart6 import (
     create_chart6_figure,
     create_chart6_figure_mobile,
@@ -26,187 +41,26 @@ import math  # Needed for ceiling division when paging machines for chart-5
 
 logger = logging.getLogger(__name__)
 
+PERIOD_STORE_ID = "time-period-store"
+ALL_CHART_DATA_STORE_ID = "all-chart-data-store"
+CHART5_TIMEFRAME_STORE_ID = "chart5-timeframe-store"
+INTERVAL_ID = "mobile-interval"
+URL_ID = "mobile-url"
+DATA_AS_OF_ID = "data-as-of"
+CHART5_NOW_LINE_STORE_ID = "chart5-now-line-store"
 
-# ---- Callback Registration ----
-
-
-def register_chart5_timeframe_callbacks(app, mobile=False, lang: str = "zh_cn"):
-    """Registers callbacks for chart5 timeframe selection."""
-    CHART5_TIMEFRAME_BUTTON_TYPE = "chart5-timeframe-button"
-    CHART5_TIMEFRAME_STORE_ID = "chart5-timeframe-store"
-    CHART5_ID = "chart-5"
-
-    @app.callback(
-        Output(CHART5_TIMEFRAME_STORE_ID, "data", allow_duplicate=True),
-        Input({"type": CHART5_TIMEFRAME_BUTTON_TYPE, "index": ALL}, "n_clicks"),
-        State(CHART5_TIMEFRAME_STORE_ID, "data"),
-        prevent_initial_call=True,
-    )
-    def update_selected_chart5_timeframe(n_clicks_list, current_timeframe):
-        ctx = callback_context
-        if not ctx.triggered:
-            return current_timeframe
-
-        button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-        if not button_id:
-            return current_timeframe
-
-        try:
-            button_info = json.loads(button_id)
-            selected_timeframe = button_info.get("index")
-            if selected_timeframe:
-                logger.info(
-                    f"Chart5 timeframe button clicked (updates {CHART5_TIMEFRAME_STORE_ID}): {selected_timeframe}"
-                )
-                return selected_timeframe
-        except json.JSONDecodeError:
-            logger.error(
-                f"Failed to parse button ID for {CHART5_TIMEFRAME_STORE_ID}: {button_id}"
-            )
-            return current_timeframe
-        return current_timeframe
-
-    @app.callback(
-        Output(CHART5_ID, "figure"),
-        Input(CHART5_TIMEFRAME_STORE_ID, "data"),
-        Input("all-chart-data-store", "data"),
-        Input(
-            "chart-2-interval", "n_intervals"
-        ),  # reuse existing timer for auto page turning
-        prevent_initial_call=True,
-    )
-    def update_chart5_figure(selected_timeframe, all_chart_data, n_intervals):
-        # Get the chart5 specific data from all_chart_data
-        chart5_data_serialized = all_chart_data.get(f"{CHART5_ID}-data-store")
-
-        if not chart5_data_serialized:
-            logger.warning(
-                f"Chart5: No data found in store key '{CHART5_ID}-data-store'"
-            )
-            return go.Figure().update_layout(title="Chart5: No data available")
-
-        logger.info(
-            f"Chart5: Serialized data received: {chart5_data_serialized.keys()}"
-        )
-
-        # Deserialize the chart5 data
-        deserialized_chart5_data = None
-        try:
-            deserialized_chart5_data = deserialize_dataframe_dict(
-                chart5_data_serialized
-            )
-            logger.info("Chart5: Deserialization successful.")
-            logger.debug(
-                f"Chart5: Deserialized data: {deserialized_chart5_data.keys()}"
-            )
-        except Exception as e:
-            logger.error(
-                f"Chart5: Exception during deserialization for store key '{CHART5_ID}-data-store': {e}",
-                exc_info=True,
-            )
-
-        logger.info(
-            f"Chart5: Updating figure for timeframe: {selected_timeframe} using initially loaded data."
-        )
-
-        # Handle cases where data loading or deserialization failed
-        if deserialized_chart5_data is None or (
-            isinstance(deserialized_chart5_data, dict)
-            and "error" in deserialized_chart5_data
-        ):
-            error_msg_detail = (
-                "Deserialization resulted in None"
-                if deserialized_chart5_data is None
-                else deserialized_chart5_data.get(
-                    "error", "Unknown deserialization error"
-                )
-            )
-            error_msg = (
-                deserialized_chart5_data.get(
-                    "error", "Initial data load or deserialization failed"
-                )
-                if isinstance(deserialized_chart5_data, dict)
-                else "Initial data load or deserialization failed"
-            )
-            logger.warning(
-                f"Chart5: Cannot update figure. Reason: {error_msg_detail}. Serialized data was: {chart5_data_serialized}"
-            )
-            return go.Figure().update_layout(title=f"Chart5 Error: {error_msg}")
-
-        try:
-            # ---------------- Pagination-by-slicing logic ----------------
-            PAGE_SIZE = 8
-
-            # Safely extract the raw dataframe for the currently selected timeframe
-            df_all = deserialized_chart5_data.get(selected_timeframe, {}).get(
-                "all_machine"
-            )
-
-            if df_all is not None and not df_all.empty:
-                unique_machines = df_all["machine_name"].unique().tolist()
-
-                page_count = max(1, math.ceil(len(unique_machines) / PAGE_SIZE))
-
-                # n_intervals may be None when the callback fires from timeframe button change
-                current_interval = n_intervals or 0
-                current_page_idx = current_interval % page_count
-
-                start_idx = current_page_idx * PAGE_SIZE
-                end_idx = start_idx + PAGE_SIZE
-                machines_subset = unique_machines[start_idx:end_idx]
-
-                df_subset = df_all[df_all["machine_name"].isin(machines_subset)].copy()
-
-                # Build a minimal data structure expected by chart factory
-                data_for_fig = {selected_timeframe: {"all_machine": df_subset}}
-            else:
-                # Fall back to original data if dataframe missing/empty
-                data_for_fig = deserialized_chart5_data
-
-            # -------------------------------------------------------------
-
-            if mobile:
-                # For mobile, use mobile-optimized parameters
-                new_figure = create_chart5_figure(
-                    selected_timeframe,
-                    data_for_fig,
-                    lang=lang,
-                    margin_top=40,
-                    margin_bottom=70,
-                    margin_left=80,
-                    margin_right=20,
-                    page_size=PAGE_SIZE,
-                )
-            else:
-                # For desktop
-                new_figure = create_chart5_figure(
-                    selected_timeframe,
-                    data_for_fig,
-                    lang=lang,
-                    page_size=PAGE_SIZE,
-                )
-                # Apply consistent layout updates
-                new_figure.update_layout(
-                    autosize=True,
-                    height=None,
-                    margin=dict(l=10, r=10, t=90, b=10),
-                )
-            return new_figure
+# Chart 5 machines per page
+CHART5_PAGE_SIZE = 8
 
-        except Exception as e:
-            logger.error(
-                f"Chart5: Error generating figure for timeframe {selected_timeframe}: {e}",
-                exc_info=True,
-            )
-            return go.Figure().update_layout(
-                title=f"Chart5: Error generating chart for {selected_timeframe}"
-            )
-
-    logger.info("Chart5 timeframe callbacks registered.")
+# Rendered chart 5 figures, shared by the clients (see _render_chart5_figure)
+CHART5_FIGURE_CACHE_SIZE = 64
+_chart5_figures = OrderedDict()
+_chart5_figures_lock = threading.Lock()
 
 
-def register_time_period_callbacks(app, mobile=False, lang: str = "zh_cn"):
-    charts_var = {
+def _get_charts_var(lang: str) -> dict:
+    """Figure factories of the period-driven charts."""
+    return {
         "chart-1": {
             "CHART_ID": "chart-1",
             "chart_factory_desktop": MachineUsageChart(
@@ -248,356 +102,452 @@ def register_time_period_callbacks(app, mobile=False, lang: str = "zh_cn"):
         },
     }
 
-    """Registers callbacks for all charts defined in charts_var."""
-    PERIOD_BUTTON_TYPE = "period-button"
-    PERIOD_STORE_ID = "time-period-store"
 
-    @app.callback(
-        Output(PERIOD_STORE_ID, "data", allow_duplicate=True),
-        Input({"type": PERIOD_BUTTON_TYPE, "index": ALL}, "n_clicks"),
-        State(PERIOD_STORE_ID, "data"),
-        prevent_initial_call=True,
+# Configuration for charts with text cards
+TXT_CARDS_CONFIG = {
+    "chart-3": {
+        "card_ids": ["chart3-card-1", "chart3-card-2", "chart3-card-3"],
+        "card_factory": create_chart3_txt_cards,
+        "num_cards": 3,
+    },
+    "chart-6": {
+        "card_ids": [
+            "chart6-card-1",
+            "chart6-card-2",
+            "chart6-card-3",
+        ],  # All 3 cards
+        "card_factory": create_chart6_txt_cards,
+        "num_cards": 3,  # Updating all 3 cards
+    },
+}
+
+
+# ---- Renderers (data already resolved from the snapshot store) ----
+
+
+def _submit_chart_figure(
+    chart_id, chart_data, selected_period, chart_factory, margin, mobile
+):
+    """Submit one period-driven chart (chart-1/3/4/6) to the render pool."""
+    if chart_data is None:
+        logger.warning(f"Chart {chart_id}: Cannot update figure, data unavailable.")
+        return None
+
+    logger.info(f"Chart {chart_id}: Updating figure for period: {selected_period}.")
+
+    layout = None
+    if not mobile:
+        # Match exact layout update as in create_chart1_layout
+        layout = dict(
+            autosize=True,
+            height=None,
+            margin=margin,
+        )
+        # Ensure legend placement for chart-6 matches the initial configuration
+        if chart_id == "chart-6":
+            layout["legend"] = dict(
+                orientation="h",
+                yanchor="top",
+                y=-0.2,  # Match initial layout legend position
+                xanchor="center",
+                x=0.5,
+                font=dict(color="#fdfefe"),
+            )
+    # No additional layout updates for mobile to preserve default styling
+    return render_pool.submit(
+        RenderJob(
+            chart_factory,
+            # Pass the chart-specific dataset
+            args=(selected_period, period_slice(chart_data, selected_period)),
+            layout=layout,
+        )
     )
-    def update_selected_period(n_clicks_list, current_period):
-        ctx = callback_context
-        if not ctx.triggered:
-            return current_period
 
-        button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-        if not button_id:
-            return current_period
 
-        try:
-            button_info = json.loads(button_id)
-            selected_period = button_info.get("index")
-            if selected_period:
-                # Log which button triggered this, though it updates a global store
-                logger.info(
-                    f"Period button clicked (updates {PERIOD_STORE_ID}): {selected_period}"
-                )
-                return selected_period
-        except json.JSONDecodeError:
-            logger.error(
-                f"Failed to parse button ID for {PERIOD_STORE_ID}: {button_id}"
-            )
-            return current_period
-        return current_period
-
-    # Register callbacks for each chart in charts_var
-    for chart_id, chart_config in charts_var.items():
-        CHART_ID = chart_config["CHART_ID"]
-        current_chart_margin = chart_config[
-            "margin"
-        ]  # Extract margin for the current chart
-        if mobile:
-            chart_factory = chart_config["chart_factory_mobile"]
-        else:
-            chart_factory = chart_config["chart_factory_desktop"]
+def _chart_figure_result(chart_id, future, selected_period):
+    """The figure of _submit_chart_figure(), or an error placeholder."""
+    if future is None:
+        return go.Figure().update_layout(
+            title="Error: Initial data load or deserialization failed"
+        )
 
-        @app.callback(
-            Output(CHART_ID, "figure"),
-            Input(PERIOD_STORE_ID, "data"),
-            Input("all-chart-data-store", "data"),
-            prevent_initial_call=True,
+    try:
+        return render_pool.result(future)
+
+    except Exception as e:
+        logger.error(
+            f"Chart {chart_id}: Error generating figure for period {selected_period}: {e}",
+            exc_info=True,
+        )
+        return go.Figure().update_layout(
+            title=f"Error generating chart for {selected_period}"
         )
-        def update_chart_figure(
-            selected_period,
-            all_chart_data,
-            chart_id=CHART_ID,
-            chart_factory=chart_factory,
-            margin=current_chart_margin,  # Pass the specific margin as a default argument
-        ):
-            # Get the specific chart's data from all_chart_data
-            chart_specific_data_serialized = all_chart_data.get(
-                f"{chart_id}-data-store"  # Use chart_id from the function's default argument
-            )
 
-            logger.info(
-                f"Chart {chart_id}: Serialized data received: {chart_specific_data_serialized.keys()}"
-            )
 
-            # Deserialize the specific chart's data
-            deserialized_chart_data = None  # Initialize to None
-            try:
-                deserialized_chart_data = deserialize_dataframe_dict(
-                    chart_specific_data_serialized
-                )
-                logger.info(f"Chart {chart_id}: Deserialization successful.")
-                logger.debug(
-                    f"Chart {chart_id}: Deserialized data: {deserialized_chart_data.keys()}"
-                )
-            except Exception as e:
-                logger.error(
-                    f'Chart {chart_id}: Exception during deserialization for store key f"{chart_id}-data-store": {e}',
-                    exc_info=True,
-                )
-                # Keep deserialized_chart_data as None or an error structure if preferred
-                # For now, it will remain None, and the existing error handling below will catch it.
+def _render_txt_cards(chart_id, chart_data, selected_period, card_factory, num_cards):
+    """Render the text cards of one chart."""
+    if chart_data is None:
+        logger.warning(f"Cards {chart_id}: No data found for '{chart_id}-data-store'")
+        return [html.Div("No data available")] * num_cards
 
-            logger.info(
-                f"Chart {chart_id}: Updating figure for period: {selected_period} using initially loaded data."
-            )
-            logger.debug(
-                f"Chart {chart_id}: Deserialized data: {deserialized_chart_data}"
-            )
+    logger.info(f"Cards {chart_id}: Updating cards for period: {selected_period}.")
 
-            # Handle cases where initial data loading might have failed or deserialization failed
-            if deserialized_chart_data is None or (
-                isinstance(deserialized_chart_data, dict)
-                and "error" in deserialized_chart_data
-            ):
-                error_msg_detail = (
-                    "Deserialization resulted in None"
-                    if deserialized_chart_data is None
-                    else deserialized_chart_data.get(
-                        "error", "Unknown deserialization error"
-                    )
-                )
-                error_msg = (
-                    deserialized_chart_data.get(
-                        "error", "Initial data load or deserialization failed"
-                    )
-                    if isinstance(deserialized_chart_data, dict)
-                    else "Initial data load or deserialization failed"
-                )
-                logger.warning(
-                    f"Chart {chart_id}: Cannot update figure. Reason: {error_msg_detail}. Serialized data was: {chart_specific_data_serialized}"
-                )
-                logger.warning(
-                    f"Chart {chart_id}: Cannot update figure, data unavailable. Msg: {error_msg}"
-                )
-                return go.Figure().update_layout(title=f"Error: {error_msg}")
-
-            # # Handle cases where the selected period itself is invalid
-            # if not selected_period or selected_period in ["No Data", "Error"]:
-            #     logger.warning(
-            #         f"Chart {chart_id}: Invalid period selected: {selected_period}"
-            #     )
-            #     return go.Figure().update_layout(
-            #         title=f"Invalid Period Selected: {selected_period}"
-            #     )
-
-            # # Check if the selected period exists within the chart data
-            # if selected_period not in deserialized_chart_data:
-            #     logger.warning(
-            #         f"Chart {chart_id}: Selected period '{selected_period}' not found in data for chart {chart_id}."
-            #     )
-            #     available_periods = list(deserialized_chart_data.keys())
-            #     return go.Figure().update_layout(
-            #         title=f"Data not found for period {selected_period}. Available periods: {available_periods}"
-            #     )
-
-            try:
-                if mobile:
-                    new_figure = chart_factory(  # Use chart_factory from the function's default argument
-                        selected_period,
-                        deserialized_chart_data,  # Pass the chart-specific deserialized dataset
-                    )
-                    # No additional layout updates for mobile to preserve default styling
-                else:
-                    # Create the chart using the deserialized data and the selected period
-                    new_figure = chart_factory(  # Use chart_factory from the function's default argument
-                        selected_period,
-                        deserialized_chart_data,  # Pass the chart-specific deserialized dataset
-                    )
-                    # Match exact layout update as in create_chart1_layout
-                    new_figure.update_layout(
-                        autosize=True,
-                        height=None,
-                        margin=margin,  # Use the captured margin
-                    )
-                    # Ensure legend placement for chart-6 matches the initial configuration
-                    if chart_id == "chart-6":
-                        new_figure.update_layout(
-                            legend=dict(
-                                orientation="h",
-                                yanchor="top",
-                                y=-0.2,  # Match initial layout legend position
-                                xanchor="center",
-                                x=0.5,
-                                font=dict(color="#fdfefe"),
-                            )
-                        )
-                return new_figure
-
-            except Exception as e:
-                logger.error(
-                    f"Chart {chart_id}: Error generating figure for period {selected_period} from initial data: {e}",
-                    exc_info=True,
-                )
-                return go.Figure().update_layout(
-                    title=f"Error generating chart for {selected_period}"
-                )
+    try:
+        # Return all cards as a list (they come as tuple from factory functions)
+        return list(card_factory(selected_period, chart_data))
 
-        logger.info(
-            f"Chart {CHART_ID} callbacks registered (using initially loaded data)."
+    except Exception as e:
+        logger.error(
+            f"Cards {chart_id}: Error generating cards for period {selected_period}: {e}",
+            exc_info=True,
         )
+        return [html.Div(f"Error generating cards for {selected_period}")] * num_cards
 
 
-def register_txt_cards_callbacks(app, mobile=False, lang: str = "zh_cn"):
-    """Registers callbacks for updating text cards when time period changes."""
-    PERIOD_STORE_ID = "time-period-store"
+def _render_chart5_figure(chart5_data, selected_timeframe, page_index, mobile, lang):
+    """Render chart 5 for a timeframe, showing one page of machines."""
+    if chart5_data is None:
+        logger.warning("Chart5: No data found in store key 'chart-5-data-store'")
+        return go.Figure().update_layout(title="Chart5: No data available")
 
-    # Configuration for charts with text cards
-    txt_cards_config = {
-        "chart-3": {
-            "card_ids": ["chart3-card-1", "chart3-card-2", "chart3-card-3"],
-            "card_factory": create_chart3_txt_cards,
-            "num_cards": 3,
-        },
-        "chart-6": {
-            "card_ids": [
-                "chart6-card-1",
-                "chart6-card-2",
-                "chart6-card-3",
-            ],  # All 3 cards
-            "card_factory": create_chart6_txt_cards,
-            "num_cards": 3,  # Updating all 3 cards
-        },
-    }
+    logger.info(f"Chart5: Updating figure for timeframe: {selected_timeframe}.")
+
+    try:
+        # ---------------- Pagination-by-slicing logic ----------------
+        # Safely extract the raw dataframe for the currently selected timeframe
+        df_all = chart5_data.get(selected_timeframe, {}).get("all_machine")
+
+        if df_all is not None and not df_all.empty:
+            unique_machines = df_all["machine_name"].unique().tolist()
 
-    # Register callbacks for each chart's text cards
-    for chart_id, config in txt_cards_config.items():
-        card_factory = config["card_factory"]
-        card_ids = config["card_ids"]
-        num_cards = config["num_cards"]
-
-        @app.callback(
-            [Output(card_id, "children") for card_id in card_ids],
-            Input(PERIOD_STORE_ID, "data"),
-            Input("all-chart-data-store", "data"),
-            prevent_initial_call=True,
+            page_count = max(1, math.ceil(len(unique_machines) / CHART5_PAGE_SIZE))
+            current_page_idx = (page_index or 0) % page_count
+        else:
+            current_page_idx = 0
+
+        # Every client on the same snapshot renders the same figure within a
+        # chart 5 time bucket
+        cache_key = (
+            id(chart5_data),
+            selected_timeframe,
+            current_page_idx,
+            mobile,
+            lang,
+            bucket_now(),
         )
-        def update_txt_cards(
-            selected_period,
-            all_chart_data,
-            chart_id=chart_id,
-            card_factory=card_factory,
-            num_cards=num_cards,
-        ):
-            # Get the specific chart's data from all_chart_data
-            chart_specific_data_serialized = all_chart_data.get(
-                f"{chart_id}-data-store"
-            )
+        with _chart5_figures_lock:
+            cached = _chart5_figures.get(cache_key)
+        # The data is kept with the figure, so its id cannot be reused meanwhile
+        if cached is not None and cached[0] is chart5_data:
+            return cached[1]
 
-            if not chart_specific_data_serialized:
-                logger.warning(
-                    f"Cards {chart_id}: No data found in store key '{chart_id}-data-store'"
-                )
-                error_card = html.Div("No data available")
-                return [error_card] * num_cards
+        if df_all is not None and not df_all.empty:
 
-            logger.info(
-                f"Cards {chart_id}: Serialized data received: {chart_specific_data_serialized.keys()}"
-            )
+            start_idx = current_page_idx * CHART5_PAGE_SIZE
+            end_idx = start_idx + CHART5_PAGE_SIZE
+            machines_subset = unique_machines[start_idx:end_idx]
 
-            # Deserialize the specific chart's data
-            deserialized_chart_data = None
-            try:
-                deserialized_chart_data = deserialize_dataframe_dict(
-                    chart_specific_data_serialized
-                )
-                logger.info(f"Cards {chart_id}: Deserialization successful.")
-                logger.debug(
-                    f"Cards {chart_id}: Deserialized data: {deserialized_chart_data.keys()}"
-                )
-            except Exception as e:
-                logger.error(
-                    f'Cards {chart_id}: Exception during deserialization for store key "{chart_id}-data-store": {e}',
-                    exc_info=True,
-                )
+            df_subset = df_all[df_all["machine_name"].isin(machines_subset)]
+
+            # Build a minimal data structure expected by chart factory
+            data_for_fig = {selected_timeframe: {"all_machine": df_subset}}
+        else:
+            # Fall back to original data if dataframe missing/empty
+            data_for_fig = chart5_data
+
+        # -------------------------------------------------------------
 
-            logger.info(
-                f"Cards {chart_id}: Updating cards for period: {selected_period} using initially loaded data."
+        if mobile:
+            # For mobile, use mobile-optimized parameters
+            job = RenderJob(
+                create_chart5_figure,
+                args=(selected_timeframe, data_for_fig),
+                kwargs=dict(
+                    lang=lang,
+                    margin_top=40,
+                    margin_bottom=70,
+                    margin_left=80,
+                    margin_right=20,
+                    page_size=CHART5_PAGE_SIZE,
+                ),
+            )
+        else:
+            # For desktop
+            job = RenderJob(
+                create_chart5_figure,
+                args=(selected_timeframe, data_for_fig),
+                kwargs=dict(lang=lang, page_size=CHART5_PAGE_SIZE),
+                # Apply consistent layout updates
+                layout=dict(
+                    autosize=True,
+                    height=None,
+                    margin=dict(l=10, r=10, t=90, b=10),
+                ),
             )
+        new_figure = render_pool.render(job)
+        with _chart5_figures_lock:
+            _chart5_figures[cache_key] = (chart5_data, new_figure)
+            while len(_chart5_figures) > CHART5_FIGURE_CACHE_SIZE:
+                _chart5_figures.popitem(last=False)
+        return new_figure
+
+    except Exception as e:
+        logger.error(
+            f"Chart5: Error generating figure for timeframe {selected_timeframe}: {e}",
+            exc_info=True,
+        )
+        return go.Figure().update_layout(
+            title=f"Chart5: Error generating chart for {selected_timeframe}"
+        )
 
-            # Handle cases where initial data loading might have failed or deserialization failed
-            if deserialized_chart_data is None or (
-                isinstance(deserialized_chart_data, dict)
-                and "error" in deserialized_chart_data
-            ):
-                error_msg_detail = (
-                    "Deserialization resulted in None"
-                    if deserialized_chart_data is None
-                    else deserialized_chart_data.get(
-                        "error", "Unknown deserialization error"
-                    )
-                )
-                error_msg = (
-                    deserialized_chart_data.get(
-                        "error", "Initial data load or deserialization failed"
-                    )
-                    if isinstance(deserialized_chart_data, dict)
-                    else "Initial data load or deserialization failed"
-                )
-                logger.warning(
-                    f"Cards {chart_id}: Cannot update cards. Reason: {error_msg_detail}. Serialized data was: {chart_specific_data_serialized}"
-                )
-                error_card = html.Div(f"Error: {error_msg}")
-                return [error_card] * num_cards
 
-            try:
-                # Create the updated cards using the deserialized data and the selected period
-                updated_cards = card_factory(
+def _render_chart2_table(chart2_data, mobile):
+    """Return (data, columns) of the chart-2 DataTable."""
+    try:
+        if not chart2_data:
+            logger.warning("Chart2 data refresh: No data found in store")
+            return [], []
+
+        # Get the appropriate data for mobile/desktop
+        mobile_option = "mobile" if mobile else "desktop"
+        df = chart2_data.get(mobile_option, {}).get("all_machine", None)
+
+        if df is None or df.empty:
+            logger.warning("Chart2 data refresh: Empty dataframe")
+            return [], []
+
+        # Convert to table format
+        table_data = df.to_dict("records")
+        table_columns = [{"name": i, "id": i} for i in df.columns]
+
+        logger.info("Chart2 data refresh: Successfully updated data and columns")
+        return table_data, table_columns
+
+    except Exception as e:
+        logger.error(f"Chart2 data refresh: Error updating data: {e}", exc_info=True)
+        return [], []
+
+
+# ---- Callback Registration ----
+
+
+def register_chart5_timeframe_callbacks(app, mobile=False, lang: str = "zh_cn"):
+    """Registers callbacks for chart5 timeframe selection.
+
+    The chart 5 figure itself is rendered by the dashboard render callback.
+    """
+    CHART5_TIMEFRAME_BUTTON_TYPE = "chart5-timeframe-button"
+
+    # Timeframe buttons -> store, handled in the browser
+    app.clientside_callback(
+        ClientsideFunction(namespace="dashboard", function_name="select_button_index"),
+        Output(CHART5_TIMEFRAME_STORE_ID, "data", allow_duplicate=True),
+        Input({"type": CHART5_TIMEFRAME_BUTTON_TYPE, "index": ALL}, "n_clicks"),
+        State(CHART5_TIMEFRAME_STORE_ID, "data"),
+        prevent_initial_call=True,
+    )
+
+    # Move the "now" line to the browser's clock on every render and tick;
+    # the figure itself is only rebuilt once per chart 5 time bucket
+    app.clientside_callback(
+        ClientsideFunction(namespace="dashboard", function_name="place_now_line"),
+        Output(CHART5_NOW_LINE_STORE_ID, "data"),
+        Input("chart-5", "figure"),
+        Input(INTERVAL_ID, "n_intervals"),
+        State("chart-5", "id"),
+    )
+
+    logger.info("Chart5 timeframe callbacks registered.")
+
+
+def register_time_period_callbacks(app, mobile=False, lang: str = "zh_cn"):
+    """Registers the period selection callback.
+
+    The figures are rendered by the dashboard render callback.
+    """
+    PERIOD_BUTTON_TYPE = "period-button"
+
+    # Period buttons -> store, handled in the browser
+    app.clientside_callback(
+        ClientsideFunction(namespace="dashboard", function_name="select_button_index"),
+        Output(PERIOD_STORE_ID, "data", allow_duplicate=True),
+        Input({"type": PERIOD_BUTTON_TYPE, "index": ALL}, "n_clicks"),
+        State(PERIOD_STORE_ID, "data"),
+        prevent_initial_call=True,
+    )
+
+    logger.info("Period selection callback registered.")
+
+
+def register_dashboard_render_callback(app, mobile=False, lang: str = "zh_cn"):
+    """Registers the single callback rendering every dashboard component.
+
+    It resolves the `all-chart-data-store` snapshot handle once and only
+    renders the components affected by what changed:
+    - time-period-store: chart-1/3/4/6 figures and text cards
+    - chart5-timeframe-store: chart-5 figure
+    - all-chart-data-store (refresh): everything, including the chart-2 table
+
+    Chart 5 shows one page of machines per refresh interval, cycling with
+    its counter whether or not the data changed.
+    """
+    charts_var = _get_charts_var(lang)
+    card_ids = [
+        card_id
+        for config in TXT_CARDS_CONFIG.values()
+        for card_id in config["card_ids"]
+    ]
+    num_figures = len(charts_var)
+    num_cards = len(card_ids)
+
+    @app.callback(
+        [Output(chart_id, "figure") for chart_id in charts_var]
+        + [Output(card_id, "children") for card_id in card_ids]
+        + [
+            Output("chart-5", "figure"),
+            Output("chart-2", "data"),
+            Output("chart-2", "columns"),
+        ],
+        Input(PERIOD_STORE_ID, "data"),
+        Input(ALL_CHART_DATA_STORE_ID, "data"),
+        Input(CHART5_TIMEFRAME_STORE_ID, "data"),
+        Input(INTERVAL_ID, "n_intervals"),
+        prevent_initial_call=True,
+    )
+    def render_dashboard(selected_period, store_data, selected_timeframe, n_intervals):
+        triggered = {
+            prop_id.split(".")[0] for prop_id in callback_context.triggered_prop_ids
+        }
+        data_changed = ALL_CHART_DATA_STORE_ID in triggered
+        render_period = data_changed or PERIOD_STORE_ID in triggered
+        # Every interval tick turns chart 5 to its next page of machines
+        render_chart5 = (
+            data_changed
+            or CHART5_TIMEFRAME_STORE_ID in triggered
+            or INTERVAL_ID in triggered
+        )
+
+        charts_data = resolve_charts_data(store_data)
+        if charts_data is None:
+            logger.error("Dashboard render: no chart data snapshot available")
+            return [no_update] * (num_figures + num_cards + 3)
+
+        # Period figures render on the pool while the cards and chart 5 are built
+        figure_jobs = []
+        figures = [no_update] * num_figures
+        cards = [no_update] * num_cards
+        if render_period:
+            figure_jobs = [
+                _submit_chart_figure(
+                    chart_id,
+                    charts_data.get(f"{chart_id}-data-store"),
+                    selected_period,
+                    (
+                        config["chart_factory_mobile"]
+                        if mobile
+                        else config["chart_factory_desktop"]
+                    ),
+                    config["margin"],
+                    mobile,
+                )
+                for chart_id, config in charts_var.items()
+            ]
+            cards = []
+            for chart_id, config in TXT_CARDS_CONFIG.items():
+                cards += _render_txt_cards(
+                    chart_id,
+                    charts_data.get(f"{chart_id}-data-store"),
                     selected_period,
-                    deserialized_chart_data,
+                    config["card_factory"],
+                    config["num_cards"],
                 )
 
-                # Return all cards as a list (they come as tuple from factory functions)
-                return list(updated_cards)
+        chart5_figure = no_update
+        if render_chart5:
+            chart5_figure = _render_chart5_figure(
+                charts_data.get("chart-5-data-store"),
+                selected_timeframe,
+                n_intervals,
+                mobile,
+                lang,
+            )
+        if render_period:
+            figures = [
+                _chart_figure_result(chart_id, future, selected_period)
+                for chart_id, future in zip(charts_var, figure_jobs)
+            ]
+
+        table_data, table_columns = no_update, no_update
+        if data_changed:
+            table_data, table_columns = _render_chart2_table(
+                charts_data.get("chart-2-data-store"), mobile
+            )
 
-            except Exception as e:
-                logger.error(
-                    f"Cards {chart_id}: Error generating cards for period {selected_period} from initial data: {e}",
-                    exc_info=True,
-                )
-                error_card = html.Div(f"Error generating cards for {selected_period}")
-                return [error_card] * num_cards
+        return figures + cards + [chart5_figure, table_data, table_columns]
 
-        logger.info(
-            f"Cards {chart_id} callbacks registered (using initially loaded data)."
-        )
+    logger.info("Dashboard render callback registered.")
 
 
 def register_auto_refresh_callbacks(app, mobile=False, lang: str = "zh_cn"):
     """Registers callbacks for automatic refresh of the data store every 60 seconds.
-    The existing callbacks will automatically update charts and text cards when the data store changes.
+    The dashboard render callback updates charts, text cards and the table when
+    the data store changes.
     """
     from Database.fetch_all_charts_data import get_all_charts_data
-    from Database.database_connection import db
-    from Database.serialize_df import serialize_dataframe_dict
-
-    INTERVAL_ID = "mobile-interval"
-    ALL_CHART_DATA_STORE_ID = "all-chart-data-store"
+    from Database.last_snapshot import last_snapshot
+    from Database.multi_plant import data_source
+    from Database.swr_cache import charts_data_cache
+    from Database.refresh_scheduler import tiered_refresh
+
+    def fetch_snapshot():
+        # Fetch fresh data (every plant in multi-plant mode) into a snapshot
+        # shared by every client of this process
+        charts_data = get_all_charts_data(data_source)
+        snapshot = snapshot_store.put(charts_data)
+        # Served on the next boot until its first refresh
+        last_snapshot.save(charts_data)
+        logger.info(f"Fresh data fetched, snapshot {snapshot['snapshot_id']} stored")
+        return snapshot
 
     @app.callback(
-        # Only update the data store - let existing callbacks handle UI updates
+        # Only update the data store - the render callback handles UI updates
         Output(ALL_CHART_DATA_STORE_ID, "data"),
         Input(INTERVAL_ID, "n_intervals"),
+        State(ALL_CHART_DATA_STORE_ID, "data"),
         prevent_initial_call=True,
     )
-    def auto_refresh_data_store(n_intervals):
+    def auto_refresh_data_store(n_intervals, store_data):
         """Auto refresh the data store with fresh data from database every 60 seconds.
-        This will trigger all existing callbacks to update their respective components.
+        The fresh data is kept in the server-side snapshot store; the browser
+        only receives the new snapshot handle.
+
+        Clients share one fetch through charts_data_cache: a recent snapshot
+        is reused, otherwise they wait for a single fresh fetch, and only get
+        the older snapshot when that fetch fails or is slow, so a slow
+        database does not hold up the callbacks for long.
+        With DASHBOARD_REFRESH_TIERS=1 the refresh scheduler fetches instead,
+        and the newest snapshot it assembled is handed out.
         """
         logger.info(f"Auto refresh triggered - interval {n_intervals}")
 
         try:
-            # Fetch fresh data from database
-            fresh_charts_data = get_all_charts_data(db)
-
-            # Serialize the fresh data for storage
-            serialized_fresh_data = {
-                key: serialize_dataframe_dict(df)
-                for key, df in fresh_charts_data.items()
-            }
-
-            logger.info("Fresh data fetched and serialized successfully")
-            logger.info(
-                "Data store updated - existing callbacks will handle UI updates"
-            )
-
-            return serialized_fresh_data
+            if tiered_refresh is not None:
+                snapshot = tiered_refresh.snapshot
+                if snapshot is None:
+                    # Nothing refreshed since the layout was built
+                    return no_update
+            else:
+                snapshot = charts_data_cache.get("charts", fetch_snapshot)
+            if (
+                isinstance(store_data, dict)
+                and store_data.get("snapshot_id") == snapshot["snapshot_id"]
+            ):
+                # This client already shows it, nothing to re-render
+                return no_update
+            # Keep showing the plant this client selected
+            if isinstance(store_data, dict) and store_data.get("plant"):
+                snapshot = {**snapshot, "plant": store_data["plant"]}
+            return snapshot
 
         except Exception as e:
             logger.error(
@@ -605,53 +555,59 @@ def register_auto_refresh_callbacks(app, mobile=False, lang: str = "zh_cn"):
             )
 
             # Keep the existing data in store (don't update it)
-            from dash import no_update
-
             return no_update
 
     logger.info("Auto refresh data store callback registered.")
 
 
-def register_chart2_data_refresh_callback(app, mobile=False, lang: str = "zh_cn"):
-    """Registers callback for chart-2 DataTable data refresh when data store changes."""
+def _plant_from_search(search):
+    values = parse_qs((search or "").lstrip("?")).get("plant")
+    return values[0] if values else None
 
-    @app.callback(
-        [Output("chart-2", "data"), Output("chart-2", "columns")],
-        Input("all-chart-data-store", "data"),
-        prevent_initial_call=True,
-    )
-    def update_chart2_data(all_chart_data):
-        """Update chart-2 DataTable data and columns when data store changes."""
-        try:
-            # Get chart-2 data from the store
-            chart2_data_serialized = all_chart_data.get("chart-2-data-store")
 
-            if not chart2_data_serialized:
-                logger.warning("Chart2 data refresh: No data found in store")
-                return [], []
+def register_plant_view_callback(app):
+    """Registers the ?plant=<id> view selection of multi-plant mode.
 
-            # Deserialize the data
-            chart2_data = deserialize_dataframe_dict(chart2_data_serialized)
+    The plant is kept in the `all-chart-data-store` handle, so every callback
+    resolving it renders that plant; without the parameter the group view is
+    shown. Nothing is registered when DASHBOARD_PLANTS is not set.
+    """
+    from Database.multi_plant import PlantGroup, data_source
 
-            # Get the appropriate data for mobile/desktop
-            mobile_option = "mobile" if mobile else "desktop"
-            df = chart2_data.get(mobile_option, {}).get("all_machine", None)
+    if not isinstance(data_source, PlantGroup):
+        return
 
-            if df is None or df.empty:
-                logger.warning("Chart2 data refresh: Empty dataframe")
-                return [], []
+    @app.callback(
+        Output(ALL_CHART_DATA_STORE_ID, "data", allow_duplicate=True),
+        Input(URL_ID, "search"),
+        State(ALL_CHART_DATA_STORE_ID, "data"),
+        prevent_initial_call="initial_duplicate",
+    )
+    def select_plant_view(search, store_data):
+        plant = _plant_from_search(search)
+        if not isinstance(store_data, dict) or store_data.get("plant") == plant:
+            return no_update
+        return {**store_data, "plant": plant}
 
-            # Convert to table format
-            table_data = df.to_dict("records")
-            table_columns = [{"name": i, "id": i} for i in df.columns]
+    logger.info("Plant view callback registered.")
 
-            logger.info("Chart2 data refresh: Successfully updated data and columns")
-            return table_data, table_columns
 
-        except Exception as e:
-            logger.error(
-                f"Chart2 data refresh: Error updating data: {e}", exc_info=True
-            )
-            return [], []
+def register_data_as_of_callback(app, lang: str = "zh_cn"):
+    """Registers the "data as of" note shown while the dashboard serves the
+    snapshot saved before a restart; the first auto refresh clears it.
+    """
 
-    logger.info("Chart2 data refresh callback registered.")
+    @app.callback(
+        Output(DATA_AS_OF_ID, "children"),
+        Input(ALL_CHART_DATA_STORE_ID, "data"),
+    )
+    def show_data_as_of(store_data):
+        as_of = store_data.get("as_of") if isinstance(store_data, dict) else None
+        if as_of is None:
+            return None
+        as_of_text = datetime.fromtimestamp(as_of).strftime("%m-%d %H:%M:%S")
+        if lang.startswith("zh"):
+            return f"数据时间 {as_of_text}（等待刷新）"
+        return f"Data as of {as_of_text} (refreshing)"
+
+    logger.info("Data as of callback registered.")
@@ -6,7 +6,7 @@ from PlotCharts.PlotChart_chart3 import create_chart3_layout
 from PlotCharts.PlotChart_chart4 import create_chart4_layout
 from PlotCharts.PlotChart_chart5 import create_chart5_layout
 from PlotCharts.PlotChart_chart6 import create_chart6_layout
-from Database.serialize_df import serialize_dataframe_dict
+from Database.snapshot_store import snapshot_store
 
 # from layouts.create_buttons import create_period_button, create_theme_buttons
 
@@ -18,6 +18,7 @@ def create_desktop_layout(
     color_theme,
     lang,
     default_period: str = "今天",
+    data_as_of=None,
 ):
     """Creates the main mobile dashboard layout structure with clickable charts.
 
@@ -26,11 +27,12 @@ def create_desktop_layout(
         initial_chart_data (dict): Dictionary containing the initially fetched data for charts.
         color_theme: The color theme setting.
         lang: The language setting.
+        data_as_of: Fetch timestamp when initial_charts_data is the last
+            snapshot saved on disk rather than fresh data.
     """
     periods = initial_charts_data["chart-1-data-store"].keys()
-    serialized_initial_charts_data = {
-        key: serialize_dataframe_dict(df) for key, df in initial_charts_data.items()
-    }
+    # The DataFrames stay on the server; the store only holds the snapshot handle
+    initial_snapshot = snapshot_store.put(initial_charts_data, as_of=data_as_of)
 
     return html.Div(
         id="dashboard-content",
@@ -48,6 +50,18 @@ def create_desktop_layout(
             html.Div(id="mobile-page-content"),
             # Add theme store for theme switching
             dcc.Store(id="theme-store", data=color_theme),
+            # "Data as of" note while showing the snapshot saved before a restart
+            html.Div(
+                id="data-as-of",
+                style={
+                    "position": "absolute",
+                    "top": "2px",
+                    "right": "8px",
+                    "zIndex": 10,
+                    "fontSize": "12px",
+                    "color": "#aaaaaa",
+                },
+            ),
             dbc.Container(
                 id="desktop-content",
                 fluid=True,
@@ -206,7 +220,7 @@ def create_desktop_layout(
                     # Add the data store here and populate with initial data
                     dcc.Store(
                         id="all-chart-data-store",
-                        data=serialized_initial_charts_data,
+                        data=initial_snapshot,
                     ),
                     dcc.Store(
                         id="time-period-store",
@@ -218,6 +232,8 @@ def create_desktop_layout(
                         data="24_hrs",
                         storage_type="session",
                     ),
+                    # Browser time of chart 5's "now" line (dashboard.place_now_line)
+                    dcc.Store(id="chart5-now-line-store"),
                     # --------------------------------------------
                     # Startup selection modals
                     # 1) Time period selection
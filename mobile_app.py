@@ -9,11 +9,18 @@ import os
 from callbacks.select_time_period_callback import (
     register_time_period_callbacks,
     register_chart5_timeframe_callbacks,
-    register_txt_cards_callbacks,
+    register_dashboard_render_callback,
     register_auto_refresh_callbacks,
-    register_chart2_data_refresh_callback,
+    register_plant_view_callback,
+    register_data_as_of_callback,
 )
 from callbacks.select_theme_callback import register_theme_callbacks
+from Server.compression import register_compression
+from Server.static_assets import bootstrap_stylesheets, register_asset_cache_headers
+from Database.payload_capture import register_callback_capture
+from Database.multi_plant import data_source
+from Database.refresh_scheduler import tiered_refresh
+from Server.render_pool import render_pool
 from Database.fetch_all_charts_data import *
 from layouts.mobile_dashboard_layout import create_mobile_layout
 from callbacks.detail_page_callbacks import (
@@ -21,10 +28,15 @@ from callbacks.detail_page_callbacks import (
     register_detail_page_callbacks,
 )
 
-db = DatabaseConnection()
-conn = db.connect()
-# * Get data for all charts
-data = get_all_charts_data(db)
+# Fork the figure render workers (DASHBOARD_RENDER_PROCESSES) while the app
+# has no threads or data yet
+render_pool.start()
+
+# A single database, or every plant of DASHBOARD_PLANTS
+db = data_source
+# * Get data for all charts: the last snapshot saved on disk when there is
+# one, fresh data follows with the first auto refresh
+data, data_as_of = get_startup_charts_data(db)
 
 # Initialize Flask
 server = Flask(__name__)
@@ -39,15 +51,21 @@ mobile_app = Dash(
     __name__,
     server=server,
     url_base_pathname="/",
-    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    external_stylesheets=bootstrap_stylesheets(),
     suppress_callback_exceptions=True,
 )
 
+# Compress callback payloads and cache fingerprinted assets for a year
+register_compression(server)
+register_asset_cache_headers(mobile_app)
+register_callback_capture(mobile_app, "mobile")
+
 mobile_app.layout = create_mobile_layout(
     initial_charts_data=data,
     color_theme="black",
     lang="zh_cn",
     default_period="今天",
+    data_as_of=data_as_of,
 )
 
 
@@ -66,6 +84,12 @@ register_auto_refresh_callbacks(
     mobile=True,
     lang="zh_cn",
 )
+register_plant_view_callback(mobile_app)
+register_data_as_of_callback(mobile_app, lang="zh_cn")
+
+# Per-chart refresh cadences (DASHBOARD_REFRESH_TIERS=1)
+if tiered_refresh is not None:
+    tiered_refresh.start(data, as_of=data_as_of)
 register_table_click_url_push(app=mobile_app)
 register_detail_page_callbacks(
     app=mobile_app,
@@ -73,17 +97,12 @@ register_detail_page_callbacks(
     # default_period="今天",
     lang="zh_cn",
 )
-register_chart2_data_refresh_callback(
-    app=mobile_app,
-    mobile=True,
-    lang="zh_cn",
-)
 register_chart5_timeframe_callbacks(
     app=mobile_app,
     mobile=True,
     lang="zh_cn",
 )
-register_txt_cards_callbacks(
+register_dashboard_render_callback(
     app=mobile_app,
     mobile=True,
     lang="zh_cn",
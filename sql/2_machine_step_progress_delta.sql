@@ -0,0 +1,7 @@
+select 
+    machine_name,
+    batch_no,
+    position,
+    modified_time
+from batch_queued
+where modified_time > '{since}'
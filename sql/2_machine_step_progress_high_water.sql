@@ -0,0 +1,2 @@
+select max(modified_time) as high_water
+from batch_queued
@@ -0,0 +1,6 @@
+select 
+    machine_name,
+    batch_no,
+    position
+from batch_queued
+where position is not null
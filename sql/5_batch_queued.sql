@@ -5,7 +5,7 @@ SELECT
     color,
     -- color_text,
     -- color_code,
-    -- position,
+    position,
     start_time,
     expected_run_minutes
 from batch_queued
@@ -0,0 +1,167 @@
+-- SQLite version of import_db.sql (local stand-in database, see Database/synthetic_data.py)
+
+DROP TABLE IF EXISTS machine_production_waste;
+CREATE TABLE machine_production_waste(
+    central_id TEXT NULL,
+    central_name TEXT NULL,
+    period TEXT NULL,
+    date DATETIME NULL,
+    machine_name TEXT NULL,
+    water_ton FLOAT NULL,
+    power_kwh FLOAT NULL,
+    steam_ton FLOAT NULL,
+    order_index INT NULL,
+    refresh_time DATETIME NULL,
+    write_time DATETIME NULL,
+    weight_kg INT NULL
+);
+CREATE INDEX idx_machine_production_waste_period ON machine_production_waste(period);
+
+DROP VIEW IF EXISTS production_volume;
+CREATE VIEW production_volume
+AS
+SELECT central_id, central_name, period, date, machine_name, order_index, refresh_time, weight_kg
+FROM machine_production_waste;
+
+DROP TABLE IF EXISTS production_volume_log;
+CREATE TABLE production_volume_log(
+    central_id TEXT DEFAULT '',
+    central_name TEXT DEFAULT '',
+    period TEXT NOT NULL,
+    date DATETIME NOT NULL,
+    machine_name TEXT NOT NULL,
+    weight_kg DECIMAL(10,2) NOT NULL,
+    order_index INT NOT NULL,
+    refresh_time DATETIME NOT NULL,
+    write_time DATETIME NOT NULL
+);
+CREATE INDEX idx_production_volume_log_period ON production_volume_log(period);
+
+DROP TABLE IF EXISTS batch_queued;
+CREATE TABLE batch_queued(
+    central_id TEXT NULL,
+    central_name TEXT NULL,
+    machine_name TEXT NULL,
+    state TEXT NULL,
+    batch_no TEXT NULL,
+    color_text INT NULL,
+    color INT NULL,
+    position INT NULL,
+    start_time DATETIME NULL,
+    end_time DATETIME NULL,
+    modified_time DATETIME NULL,
+    write_time DATETIME NULL,
+    program_name TEXT NULL,
+    start_mode TEXT NULL,
+    expected_run_minutes INT NULL,
+    color_code TEXT NULL,
+    weight_kg INT NULL,
+    worker_code TEXT NULL,
+    customer_code TEXT NULL,
+    product_code TEXT NULL
+);
+CREATE INDEX idx_batch_queued_start_time ON batch_queued(start_time);
+-- Covers the GROUP BY machine_name, min/max(position) of 2_machine_status_mobile.sql
+CREATE INDEX idx_batch_queued_machine_name_position ON batch_queued(machine_name, position);
+-- Range of the step progress delta (2_machine_step_progress_delta.sql)
+CREATE INDEX idx_batch_queued_modified_time ON batch_queued(modified_time);
+
+DROP TABLE IF EXISTS machine_status;
+CREATE TABLE machine_status(
+    central_id TEXT NULL,
+    central_name TEXT NULL,
+    machine_name TEXT NULL,
+    state TEXT NULL,
+    num_of_idle_reasons INT NULL,
+    num_of_alarms INT NULL,
+    idle_reason TEXT NULL,
+    alarm TEXT NULL,
+    user_prompt TEXT NULL,
+    mt_temperature TEXT NULL,
+    batch_no TEXT NULL,
+    program_name TEXT NULL,
+    current_step TEXT NULL,
+    next_step TEXT NULL,
+    minutes_run INT NULL,
+    expected_finish_time DATETIME NULL,
+    batch_water_kg INT NULL,
+    batch_power_kwh INT NULL,
+    batch_steam_kg INT NULL,
+    water_meter_ton INT NULL,
+    power_meter_kwh INT NULL,
+    steam_meter_ton INT NULL,
+    idle_reason_2 TEXT NULL,
+    idle_reason_3 TEXT NULL,
+    idle_reason_4 TEXT NULL,
+    idle_reason_5 TEXT NULL,
+    alarm_2 TEXT NULL,
+    alarm_3 TEXT NULL,
+    alarm_4 TEXT NULL,
+    alarm_5 TEXT NULL,
+    status_refresh_time DATETIME NULL,
+    status_write_time DATETIME NULL
+);
+
+DROP TABLE IF EXISTS overall_usage;
+CREATE TABLE overall_usage(
+    central_id TEXT NULL,
+    central_name TEXT NULL,
+    period TEXT NULL,
+    date DATETIME NULL,
+    machine_name TEXT NULL,
+    run FLOAT NULL,
+    idle FLOAT NULL,
+    down FLOAT NULL,
+    repair FLOAT NULL,
+    order_index INT NULL,
+    refresh_time DATETIME NULL,
+    write_time DATETIME NULL,
+    weight_kg INT NULL
+);
+CREATE INDEX idx_overall_usage_period ON overall_usage(period);
+
+DROP TABLE IF EXISTS stop_reasons_summary;
+CREATE TABLE stop_reasons_summary(
+    central_id TEXT NULL,
+    central_name TEXT NULL,
+    period TEXT NULL,
+    date DATETIME NULL,
+    machine_name TEXT NULL,
+    run_hour FLOAT NULL,
+    reason1_hour FLOAT NULL,
+    reason2_hour FLOAT NULL,
+    reason3_hour FLOAT NULL,
+    reason4_hour FLOAT NULL,
+    reason5_hour FLOAT NULL,
+    reason6_hour FLOAT NULL,
+    reason7_hour FLOAT NULL,
+    reason8_hour FLOAT NULL,
+    reason9_hour FLOAT NULL,
+    reason10_hour FLOAT NULL,
+    reason11_hour FLOAT NULL,
+    reason12_hour FLOAT NULL,
+    reason13_hour FLOAT NULL,
+    reason14_hour FLOAT NULL,
+    reason15_hour FLOAT NULL,
+    reason16_hour FLOAT NULL,
+    reason17_hour FLOAT NULL,
+    reason18_hour FLOAT NULL,
+    reason19_hour FLOAT NULL,
+    reason20_hour FLOAT NULL,
+    reason21_hour FLOAT NULL,
+    reason22_hour FLOAT NULL,
+    reason23_hour FLOAT NULL,
+    reason24_hour FLOAT NULL,
+    reason25_hour FLOAT NULL,
+    reason26_hour FLOAT NULL,
+    reason27_hour FLOAT NULL,
+    reason28_hour FLOAT NULL,
+    reason29_hour FLOAT NULL,
+    reason30_hour FLOAT NULL,
+    reason31_hour FLOAT NULL,
+    sum_hour FLOAT NULL,
+    order_index INT NULL,
+    refresh_time DATETIME NULL,
+    write_time DATETIME NULL
+);
+CREATE INDEX idx_stop_reasons_summary_period ON stop_reasons_summary(period);
@@ -0,0 +1,75 @@
+"""
+FigureBuilder must render the same figures as plotly's validated path.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+from plotly.subplots import make_subplots
+
+from benchmarks.bench_figure_builder import (
+    PERIOD,
+    make_chart4_data,
+    make_chart6_data,
+)
+from ChartFactory.chartfactory_chart4 import create_chart4_figure_detail
+from ChartFactory.chartfactory_chart6 import create_chart6_figure_detail
+from ChartFactory.figure_builder import FigureBuilder
+
+DETAIL_CASES = {
+    "chart4": (create_chart4_figure_detail, make_chart4_data),
+    "chart6": (create_chart6_figure_detail, make_chart6_data),
+}
+
+
+def _figure_json(fig) -> dict:
+    """Figure JSON as the browser receives it (numpy arrays become lists)."""
+    return json.loads(pio.to_json(fig, validate=False))
+
+
+@pytest.fixture(params=sorted(DETAIL_CASES))
+def detail_case(request):
+    factory, make_data = DETAIL_CASES[request.param]
+    return factory, make_data(45, np.random.default_rng(0))
+
+
+def test_detail_dicts_match_validated_figures(detail_case):
+    factory, dfs = detail_case
+    plain = factory(PERIOD, dfs, validate=False)
+    assert plain
+    for fig in plain:
+        assert isinstance(fig, dict)
+        # skip_invalid=False raises on any property plotly would reject
+        validated = go.Figure(fig, skip_invalid=False).to_plotly_json()
+        assert _figure_json(fig) == _figure_json(validated)
+
+
+def test_detail_validate_flag_gives_the_same_figures(detail_case):
+    factory, dfs = detail_case
+    validated = factory(PERIOD, dfs, validate=True)
+    plain = factory(PERIOD, dfs, validate=False)
+    assert len(validated) == len(plain)
+    for fig, fig_dict in zip(validated, plain):
+        assert isinstance(fig, go.Figure)
+        assert _figure_json(fig.to_plotly_json()) == _figure_json(fig_dict)
+
+
+@pytest.mark.parametrize("cols", [1, 3, 5])
+def test_grid_matches_make_subplots(cols):
+    titles = [f"M{c:03d}" for c in range(cols)]
+    builder = FigureBuilder(
+        rows=1, cols=cols, subplot_titles=titles, horizontal_spacing=0.04
+    )
+    reference = make_subplots(
+        rows=1, cols=cols, subplot_titles=titles, horizontal_spacing=0.04
+    )
+    for c in range(1, cols + 1):
+        builder.add_trace(go.Bar(x=["a"], y=[c]), row=1, col=c)
+        reference.add_trace(go.Bar(x=["a"], y=[c]), row=1, col=c)
+    assert _figure_json(builder.to_dict()) == _figure_json(reference.to_plotly_json())
@@ -0,0 +1,67 @@
+"""
+compute_top_reasons must rank like the per-machine sorted() it replaced:
+value desc, ties in column order, zeros dropped.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Database.stop_reason_topk import compute_top_reasons
+
+
+def _frame(rows) -> pd.DataFrame:
+    df = pd.DataFrame(
+        rows, columns=[f"reason{j}_hour" for j in range(1, len(rows[0]) + 1)]
+    )
+    df.insert(0, "machine_name", [f"M{i:03d}" for i in range(len(rows))])
+    return df
+
+
+def _reference(df: pd.DataFrame, k: int) -> dict:
+    """The baseline per-machine ranking: stable sorted(..., reverse=True)."""
+    reason_cols = [col for col in df.columns if col.startswith("reason")]
+    result = {}
+    for _, row in df.iterrows():
+        values = {col: row[col] for col in reason_cols if row[col] != 0}
+        top = sorted(values.items(), key=lambda x: x[1], reverse=True)[:k]
+        result[row["machine_name"]] = [col for col, _ in top]
+    return result
+
+
+def _ranked(top_reasons: pd.DataFrame) -> dict:
+    ordered = top_reasons.sort_values(["machine_name", "rank"])
+    return ordered.groupby("machine_name")["reason_col"].apply(list).to_dict()
+
+
+@pytest.mark.parametrize(
+    "row, expected",
+    [
+        (
+            [1, 2, 0, 1, 2, 0, 1, 2, 0],
+            ["reason2", "reason5", "reason8", "reason1", "reason4"],
+        ),
+        (
+            [1, 0] * 16,
+            ["reason1", "reason3", "reason5", "reason7", "reason9"],
+        ),
+    ],
+)
+def test_ties_keep_column_order(row, expected):
+    top = compute_top_reasons(_frame([row]), k=5)
+    assert [col.replace("_hour", "") for col in top["reason_col"]] == expected
+    assert top["rank"].tolist() == list(range(1, len(expected) + 1))
+
+
+def test_matches_baseline_ranking_on_tied_hours():
+    # Whole hours with many zeros, as in the hourly stop reason data
+    rng = np.random.default_rng(0)
+    hours = rng.integers(0, 4, size=(200, 31)).astype(float)
+    hours[rng.random(hours.shape) < 0.5] = 0
+    df = _frame(hours.tolist())
+    top = compute_top_reasons(df, k=5)
+    expected = {m: cols for m, cols in _reference(df, 5).items() if cols}
+    assert _ranked(top) == expected